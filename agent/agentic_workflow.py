@@ -1,28 +1,47 @@
 from langgraph.graph import StateGraph, MessagesState, START, END
-from langgraph.prebuilt import ToolNode, tools_condition
+from langgraph.prebuilt import tools_condition
+from langchain_core.runnables import RunnableLambda
 
 from utils.model_loader import ModelLoader
 from prompt_library.prompt import SYSTEM_PROMPT
+from agent.tool_executor import ParallelToolNode
+from agent.context_manager import ContextBudget, describe_context
+from agent.prefetch import PrefetchNode
+from agent.model_router import ModelRouter
+from logger.logging import get_logger
+from utils.metrics import AGENT_NODE_SECONDS, LLM_CALL_SECONDS, LLM_TOKENS, timed
 
 from tools.weather_info_tool import WeatherInfoTool
 from tools.place_search_tool import PlaceSearchTool
 from tools.expense_calculator_tool import CalculatorTool
 from tools.currency_conversion_tool import CurrencyConverterTool
 
+logger = get_logger(__name__)
+
 
 class GraphBuilder():
     
     def __init__(self, model_provider: str = "groq"):
         """
         Initialize the GraphBuilder.
-        - Load the LLM from the chosen provider (default = groq).
+        - Load the LLM from the chosen provider (default = groq), or a
+          latency-aware router over several providers ("router").
         - Load all tools (weather, place search, calculator, currency conversion).
         - Bind the tools to the LLM for tool calling.
         """
         
-        # Load model using ModelLoader
-        self.model_loader = ModelLoader(model_provider=model_provider)
-        self.llm = self.model_loader.load_llm()
+        # Provider label of the LLM metrics
+        self.model_provider = model_provider
+        
+        # Load model using ModelLoader (or the router over the config.yaml candidates)
+        if model_provider == "router":
+            self.model_loader = ModelLoader()
+            runtime_provider = self.model_loader.config.get("runtime", {}).get("model_provider")
+            self.llm = ModelRouter.from_config(self.model_loader.config.get("router", {}) or {},
+                                               preferred=runtime_provider if runtime_provider != "router" else None)
+        else:
+            self.model_loader = ModelLoader(model_provider=model_provider)
+            self.llm = self.model_loader.load_llm()
         
         # Initialize tools list
         self.tools = []
@@ -42,31 +61,108 @@ class GraphBuilder():
         # Bind the tools to the LLM (so the LLM can call them when needed)
         self.llm_with_tools = self.llm.bind_tools(tools=self.tools)
         
+        # Tool node runs parallel tool calls concurrently (settings from config.yaml)
+        tool_settings = self.model_loader.config.get("tools", {}) or {}
+        self.tool_node = ParallelToolNode(
+            tools=self.tools,
+            max_concurrency=tool_settings.get("max_concurrency", 6),
+            timeout_seconds=tool_settings.get("timeout_seconds", 30),
+            tool_timeouts=tool_settings.get("tool_timeouts"),
+        )
+        
+        # Optional prefetch of the standard lookups before the first LLM call
+        prefetch_settings = self.model_loader.config.get("prefetch", {}) or {}
+        self.prefetch_node = None
+        if prefetch_settings.get("enabled", False):
+            self.prefetch_node = PrefetchNode(self.tool_node, lookups=prefetch_settings.get("lookups"))
+        
+        # Token budget for each LLM call (old tool outputs are elided beyond it)
+        context_settings = self.model_loader.config.get("context", {}) or {}
+        self.context_budget = ContextBudget(
+            max_input_tokens=context_settings.get("max_input_tokens", 6000),
+            preview_chars=context_settings.get("preview_chars", 240),
+            tokenizer=context_settings.get("tokenizer", "heuristic"),
+        )
+        
         # Placeholder for compiled graph
         self.graph = None
         
         # Load system prompt (defines the agent’s personality/role)
         self.system_prompt = SYSTEM_PROMPT
     
+    def build_context(self, messages: list) -> list:
+        """
+        Prepend the system prompt and fit the conversation into the token budget
+        (older tool outputs elided, latest tool results and user request kept).
+        """
+        context, tokens_before, tokens_after = self.context_budget.fit(self.system_prompt, messages)
+        logger.info("LLM call: ~%d input tokens (%s)%s", tokens_after, describe_context(messages),
+                    f", trimmed from ~{tokens_before}" if tokens_after < tokens_before else "")
+        return context
+    
+    def record_usage(self, timing: dict, input_messages: list, response) -> None:
+        """
+        Count the tokens of one LLM call (provider usage metadata, else the
+        local estimate of the input) into the metrics and request breakdown.
+        """
+        usage = getattr(response, "usage_metadata", None) or {}
+        input_tokens = usage.get("input_tokens") or self.context_budget.count(input_messages)
+        output_tokens = usage.get("output_tokens", 0)
+        LLM_TOKENS.inc(input_tokens, provider=self.model_provider, kind="input")
+        LLM_TOKENS.inc(output_tokens, provider=self.model_provider, kind="output")
+        timing["extra"].update(input_tokens=input_tokens, output_tokens=output_tokens)
+    
     def agent_function(self, state: MessagesState):
         """
         Main agent function (the 'brain').
         - Takes current conversation state (messages).
-        - Prepends system prompt.
+        - Prepends system prompt and trims the context to the token budget.
         - Sends to the LLM (with tools enabled).
         - Returns the response as new messages in the state.
         """
         
-        user_question = state["messages"]
-        input_question = [self.system_prompt] + user_question  # Add system prompt to context
-        response = self.llm_with_tools.invoke(input_question)  # Call LLM with tool-binding
+        with timed(AGENT_NODE_SECONDS, "node", "agent", node="agent"):
+            user_question = state["messages"]
+            input_question = self.build_context(user_question)  # System prompt + budgeted context
+            with timed(LLM_CALL_SECONDS, "llm", self.model_provider, provider=self.model_provider) as timing:
+                response = self.llm_with_tools.invoke(input_question)  # Call LLM with tool-binding
+                self.record_usage(timing, input_question, response)
+        
+        return {"messages": [response]}
+    
+    async def aagent_function(self, state: MessagesState):
+        """
+        Async version of `agent_function`, used when the graph runs via
+        `ainvoke`/`astream` so the LLM call does not block the event loop.
+        """
+        
+        with timed(AGENT_NODE_SECONDS, "node", "agent", node="agent"):
+            user_question = state["messages"]
+            input_question = self.build_context(user_question)
+            with timed(LLM_CALL_SECONDS, "llm", self.model_provider, provider=self.model_provider) as timing:
+                response = await self.llm_with_tools.ainvoke(input_question)
+                self.record_usage(timing, input_question, response)
         
         return {"messages": [response]}
     
+    def tools_function(self, state: MessagesState, config=None):
+        """
+        Tools node: run the requested tool calls concurrently (timed as a node).
+        """
+        with timed(AGENT_NODE_SECONDS, "node", "tools", node="tools"):
+            return self.tool_node.invoke(state, config)
+    
+    async def atools_function(self, state: MessagesState, config=None):
+        """
+        Async version of `tools_function`.
+        """
+        with timed(AGENT_NODE_SECONDS, "node", "tools", node="tools"):
+            return await self.tool_node.ainvoke(state, config)
+    
     def build_graph(self):
         """
         Build the LangGraph agent workflow:
-        - Define nodes: agent + tools
+        - Define nodes: (optional prefetch) + agent + tools
         - Define edges: flow between agent <-> tools
         - Add conditional logic for when to call tools
         - Compile and return the graph
@@ -75,11 +171,21 @@ class GraphBuilder():
         graph_builder = StateGraph(MessagesState)
         
         # Add nodes
-        graph_builder.add_node("agent", self.agent_function)         # Agent reasoning node
-        graph_builder.add_node("tools", ToolNode(tools=self.tools))  # Tools execution node
+        # Agent reasoning node (sync for invoke, async for ainvoke)
+        graph_builder.add_node("agent", RunnableLambda(self.agent_function, afunc=self.aagent_function))
+        # Tools execution node (concurrent, per-tool timeouts, results in call order)
+        graph_builder.add_node("tools", RunnableLambda(self.tools_function, afunc=self.atools_function))
+        
+        # Prefetch node (standard lookups from a local query parse, no LLM round trip)
+        if self.prefetch_node is not None:
+            graph_builder.add_node("prefetch", RunnableLambda(self.prefetch_node.invoke, afunc=self.prefetch_node.ainvoke))
         
         # Add edges
-        graph_builder.add_edge(START,"agent")                        # Start → Agent
+        if self.prefetch_node is not None:
+            graph_builder.add_edge(START,"prefetch")                 # Start → Prefetch
+            graph_builder.add_edge("prefetch","agent")               # Prefetch → Agent
+        else:
+            graph_builder.add_edge(START,"agent")                    # Start → Agent
         graph_builder.add_conditional_edges("agent", tools_condition) # Agent → Tool (if needed)
         graph_builder.add_edge("tools","agent")                      # Tools → Agent
         graph_builder.add_edge("agent",END)                          # Agent → End
@@ -0,0 +1,165 @@
+"""
+Offline batch planner: run a JSONL file of queries through the agent graph.
+
+Input lines are {"id": ..., "query": ...} objects (the id is optional and
+defaults to the line number) or bare JSON strings. Each finished plan is
+appended to the output JSONL right away, so the output doubles as the
+checkpoint: re-running the same command skips ids that already have an
+answer and retries the rest (their failed lines are dropped first, so every
+id keeps exactly one result line).
+
+    python -m agent.batch_runner destinations.jsonl plans.jsonl --concurrency 8
+
+Queries run concurrently in one process, so the tool caches (rates, weather,
+places) and in-flight coalescing are shared across the whole batch.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Awaitable, Callable, Optional
+
+from agent.plan_service import PlanService
+from logger.logging import get_logger
+from utils.cache_backend import get_cache_backend
+from utils.config_loader import load_config, load_model_provider
+from utils.plan_cache import PlanCache
+
+logger = get_logger(__name__)
+
+
+def read_queries(path: str) -> list:
+    """Parse the input JSONL into [{"id": str, "query": str}] (blank lines skipped)."""
+    items = []
+    with open(path, "r", encoding="utf-8") as file:
+        for line_number, line in enumerate(file, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                record = {"query": record}
+            items.append({"id": str(record.get("id", line_number)), "query": record["query"]})
+    return items
+
+
+def prune_checkpoint(path: str) -> set:
+    """
+    Rewrite an existing output file (the checkpoint) keeping one answered
+    line per id; failed attempts and a partial last line are dropped, since
+    those ids run again and append a new line.
+
+    Returns:
+        set: Ids that already have an answer.
+    """
+    done, kept = set(), []
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue   # partial last line of an interrupted run
+            if "answer" in record and str(record["id"]) not in done:
+                done.add(str(record["id"]))
+                kept.append(line if line.endswith("\n") else line + "\n")
+
+    # Replace atomically, so an interrupted rewrite never loses answers
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        file.writelines(kept)
+    os.replace(temporary_path, path)
+    return done
+
+
+async def run_batch(service: PlanService, items: list, concurrency: int = 8, use_cache: bool = True,
+                    on_result: Optional[Callable[[dict], Awaitable[None]]] = None) -> list:
+    """
+    Answer every item with at most `concurrency` agent runs in flight.
+
+    Args:
+        service (PlanService): Answers single queries (plan cache + coalescing).
+        items (list): [{"id", "query"}] to answer.
+        concurrency (int): Maximum queries in flight.
+        use_cache (bool): False skips plan cache lookups.
+        on_result (callable): Awaited with each result as soon as it finishes.
+
+    Returns:
+        list: One result per item, in input order: {"id", "query", "answer" | "error", "seconds"}.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_one(item: dict) -> dict:
+        async with semaphore:
+            started = time.perf_counter()
+            result = {"id": item["id"], "query": item["query"]}
+            try:
+                result.update(await service.answer(item["query"], use_cache=use_cache))
+            except Exception as e:
+                result["error"] = str(e)
+            result["seconds"] = round(time.perf_counter() - started, 3)
+        if on_result is not None:
+            await on_result(result)
+        return result
+
+    return await asyncio.gather(*(run_one(item) for item in items))
+
+
+async def run_file(input_path: str, output_path: str, concurrency: int, use_cache: bool = True,
+                   model_provider: Optional[str] = None) -> dict:
+    """
+    Run a JSONL batch, appending results to `output_path` as they finish and
+    skipping ids already answered there.
+
+    Args:
+        model_provider (str): LLM provider (default: the API's, see load_model_provider).
+
+    Returns:
+        dict: Counts of total, skipped, answered and failed queries plus wall time.
+    """
+    items = read_queries(input_path)
+    done = prune_checkpoint(output_path)
+    pending = [item for item in items if item["id"] not in done]
+    logger.info("Batch: %d queries, %d already done, %d to run", len(items), len(items) - len(pending), len(pending))
+
+    config = load_config()
+    backend = get_cache_backend()
+    plan_cache = PlanCache(**config.get("cache", {}).get("plans", {}), backend=backend if backend.shared else None)
+    service = PlanService(model_provider or load_model_provider(), "async", plan_cache)
+    counts = {"total": len(items), "skipped": len(items) - len(pending), "answered": 0, "failed": 0}
+    started = time.perf_counter()
+
+    with open(output_path, "a", encoding="utf-8") as output:
+        async def write_result(result: dict) -> None:
+            # One complete line per finished plan, flushed so a crash loses nothing written
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            output.flush()
+            counts["failed" if "error" in result else "answered"] += 1
+            logger.info("[%d/%d] %s (%.1fs)%s", counts["answered"] + counts["failed"], len(pending),
+                        result["id"], result["seconds"], " FAILED" if "error" in result else "")
+
+        await run_batch(service, pending, concurrency, use_cache, on_result=write_result)
+
+    counts["seconds"] = round(time.perf_counter() - started, 3)
+    return counts
+
+
+def main() -> None:
+    batch_settings = load_config().get("batch", {})
+    parser = argparse.ArgumentParser(description="Run a JSONL file of travel queries through the agent graph.")
+    parser.add_argument("input", help="JSONL file of {\"id\", \"query\"} objects")
+    parser.add_argument("output", help="JSONL file results are appended to (also the resume checkpoint)")
+    parser.add_argument("--concurrency", type=int, default=batch_settings.get("max_concurrency", 8))
+    parser.add_argument("--provider", default=load_model_provider(),
+                        help="LLM provider for the agent graph (default: MODEL_PROVIDER, else config.yaml runtime)")
+    parser.add_argument("--no-cache", action="store_true", help="Skip plan cache lookups")
+    args = parser.parse_args()
+
+    summary = asyncio.run(run_file(args.input, args.output, args.concurrency, not args.no_cache, args.provider))
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
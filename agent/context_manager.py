@@ -0,0 +1,140 @@
+import json
+from typing import Callable, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+from logger.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Per-message framing overhead (role, separators) added by chat templates
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def heuristic_token_counter(text: str) -> int:
+    """Rough local token estimate (~4 characters per token for English/JSON)."""
+    return (len(text) + 3) // 4
+
+
+def load_token_counter(tokenizer: str = "heuristic") -> Callable[[str], int]:
+    """
+    Return a text -> token count function.
+
+    Args:
+        tokenizer (str): "heuristic" (characters / 4) or a tiktoken encoding
+                         name such as "cl100k_base". Falls back to the heuristic
+                         when tiktoken or the encoding is unavailable.
+    """
+    if tokenizer == "heuristic":
+        return heuristic_token_counter
+    try:
+        import tiktoken   # optional, installed with langchain-openai
+        encoding = tiktoken.get_encoding(tokenizer)
+        return lambda text: len(encoding.encode(text, disallowed_special=()))
+    except Exception as e:
+        logger.warning("Tokenizer '%s' unavailable (%s); using the character heuristic", tokenizer, e)
+        return heuristic_token_counter
+
+
+class ContextBudget:
+    """
+    Keeps each LLM call under a token budget.
+
+    When the system prompt plus conversation exceed `max_input_tokens`, older
+    tool outputs are elided oldest-first: each is replaced by a short preview
+    (tool name, size, first characters), then by a one-line stub if that is
+    still not enough. The latest tool round stays verbatim, and user messages
+    and the tool-call structure are never removed, so the request stays valid
+    for every provider.
+    """
+
+    def __init__(self, max_input_tokens: int = 6000, preview_chars: int = 240, tokenizer: str = "heuristic"):
+        """
+        Args:
+            max_input_tokens (int): Token budget for one LLM call (prompt side).
+            preview_chars (int): Characters of an elided tool output kept as preview.
+            tokenizer (str): See `load_token_counter`.
+        """
+        self.max_input_tokens = max_input_tokens
+        self.preview_chars = preview_chars
+        self.count_text = load_token_counter(tokenizer)
+
+    def count_message(self, message: BaseMessage) -> int:
+        content = message.content if isinstance(message.content, str) else json.dumps(message.content, default=str)
+        tokens = MESSAGE_OVERHEAD_TOKENS + self.count_text(content)
+        if isinstance(message, AIMessage) and message.tool_calls:
+            tokens += self.count_text(json.dumps([[c["name"], c["args"]] for c in message.tool_calls], default=str))
+        return tokens
+
+    def count(self, messages: list) -> int:
+        return sum(self.count_message(message) for message in messages)
+
+    @staticmethod
+    def _latest_tool_round(messages: list) -> set:
+        """Indexes of the trailing ToolMessages (results of the latest tool calls)."""
+        latest = set()
+        for index in range(len(messages) - 1, -1, -1):
+            if not isinstance(messages[index], ToolMessage):
+                break
+            latest.add(index)
+        return latest
+
+    def _elide(self, message: ToolMessage, original_tokens: int, preview: bool) -> ToolMessage:
+        text = message.content if isinstance(message.content, str) else str(message.content)
+        note = f"[Earlier {message.name or 'tool'} output elided, ~{original_tokens} tokens"
+        if preview:
+            snippet = " ".join(text[:self.preview_chars].split())
+            note += f"; starts: {snippet}..." if len(text) > self.preview_chars else f": {snippet}"
+        return message.model_copy(update={"content": note + "]"})
+
+    def fit(self, system_prompt: Optional[BaseMessage], messages: list) -> tuple:
+        """
+        Trim the conversation to the budget.
+
+        Args:
+            system_prompt (BaseMessage): Prepended to the call (never trimmed).
+            messages (list): Conversation from the graph state.
+
+        Returns:
+            tuple: (messages to send including the system prompt, tokens before, tokens after).
+        """
+        head = [system_prompt] if system_prompt is not None else []
+        counts = [self.count_message(message) for message in messages]
+        before = self.count(head) + sum(counts)
+        total = before
+
+        if total > self.max_input_tokens:
+            messages = list(messages)
+            latest = self._latest_tool_round(messages)
+            older_tools = [i for i, m in enumerate(messages) if isinstance(m, ToolMessage) and i not in latest]
+            original_tokens = {index: counts[index] for index in older_tools}
+
+            # Pass 1 keeps a short preview, pass 2 a one-line stub
+            for preview in (True, False):
+                for index in older_tools:
+                    if total <= self.max_input_tokens:
+                        break
+                    elided = self._elide(messages[index], original_tokens[index], preview)
+                    new_count = self.count_message(elided)
+                    if new_count < counts[index]:
+                        total += new_count - counts[index]
+                        messages[index], counts[index] = elided, new_count
+
+            if total > self.max_input_tokens:
+                logger.warning("Context still ~%d tokens after eliding old tool outputs (budget %d)",
+                               total, self.max_input_tokens)
+
+        return head + messages, before, total
+
+
+def describe_context(messages: list) -> str:
+    """Short summary of a message list for logs, e.g. '1 human, 2 ai, 4 tool'."""
+    kinds = {"human": 0, "ai": 0, "tool": 0}
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            kinds["human"] += 1
+        elif isinstance(message, AIMessage):
+            kinds["ai"] += 1
+        elif isinstance(message, ToolMessage):
+            kinds["tool"] += 1
+    return ", ".join(f"{count} {kind}" for kind, count in kinds.items())
@@ -0,0 +1,116 @@
+import asyncio
+import os
+import threading
+
+from agent.agentic_workflow import GraphBuilder
+from agent.model_router import ModelRouter
+from logger.logging import get_logger
+from utils.settings import CONFIG_PATH
+
+logger = get_logger(__name__)
+
+
+class GraphRegistry:
+    """
+    Process-level registry of compiled agent graphs, keyed by model provider.
+
+    Building a graph means loading the config, the LLM, every tool and
+    compiling the StateGraph, so it is done once per provider and the compiled
+    graph is shared by all requests (compiled graphs hold no per-run state).
+    When config.yaml changes on disk every cached graph is dropped and rebuilt
+    lazily on the next lookup (hot reload); async callers use `aget`, which
+    builds off the event loop.
+    """
+
+    def __init__(self, config_path: str = CONFIG_PATH):
+        self.config_path = config_path
+        self._graphs = {}           # provider -> compiled graph
+        self._graph_pngs = {}       # provider -> rendered mermaid PNG bytes
+        self._routers = {}          # provider -> ModelRouter (only for "router")
+        self._config_mtime = self._read_config_mtime()
+        self._lock = threading.Lock()
+
+    def _read_config_mtime(self):
+        try:
+            return os.path.getmtime(self.config_path)
+        except OSError:
+            return None
+
+    def _reload_if_config_changed(self) -> None:
+        # Caller must hold self._lock
+        mtime = self._read_config_mtime()
+        if mtime != self._config_mtime:
+            if self._graphs:
+                logger.info("Config %s changed, rebuilding agent graphs", self.config_path)
+            self._graphs.clear()
+            self._graph_pngs.clear()
+            self._routers.clear()
+            self._config_mtime = mtime
+
+    def get(self, model_provider: str = "groq"):
+        """
+        Return the compiled graph for a provider, building it on first use.
+
+        Args:
+            model_provider (str): LLM provider name ("groq", "openai", "fake" or "router").
+
+        Returns:
+            CompiledStateGraph: The shared compiled agent graph.
+        """
+        # Fast path: graph already built and config untouched (no lock needed)
+        graph = self._graphs.get(model_provider)
+        if graph is not None and self._read_config_mtime() == self._config_mtime:
+            return graph
+
+        with self._lock:
+            self._reload_if_config_changed()
+            graph = self._graphs.get(model_provider)
+            if graph is None:
+                logger.info("Building agent graph for provider '%s'", model_provider)
+                builder = GraphBuilder(model_provider=model_provider)
+                graph = builder()
+                self._graphs[model_provider] = graph
+                if isinstance(builder.llm_with_tools, ModelRouter):
+                    self._routers[model_provider] = builder.llm_with_tools
+            return graph
+
+    async def aget(self, model_provider: str = "groq"):
+        """
+        Async version of `get` for request handlers: a (re)build loads the
+        LLM and the tools and compiles the graph, so it runs in a worker
+        thread and requests already in flight keep being served meanwhile.
+        """
+        graph = self._graphs.get(model_provider)
+        if graph is not None and self._read_config_mtime() == self._config_mtime:
+            return graph
+        return await asyncio.to_thread(self.get, model_provider)
+
+    def get_graph_png(self, model_provider: str = "groq") -> bytes:
+        """
+        Return the mermaid PNG of a provider's graph, rendered once and cached.
+
+        Rendering goes through the mermaid.ink web service, so this may raise
+        when the network is unavailable; failures are not cached.
+        """
+        graph = self.get(model_provider)
+        png = self._graph_pngs.get(model_provider)
+        if png is None:
+            png = graph.get_graph().draw_mermaid_png()
+            with self._lock:
+                self._graph_pngs[model_provider] = png
+        return png
+
+    def get_router(self, model_provider: str = "router"):
+        """Return the ModelRouter of a built "router" graph, or None."""
+        return self._routers.get(model_provider)
+
+    def clear(self) -> None:
+        """Drop every cached graph and diagram (they are rebuilt on next use)."""
+        with self._lock:
+            self._graphs.clear()
+            self._graph_pngs.clear()
+            self._routers.clear()
+
+
+# Shared registry for the whole process
+graph_registry = GraphRegistry()
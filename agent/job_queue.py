@@ -0,0 +1,243 @@
+"""
+Background jobs for long plans: `POST /jobs` returns a job id at once and a
+bounded pool of workers answers the queued queries, so the number of open
+connections and the number of agent runs in flight are sized independently.
+
+    queue = JobQueue(plan_service, workers=4, max_queued=200)
+    job = await queue.submit("Plan a trip to Goa for 5 days", priority=8)
+    queue.get(job.id).to_dict()   # status, progress so far, answer when done
+
+Higher priorities run first (FIFO within a priority). Queued and running
+jobs can be cancelled; finished jobs are kept for `result_ttl_seconds` and
+then forgotten.
+"""
+import asyncio
+import itertools
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Optional
+
+from agent.plan_service import PlanService
+from exception.exception_handling import JobQueueFullError
+from logger.logging import get_logger
+from utils.metrics import RequestTimings, request_timings
+
+logger = get_logger(__name__)
+
+# Job states; the last three are final
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = "queued", "running", "succeeded", "failed", "cancelled"
+FINAL_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+@dataclass
+class Job:
+    """One queued query and, once it ran, its outcome."""
+
+    id: str
+    query: str
+    priority: int
+    use_cache: bool = True
+    status: str = QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    timings: Optional[RequestTimings] = None
+    final_progress: Optional[dict] = None
+    task: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINAL_STATES
+
+    def progress(self) -> dict:
+        """What the run has done so far: LLM turns, finished tools and elapsed seconds."""
+        if self.final_progress is not None:
+            return self.final_progress   # tool threads may still record after a cancel
+        if self.timings is None:
+            return {}
+        spans = sorted(self.timings.spans, key=lambda span: span[2])
+        end = self.finished_at or time.time()
+        return {
+            "llm_calls": sum(1 for kind, *_ in spans if kind == "llm"),
+            "tools_done": [name for kind, name, *_ in spans if kind == "tool"],
+            "elapsed_seconds": round(end - (self.started_at or end), 3),
+        }
+
+    def to_dict(self) -> dict:
+        data = {
+            "id": self.id,
+            "query": self.query,
+            "priority": self.priority,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": self.progress(),
+        }
+        if self.result is not None:
+            data.update(self.result)
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+
+class JobQueue:
+    """
+    Priority queue of plan jobs drained by a fixed number of asyncio workers.
+
+    Workers are started on first use in the running event loop and answer
+    jobs through the PlanService, so jobs share the plan cache and in-flight
+    coalescing with /query.
+    """
+
+    def __init__(self, service: PlanService, workers: int = 4, max_queued: int = 200,
+                 result_ttl_seconds: float = 3600, default_priority: int = 5):
+        """
+        Args:
+            service (PlanService): Answers single queries.
+            workers (int): Agent runs in flight at most.
+            max_queued (int): Jobs waiting at most; more are rejected (JobQueueFullError).
+            result_ttl_seconds (float): How long finished jobs can still be fetched.
+            default_priority (int): Priority of jobs submitted without one.
+        """
+        self.service = service
+        self.workers = max(1, int(workers))
+        self.max_queued = int(max_queued)
+        self.result_ttl_seconds = float(result_ttl_seconds)
+        self.default_priority = int(default_priority)
+        self._jobs = {}                     # job id -> Job
+        self._queue = None                  # asyncio.PriorityQueue of (-priority, sequence, job id)
+        self._sequence = itertools.count()
+        self._worker_tasks = []
+        self.counts = {"submitted": 0, "rejected": 0, SUCCEEDED: 0, FAILED: 0, CANCELLED: 0, "expired": 0}
+
+    # --------------------------
+    # Workers
+    # --------------------------
+    def _ensure_workers(self) -> None:
+        if self._worker_tasks and not all(task.done() for task in self._worker_tasks):
+            return
+        self._queue = asyncio.PriorityQueue()
+        # Jobs still waiting from a previous event loop are queued again
+        for job in self._jobs.values():
+            if job.status == QUEUED:
+                self._queue.put_nowait((-job.priority, next(self._sequence), job.id))
+        self._worker_tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            if job is None or job.status != QUEUED:
+                continue   # cancelled or expired while waiting
+            job.task = asyncio.ensure_future(self._run(job))
+            try:
+                # wait() rather than await: cancelling the job must not stop the worker
+                await asyncio.wait([job.task])
+            finally:
+                job.task = None
+
+    async def _run(self, job: Job) -> None:
+        if job.status != QUEUED:
+            return   # cancelled between being picked and starting
+        job.status, job.started_at = RUNNING, time.time()
+        try:
+            with request_timings() as timings:
+                job.timings = timings
+                result = await self.service.answer(job.query, use_cache=job.use_cache)
+            job.result, job.status = result, SUCCEEDED
+        except asyncio.CancelledError:
+            job.status = CANCELLED
+            raise
+        except Exception as e:
+            logger.error("Job %s failed: %s", job.id, e)
+            job.error, job.status = str(e), FAILED
+        finally:
+            job.finished_at = time.time()
+            job.final_progress = job.progress()
+            self.counts[job.status] += 1
+
+    async def stop(self) -> None:
+        """Cancel the workers and any running job (app shutdown)."""
+        tasks = self._worker_tasks + [job.task for job in self._jobs.values() if job.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    # --------------------------
+    # Public API
+    # --------------------------
+    async def submit(self, query: str, priority: Optional[int] = None, use_cache: bool = True) -> Job:
+        """
+        Queue a query and return its job right away.
+
+        Raises:
+            JobQueueFullError: `max_queued` jobs are already waiting.
+        """
+        self._expire()
+        self._ensure_workers()
+        if self.queued() >= self.max_queued:
+            self.counts["rejected"] += 1
+            raise JobQueueFullError(self.max_queued)
+
+        priority = self.default_priority if priority is None else int(priority)
+        job = Job(id=uuid.uuid4().hex, query=query, priority=priority, use_cache=use_cache)
+        self._jobs[job.id] = job
+        self._queue.put_nowait((-priority, next(self._sequence), job.id))
+        self.counts["submitted"] += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """The job, or None if it never existed or its result expired."""
+        self._expire()
+        return self._jobs.get(job_id)
+
+    async def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a queued or running job (finished jobs are left as they are).
+
+        Returns:
+            Job: The job, or None if unknown/expired.
+        """
+        job = self.get(job_id)
+        if job is None or job.done:
+            return job
+        task = job.task
+        if job.status == RUNNING:
+            # _run marks it cancelled as the task unwinds
+            task.cancel()
+            await asyncio.wait([task])
+            return job
+
+        # Still queued, or picked by a worker whose task has not started yet:
+        # settle it here, a task cancelled before its first step never runs _run
+        job.status, job.finished_at = CANCELLED, time.time()
+        job.final_progress = job.progress()
+        self.counts[CANCELLED] += 1
+        if task is not None:
+            task.cancel()
+        return job
+
+    def queued(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.status == QUEUED)
+
+    def running(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.status == RUNNING)
+
+    def _expire(self) -> None:
+        """Forget finished jobs older than the result TTL."""
+        cutoff = time.time() - self.result_ttl_seconds
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.done and job.finished_at is not None and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+        self.counts["expired"] += len(expired)
+
+    def stats(self) -> dict:
+        self._expire()
+        return {"workers": self.workers, "max_queued": self.max_queued, "queued": self.queued(),
+                "running": self.running(), "kept": len(self._jobs), **self.counts}
@@ -0,0 +1,325 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+from exception.exception_handling import AllModelsFailedError
+from logger.logging import get_logger
+from utils.model_loader import ModelLoader
+
+logger = get_logger(__name__)
+
+# Provider responses worth failing over on (timeouts, conflicts, rate limits, upstream trouble)
+RETRYABLE_STATUSES = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+# SDK error class names that mean the same when no status code is attached
+RETRYABLE_NAME_PARTS = ("Timeout", "Connection", "RateLimit", "Overloaded", "InternalServer", "ServiceUnavailable")
+
+
+def is_retryable(error: BaseException) -> bool:
+    """True if another model may well succeed where `error` happened (429, 5xx, timeout...)."""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, concurrent.futures.TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is not None:
+        try:
+            return int(status) in RETRYABLE_STATUSES
+        except (TypeError, ValueError):
+            pass
+    name = type(error).__name__
+    return any(part in name for part in RETRYABLE_NAME_PARTS)
+
+
+class ModelHealth:
+    """Rolling latency / error window and cooldown state for one candidate model."""
+
+    def __init__(self, window: int = 50, cooldown_seconds: float = 30.0):
+        self.cooldown_seconds = cooldown_seconds
+        self.latencies = deque(maxlen=window)     # seconds, successful calls only
+        self.outcomes = deque(maxlen=window)      # True = success, False = failure
+        self.calls = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self._lock = threading.Lock()
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self.latencies.append(latency)
+            self.outcomes.append(True)
+            self.consecutive_failures = 0
+            self.cooldown_until = 0.0
+
+    def record_failure(self, retryable: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            self.failures += 1
+            self.outcomes.append(False)
+            if retryable:
+                # Back off longer while the candidate keeps failing (1x, 2x, 4x ... up to 8x)
+                self.consecutive_failures += 1
+                factor = 2 ** min(self.consecutive_failures - 1, 3)
+                self.cooldown_until = time.monotonic() + self.cooldown_seconds * factor
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.cooldown_until
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            if not self.outcomes:
+                return 0.0
+            return 1.0 - sum(self.outcomes) / len(self.outcomes)
+
+    def latency_quantile(self, quantile: float) -> Optional[float]:
+        with self._lock:
+            if not self.latencies:
+                return None
+            return float(np.quantile(np.array(self.latencies, dtype=float), quantile))
+
+    def stats(self) -> dict:
+        p50, p95 = self.latency_quantile(0.5), self.latency_quantile(0.95)
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "error_rate": round(self.error_rate, 3),
+            "p50_seconds": round(p50, 3) if p50 is not None else None,
+            "p95_seconds": round(p95, 3) if p95 is not None else None,
+            "available": self.available,
+            "cooldown_remaining_seconds": round(max(0.0, self.cooldown_until - time.monotonic()), 1),
+        }
+
+
+class ModelCandidate:
+    """One provider/model the router can send a call to."""
+
+    def __init__(self, name: str, llm, health: ModelHealth):
+        self.name = name
+        self.llm = llm
+        self.health = health
+
+
+class ModelRouter:
+    """
+    Routes each LLM call to the healthiest of several provider/model
+    candidates (config.yaml `router.candidates`).
+
+    - Candidates are ranked by rolling p50 latency, penalised by their recent
+      error rate; unexplored candidates use `initial_latency_seconds` and ties
+      keep the config order (the preferred provider first).
+    - On a retryable error (429, 5xx, timeout) the candidate goes into a
+      cooldown and the call fails over to the next one; other errors (bad
+      request, auth) are raised as-is. If every candidate fails,
+      AllModelsFailedError is raised.
+    - With hedging enabled, async calls start the next candidate when the
+      first one is slower than its usual latency quantile, and take whichever
+      answers first.
+
+    Exposes `invoke`/`ainvoke`/`bind_tools` like a chat model, so GraphBuilder
+    can use it in place of `llm.bind_tools(...)`.
+    """
+
+    def __init__(self, candidates: list, timeout_seconds: float = 60.0, error_penalty: float = 4.0,
+                 initial_latency_seconds: float = 2.0, hedge: Optional[dict] = None):
+        """
+        Args:
+            candidates (list): ModelCandidate objects in preference order.
+            timeout_seconds (float): Per-call timeout before failing over.
+            error_penalty (float): Score = p50 latency * (1 + error_penalty * error rate).
+            initial_latency_seconds (float): Assumed latency of a candidate with no samples yet.
+            hedge (dict): {"enabled", "quantile", "min_delay_seconds", "max_delay_seconds"}.
+        """
+        if not candidates:
+            raise ValueError("ModelRouter needs at least one candidate")
+        self.candidates = candidates
+        self.timeout_seconds = timeout_seconds
+        self.error_penalty = error_penalty
+        self.initial_latency_seconds = initial_latency_seconds
+        self.hedge = {"enabled": False, "quantile": 0.9, "min_delay_seconds": 0.5, "max_delay_seconds": 10.0,
+                      **(hedge or {})}
+        self.counters = {"calls": 0, "failovers": 0, "hedges": 0, "hedge_wins": 0, "exhausted": 0}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, settings: dict, preferred: Optional[str] = None) -> "ModelRouter":
+        """
+        Build a router from the config.yaml `router` section.
+
+        Args:
+            settings (dict): The `router` section.
+            preferred (str): Provider to try first while there is no latency data.
+        """
+        window = settings.get("window", 50)
+        cooldown = settings.get("cooldown_seconds", 30)
+        timeout = settings.get("timeout_seconds", 60)
+        entries = list(settings.get("candidates") or [{"provider": preferred or "groq"}])
+        if preferred:
+            # Stable sort: the preferred provider's candidates first, config order otherwise
+            entries.sort(key=lambda entry: entry.get("provider") != preferred)
+
+        candidates = []
+        for entry in entries:
+            provider = entry["provider"]
+            model_kwargs = dict(entry.get("settings") or {})
+            if provider != "fake":
+                # The router handles retries and timeouts across providers
+                model_kwargs.setdefault("timeout", timeout)
+                model_kwargs.setdefault("max_retries", 0)
+            loader = ModelLoader(model_provider=provider, model_name=entry.get("model"), model_kwargs=model_kwargs)
+            name = f"{provider}:{entry.get('model') or loader.config['llm'][provider].get('model', provider)}"
+            candidates.append(ModelCandidate(name, loader.load_llm(), ModelHealth(window, cooldown)))
+
+        return cls(candidates, timeout_seconds=timeout,
+                   error_penalty=settings.get("error_penalty", 4.0),
+                   initial_latency_seconds=settings.get("initial_latency_seconds", 2.0),
+                   hedge=settings.get("hedge"))
+
+    def bind_tools(self, tools, **kwargs) -> "ModelRouter":
+        """Router over the same candidates (and shared health stats) with tools bound to each model."""
+        bound = [ModelCandidate(c.name, c.llm.bind_tools(tools, **kwargs), c.health) for c in self.candidates]
+        router = ModelRouter(bound, self.timeout_seconds, self.error_penalty, self.initial_latency_seconds, self.hedge)
+        router.counters = self.counters
+        router._lock = self._lock
+        return router
+
+    # -------------------------
+    # Ranking
+    # -------------------------
+    def score(self, candidate: ModelCandidate) -> float:
+        latency = candidate.health.latency_quantile(0.5)
+        if latency is None:
+            latency = self.initial_latency_seconds
+        return latency * (1 + self.error_penalty * candidate.health.error_rate)
+
+    def ranked(self) -> list:
+        """Available candidates best-first, then the cooling-down ones (soonest back first) as a last resort."""
+        order = {id(c): i for i, c in enumerate(self.candidates)}
+        available = [c for c in self.candidates if c.health.available]
+        cooling = [c for c in self.candidates if not c.health.available]
+        available.sort(key=lambda c: (self.score(c), order[id(c)]))
+        cooling.sort(key=lambda c: c.health.cooldown_until)
+        return available + cooling
+
+    def hedge_delay(self, candidate: ModelCandidate) -> float:
+        """How long to wait on `candidate` before starting a hedged call."""
+        delay = candidate.health.latency_quantile(self.hedge["quantile"])
+        if delay is None:
+            delay = self.initial_latency_seconds
+        return min(max(delay, self.hedge["min_delay_seconds"]), self.hedge["max_delay_seconds"])
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def _failed(self, candidate: ModelCandidate, error: BaseException, errors: list) -> None:
+        """Record a failure; re-raise it unless another candidate should be tried."""
+        retryable = is_retryable(error)
+        candidate.health.record_failure(retryable)
+        if not retryable:
+            raise error
+        logger.warning("Model %s failed (%s: %s), failing over", candidate.name, type(error).__name__, error)
+        errors.append((candidate.name, error))
+
+    # -------------------------
+    # Sync calls
+    # -------------------------
+    def invoke(self, messages, config=None, **kwargs):
+        self._count("calls")
+        errors = []
+        for attempt, candidate in enumerate(self.ranked()):
+            if attempt:
+                self._count("failovers")
+            started = time.perf_counter()
+            try:
+                # Timeout comes from the provider client (set in from_config)
+                response = candidate.llm.invoke(messages, config, **kwargs)
+            except Exception as e:
+                self._failed(candidate, e, errors)
+                continue
+            candidate.health.record_success(time.perf_counter() - started)
+            return response
+        self._count("exhausted")
+        raise AllModelsFailedError(errors)
+
+    # -------------------------
+    # Async calls
+    # -------------------------
+    async def _acall(self, candidate: ModelCandidate, messages, config, kwargs):
+        started = time.perf_counter()
+        response = await asyncio.wait_for(candidate.llm.ainvoke(messages, config, **kwargs), self.timeout_seconds)
+        candidate.health.record_success(time.perf_counter() - started)
+        return response
+
+    async def ainvoke(self, messages, config=None, **kwargs):
+        self._count("calls")
+        errors = []
+        queue = deque(self.ranked())
+        first = True
+        while queue:
+            candidate = queue.popleft()
+            if not first:
+                self._count("failovers")
+            first = False
+
+            if self.hedge["enabled"] and queue:
+                response = await self._ahedged(candidate, queue, messages, config, kwargs, errors)
+                if response is not None:
+                    return response
+                continue
+
+            try:
+                return await self._acall(candidate, messages, config, kwargs)
+            except Exception as e:
+                self._failed(candidate, e, errors)
+        self._count("exhausted")
+        raise AllModelsFailedError(errors)
+
+    async def _ahedged(self, primary: ModelCandidate, queue: deque, messages, config, kwargs, errors: list):
+        """
+        Run `primary`; if it has not answered after its hedge delay, also run the
+        next candidate from `queue` and return the first success. Returns None
+        when every started call failed with a retryable error.
+        """
+        running = {asyncio.ensure_future(self._acall(primary, messages, config, kwargs)): primary}
+        hedge_at = time.monotonic() + self.hedge_delay(primary)
+        try:
+            while running:
+                timeout = None
+                if queue and len(running) == 1 and primary in running.values():
+                    timeout = max(0.0, hedge_at - time.monotonic())
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    # Primary is slow: start the hedge
+                    backup = queue.popleft()
+                    self._count("hedges")
+                    logger.info("Hedging slow model %s with %s", primary.name, backup.name)
+                    running[asyncio.ensure_future(self._acall(backup, messages, config, kwargs))] = backup
+                    continue
+
+                for task in done:
+                    candidate = running.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        if candidate is not primary:
+                            self._count("hedge_wins")
+                        return task.result()
+                    self._failed(candidate, error, errors)
+            return None
+        finally:
+            for task in running:
+                task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "ranking": [c.name for c in self.ranked()],
+            "candidates": {c.name: {**c.health.stats(), "score": round(self.score(c), 3)} for c in self.candidates},
+        }
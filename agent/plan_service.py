@@ -0,0 +1,123 @@
+import time
+from typing import Optional
+
+from langchain_core.messages import AIMessage
+
+from agent.graph_registry import graph_registry   # Process-level compiled graph cache
+from agent.prefetch import PREFETCH_ID_PREFIX
+from utils.cache import SingleFlight
+from utils.metrics import AGENT_ITERATIONS, QUERY_SECONDS, current_timings
+from utils.plan_cache import PlanCache
+
+
+def count_iterations(messages: list) -> int:
+    """LLM turns in a finished run (the synthetic prefetch message is not one)."""
+    return sum(
+        1 for message in messages
+        if isinstance(message, AIMessage)
+        and not any(str(call.get("id", "")).startswith(PREFETCH_ID_PREFIX) for call in message.tool_calls)
+    )
+
+
+def coalesce_key(query: str) -> str:
+    """
+    Requests with the same key share one agent run: the query itself with
+    only case and whitespace normalized (a looser match could hand one caller
+    the plan for another trip).
+    """
+    return " ".join(query.lower().split())
+
+
+class PlanService:
+    """
+    Answers travel queries with the compiled agent graph.
+
+    Shared by the API routes and the batch runner so both go through the same
+    plan cache and in-flight coalescing: a cached plan is served directly, and
+    an identical query already running is joined instead of started again.
+    """
+
+    def __init__(self, model_provider: str = "groq", execution_mode: str = "async",
+                 plan_cache: Optional[PlanCache] = None):
+        """
+        Args:
+            model_provider (str): LLM provider passed to the graph registry.
+            execution_mode (str): "async" (ainvoke) or "sync" (blocking invoke).
+            plan_cache (PlanCache): Whole-plan answer cache (None disables it).
+        """
+        self.model_provider = model_provider
+        self.execution_mode = execution_mode
+        self.plan_cache = plan_cache
+        self.flights = SingleFlight()
+
+    async def run_agent(self, query: str) -> str:
+        """
+        Run the agent graph for one query and return the final answer.
+        """
+        # Reuse the compiled agent workflow (built once per process)
+        react_app = await graph_registry.aget(self.model_provider)
+
+        # ------------------------------
+        # Pass user query to the agent
+        # ------------------------------
+        messages = {"messages": [query]}   # Wrap query in expected format
+        if self.execution_mode == "sync":
+            output = react_app.invoke(messages)
+        else:
+            output = await react_app.ainvoke(messages)
+
+        # ------------------------------
+        # Extract final answer
+        # ------------------------------
+        if isinstance(output, dict) and "messages" in output:
+            AGENT_ITERATIONS.observe(count_iterations(output["messages"]))
+            # Take the last AI response
+            return output["messages"][-1].content
+        return str(output)
+
+    async def answer(self, query: str, use_cache: bool = True) -> dict:
+        """
+        Answer one query.
+
+        Args:
+            query (str): The user's travel request.
+            use_cache (bool): False skips the plan cache lookup (the new answer is still stored).
+
+        Returns:
+            dict: {"answer": str} plus "cached": "exact" | "near" when served from the plan cache,
+            or "coalesced": True when it joined an identical query's run.
+        """
+        started = time.perf_counter()
+        # ------------------------------
+        # Serve a cached plan for the same (or nearly the same) query
+        # ------------------------------
+        if self.plan_cache is not None:
+            if use_cache:
+                cached = self.plan_cache.get(query)
+                if cached is not None:
+                    answer, match = cached
+                    QUERY_SECONDS.observe(time.perf_counter() - started, source=f"cache_{match}")
+                    return {"answer": answer, "cached": match}
+            else:
+                self.plan_cache.record_bypass()
+
+        # Join an identical query that is already running, else start the agent
+        key = coalesce_key(query)
+        source = "coalesced" if self.flights.in_flight(key) else "agent"
+        answer, run_timings = await self.flights.ado(key, lambda: self._shared_run(query))
+        QUERY_SECONDS.observe(time.perf_counter() - started, source=source)
+
+        if answer and self.plan_cache is not None:
+            self.plan_cache.set(query, answer)
+        if source == "coalesced":
+            # The agent's spans were recorded in the leader's request: report them here too
+            timings = current_timings()
+            if timings is not None and run_timings is not None and run_timings is not timings:
+                timings.add_spans_from(run_timings)
+            return {"answer": answer, "coalesced": True}
+        return {"answer": answer}
+
+    async def _shared_run(self, query: str) -> tuple:
+        """The single-flight run: the answer plus the timings of the request that started it."""
+        answer = await self.run_agent(query)
+        return answer, current_timings()
@@ -0,0 +1,242 @@
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph import MessagesState
+
+from agent.tool_executor import ParallelToolNode
+from logger.logging import get_logger
+from utils.metrics import AGENT_NODE_SECONDS, timed
+
+logger = get_logger(__name__)
+
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "fourteen": 14,
+}
+
+# ISO codes accepted as-is, plus common names and symbols
+CURRENCY_CODES = {
+    "USD", "EUR", "GBP", "INR", "PKR", "AED", "SAR", "JPY", "CNY", "AUD", "CAD", "CHF", "SGD",
+    "THB", "MYR", "IDR", "LKR", "NPR", "BDT", "TRY", "NZD", "HKD", "KRW", "QAR", "EGP",
+}
+CURRENCY_NAMES = {
+    "indian rupee": "INR", "pakistani rupee": "PKR", "sri lankan rupee": "LKR", "nepalese rupee": "NPR",
+    "dollar": "USD", "euro": "EUR", "pound": "GBP", "yen": "JPY", "dirham": "AED", "riyal": "SAR",
+    "baht": "THB", "ringgit": "MYR", "yuan": "CNY", "lira": "TRY", "taka": "BDT",
+}
+CURRENCY_SYMBOLS = {"₹": "INR", "€": "EUR", "£": "GBP", "¥": "JPY", "$": "USD"}
+
+# Words that end a destination phrase or can never be one
+_BOUNDARY_WORDS = {
+    "for", "in", "with", "on", "during", "from", "and", "under", "next", "this", "within", "by",
+    "over", "at", "budget", "trip", "tour", "vacation", "holiday", "itinerary", "plan", "days", "day",
+    "nights", "night", "weeks", "week", "please", "using", "including",
+}
+# Words that can follow "to" before the place ("want to visit Kyoto", "go to Rome")
+_LEADING_VERBS = {"visit", "visiting", "go", "travel", "explore", "see", "fly", "plan", "to"}
+_MONTHS = {
+    "january", "february", "march", "april", "may", "june", "july", "august", "september",
+    "october", "november", "december", "summer", "winter", "spring", "autumn",
+}
+# First words of multi-word place names, continued even in lowercase ("new york")
+_PLACE_PREFIXES = {"new", "san", "santa", "los", "las", "hong", "kuala", "rio", "sri", "abu", "saint", "st", "buenos",
+                   "cape", "ho", "tel", "costa", "el", "le", "la"}
+_NOT_PLACES = _BOUNDARY_WORDS | _MONTHS | {
+    "a", "an", "the", "my", "our", "me", "us", "i", "create", "make", "give", "suggest", "weekend",
+    "family", "honeymoon", "solo", "cheap", "luxury", "detailed", "complete", "travel",
+}
+
+_DAYS_PATTERN = re.compile(
+    r"\b(\d+|an?|" + "|".join(NUMBER_WORDS) + r")\s*-?\s*(day|night|week)s?\b", re.IGNORECASE
+)
+_PLACE_WORD = r"[^\W\d_][\w'.-]*"
+# Lookahead, so one candidate cannot swallow the next trigger word
+# ("to travel in December to Paris" still yields "to Paris")
+_DESTINATION_PATTERN = re.compile(
+    r"\b(?:to|in|visit|visiting|around|explore|exploring)\s+"
+    rf"(?=(?P<place>{_PLACE_WORD}(?:(?:\s+|\s*,\s*){_PLACE_WORD}){{0,3}}))",
+    re.IGNORECASE,
+)
+
+# "<N> day <Place> trip" phrasing ("5 day Goa trip plan", "a 3-night Kyoto itinerary");
+# without a trigger word only a capitalized place counts
+_LENGTH_PLACE_PATTERN = re.compile(
+    r"\b(?:\d+|an?|" + "|".join(NUMBER_WORDS) + r")\s*-?\s*(?:day|night|week)s?\s+"
+    rf"(?P<place>{_PLACE_WORD}(?:\s+{_PLACE_WORD}){{0,3}}?)\s+"
+    r"(?:trip|tour|vacation|holiday|itinerary|getaway|break)\b",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True)
+class TripRequest:
+    """What the local parser could read from a travel query."""
+    destination: Optional[str] = None
+    days: Optional[int] = None
+    currency: Optional[str] = None
+
+
+def _clean_place(phrase: str, lowercase_query: bool = False) -> Optional[str]:
+    """
+    Cut a candidate phrase at the first boundary word; None if nothing
+    place-like is left. Words after the first must be capitalized ("New
+    York", but not "Bali cost"); in an all-lowercase query only the first
+    word is taken, unless it starts a known multi-word name ("new york").
+    A leading "the" is dropped before a capitalized name ("the Maldives").
+    """
+    words = []
+    tokens = re.split(r"\s+", phrase.replace(",", " , ").strip())
+    while tokens and tokens[0].lower() in _LEADING_VERBS:
+        tokens.pop(0)
+    if len(tokens) > 1 and tokens[0].lower() == "the":
+        # "the Maldives", but not "the beach" (nor anything in a lowercase query)
+        tokens.pop(0)
+        if lowercase_query or not tokens[0][0].isupper():
+            return None
+    for word in tokens:
+        if word.lower() in _BOUNDARY_WORDS or word.lower() in _MONTHS:
+            break
+        if words and word != "," and words[-1].lower() not in _PLACE_PREFIXES:
+            if lowercase_query or not word[0].isupper():
+                break
+        words.append(word)
+    place = " ".join(words).replace(" , ", ", ").strip(" ,.")
+    if not place or place.lower() in _NOT_PLACES or place.upper() in CURRENCY_CODES:
+        return None
+    # Lowercase queries ("trip to goa") are title-cased for the providers
+    return place if any(ch.isupper() for ch in place) else place.title()
+
+
+def parse_trip_request(query: str) -> TripRequest:
+    """
+    Extract destination, trip length (days) and currency from a query with
+    regular expressions only (no LLM call).
+
+    "Plan a trip to Goa for 5 days in INR" -> TripRequest("Goa", 5, "INR")
+
+    Only a place after "to", "in", "visit", ... (or between a trip length
+    and "trip": "5 day Goa trip") counts as the destination; without one
+    nothing is prefetched (a wrong guess costs paid lookups and
+    misleads the first LLM turn).
+    """
+    destination = None
+    lowercase_query = query == query.lower()
+    for match in _DESTINATION_PATTERN.finditer(query):
+        destination = _clean_place(match.group("place"), lowercase_query)
+        if destination:
+            break
+    if destination is None:
+        match = _LENGTH_PLACE_PATTERN.search(query)
+        if match and match.group("place")[0].isupper():
+            destination = _clean_place(match.group("place"), lowercase_query)
+
+    days = None
+    match = _DAYS_PATTERN.search(query)
+    if match:
+        count = match.group(1).lower()
+        count = int(count) if count.isdigit() else 1 if count in ("a", "an") else NUMBER_WORDS[count]
+        unit = match.group(2).lower()
+        days = count * 7 if unit == "week" else count + 1 if unit == "night" else count
+
+    currency = None
+    for code in re.findall(r"\b([A-Za-z]{3})\b", query):
+        # "try" is also an English word, so only the uppercase code counts
+        if code.upper() in CURRENCY_CODES and (code.isupper() or code.lower() != "try"):
+            currency = code.upper()
+            break
+    if currency is None:
+        lowered = query.lower()
+        currency = next((code for name, code in CURRENCY_NAMES.items() if re.search(rf"\b{name}s?\b", lowered)), None)
+    if currency is None:
+        currency = next((code for symbol, code in CURRENCY_SYMBOLS.items() if symbol in query), None)
+
+    return TripRequest(destination, days, currency)
+
+
+# Tool call ids of the synthetic prefetch message (not an LLM turn)
+PREFETCH_ID_PREFIX = "prefetch_"
+
+# Standard lookups: name -> (tool name, argument builder)
+LOOKUPS = {
+    "current_weather": ("get_current_weather", lambda trip: {"city": trip.destination}),
+    "forecast": ("get_weather_forecast", lambda trip: {"city": trip.destination}),
+    "attractions": ("search_attractions", lambda trip: {"place": trip.destination}),
+    "restaurants": ("search_restaurants", lambda trip: {"place": trip.destination}),
+    "activities": ("search_activities", lambda trip: {"place": trip.destination}),
+    "transportation": ("search_transportation", lambda trip: {"place": trip.destination}),
+    # 1 USD in the requested currency gives the agent the rate for its estimates
+    "exchange_rate": ("convert_currency",
+                      lambda trip: {"amount": 1, "from_currency": "USD", "to_currency": trip.currency}
+                      if trip.currency and trip.currency != "USD" else None),
+}
+
+
+class PrefetchNode:
+    """
+    Graph node placed before the agent's first LLM call.
+
+    Parses the user query locally and, when it names a destination, runs the
+    standard lookups concurrently through the tool node. The results are added
+    to the state as one synthetic assistant tool-call message followed by the
+    tool results, exactly as if the LLM had requested them, so the first LLM
+    turn can already write (most of) the plan.
+    """
+
+    def __init__(self, tool_node: ParallelToolNode, lookups: Optional[list] = None):
+        """
+        Args:
+            tool_node (ParallelToolNode): Executes the lookups (concurrency, timeouts, errors).
+            lookups (list): Names from LOOKUPS to run (default: all).
+        """
+        self.tool_node = tool_node
+        self.lookups = [name for name in (lookups or LOOKUPS) if name in LOOKUPS]
+
+    def _prefetch_message(self, state: MessagesState) -> Optional[AIMessage]:
+        messages = state["messages"]
+        # Only before the first LLM turn of a conversation
+        if any(isinstance(message, AIMessage) for message in messages):
+            return None
+        query = next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), None)
+        if not isinstance(query, str):
+            return None
+
+        trip = parse_trip_request(query)
+        if trip.destination is None:
+            logger.info("Prefetch skipped: no destination found in query")
+            return None
+
+        tool_calls = []
+        for name in self.lookups:
+            tool_name, build_args = LOOKUPS[name]
+            args = build_args(trip)
+            if args is not None and tool_name in self.tool_node.tools_by_name:
+                tool_calls.append({"name": tool_name, "args": args, "id": f"{PREFETCH_ID_PREFIX}{len(tool_calls)}"})
+        if not tool_calls:
+            return None
+
+        details = ", ".join(part for part in (
+            f"{trip.days} days" if trip.days else None,
+            f"budget in {trip.currency}" if trip.currency else None,
+        ) if part)
+        logger.info("Prefetching %d lookups for %s", len(tool_calls), trip.destination)
+        content = f"Fetching standard trip data for {trip.destination}" + (f" ({details})" if details else "") + "."
+        return AIMessage(content=content, tool_calls=tool_calls)
+
+    def invoke(self, state: MessagesState, config: Optional[RunnableConfig] = None) -> dict:
+        with timed(AGENT_NODE_SECONDS, "node", "prefetch", node="prefetch"):
+            message = self._prefetch_message(state)
+            if message is None:
+                return {"messages": []}
+            results = self.tool_node.invoke({"messages": [message]}, config)
+            return {"messages": [message, *results["messages"]]}
+
+    async def ainvoke(self, state: MessagesState, config: Optional[RunnableConfig] = None) -> dict:
+        with timed(AGENT_NODE_SECONDS, "node", "prefetch", node="prefetch"):
+            message = self._prefetch_message(state)
+            if message is None:
+                return {"messages": []}
+            results = await self.tool_node.ainvoke({"messages": [message]}, config)
+            return {"messages": [message, *results["messages"]]}
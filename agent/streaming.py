@@ -0,0 +1,141 @@
+import asyncio
+import json
+from typing import AsyncIterator, Callable
+
+
+def format_sse(event: str, data: dict) -> str:
+    """
+    Format one server-sent event.
+
+    Args:
+        event (str): SSE event name (e.g. "token", "tool_start").
+        data (dict): JSON-serializable payload.
+
+    Returns:
+        str: The encoded event, terminated by a blank line.
+    """
+    payload = json.dumps(data, default=str, ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+async def stream_plan_events(react_app, query: str) -> AsyncIterator[str]:
+    """
+    Run the compiled agent graph with `astream_events` and translate the
+    LangGraph events into SSE messages for the front end.
+
+    Emitted events:
+        - tool_start: {"name", "input"} when a tool begins
+        - tool_end:   {"name", "output"} when a tool returns
+        - token:      {"content"} for every LLM token
+        - final:      {"answer"} with the full answer, always last on success
+        - error:      {"error"} if the run fails midway
+
+    Args:
+        react_app: Compiled graph from `GraphBuilder.build_graph`.
+        query (str): The user's travel request.
+    """
+    final_answer = ""
+
+    try:
+        async for event in react_app.astream_events({"messages": [query]}, version="v2"):
+            kind = event["event"]
+            data = event.get("data", {})
+
+            if kind == "on_chat_model_stream":
+                content = data["chunk"].content
+                if content:
+                    yield format_sse("token", {"content": content})
+
+            elif kind == "on_chat_model_end":
+                # The last model turn (the one without tool calls) is the answer
+                output = data.get("output")
+                if output is not None and not getattr(output, "tool_calls", None):
+                    final_answer = output.content
+
+            elif kind == "on_tool_start":
+                yield format_sse("tool_start", {"name": event["name"], "input": data.get("input")})
+
+            elif kind == "on_tool_end":
+                output = data.get("output")
+                yield format_sse("tool_end", {"name": event["name"], "output": getattr(output, "content", output)})
+
+        yield format_sse("final", {"answer": final_answer})
+
+    except Exception as e:
+        # Headers are already sent, so errors are reported in-band
+        yield format_sse("error", {"error": str(e)})
+
+
+class _Broadcast:
+    """One running event stream whose chunks are replayed to every subscriber."""
+
+    def __init__(self, source: AsyncIterator[str]):
+        self.chunks = []
+        self.done = False
+        self._changed = asyncio.Condition()
+        # The run belongs to no single client, so a disconnect does not cut it short for others
+        self.task = asyncio.ensure_future(self._pump(source))
+
+    async def _pump(self, source: AsyncIterator[str]) -> None:
+        try:
+            async for chunk in source:
+                async with self._changed:
+                    self.chunks.append(chunk)
+                    self._changed.notify_all()
+        finally:
+            async with self._changed:
+                self.done = True
+                self._changed.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        """Yield every chunk from the start, then follow the live stream."""
+        position = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: position < len(self.chunks) or self.done)
+                batch = self.chunks[position:]
+                finished = self.done
+            for chunk in batch:
+                yield chunk
+            position += len(batch)
+            if finished and position >= len(self.chunks):
+                return
+
+
+class StreamCoalescer:
+    """
+    Share one agent stream between identical in-flight requests.
+
+    The first request for a key starts the stream; requests arriving while it
+    runs attach to it and receive the same events (already-sent events are
+    replayed first) instead of starting another graph run.
+    """
+
+    def __init__(self):
+        self._streams = {}   # (event loop, key) -> _Broadcast
+        self.started = 0
+        self.coalesced = 0
+
+    def subscribe(self, key, source_fn: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """
+        Args:
+            key: Coalescing key (e.g. the normalized query).
+            source_fn: Called only when no stream for `key` is running; returns the SSE generator.
+        """
+        key = (asyncio.get_running_loop(), key)
+        broadcast = self._streams.get(key)
+        if broadcast is None:
+            broadcast = _Broadcast(source_fn())
+            self._streams[key] = broadcast
+            self.started += 1
+            broadcast.task.add_done_callback(lambda _: self._forget(key, broadcast))
+        else:
+            self.coalesced += 1
+        return broadcast.subscribe()
+
+    def _forget(self, key, broadcast) -> None:
+        if self._streams.get(key) is broadcast:
+            del self._streams[key]
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._streams), "executions": self.started, "coalesced": self.coalesced}
@@ -0,0 +1,145 @@
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Optional
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+
+from logger.logging import get_logger
+from utils.metrics import TOOL_CALL_SECONDS, timed
+
+logger = get_logger(__name__)
+
+
+class ParallelToolNode:
+    """
+    Graph node that executes every tool call of the last AI message concurrently.
+
+    - At most `max_concurrency` tools run at the same time within one step.
+    - Each tool gets its own timeout (`tool_timeouts[name]`, else `timeout_seconds`).
+    - Results are returned as ToolMessages in the same order as the tool calls.
+    - A tool that raises or times out yields an error ToolMessage instead of
+      failing the whole step, so the LLM still sees the other results.
+    - Every call is timed (travel_tool_call_seconds, per-request breakdown).
+    """
+
+    def __init__(self, tools: List, max_concurrency: int = 6, timeout_seconds: float = 30.0,
+                 tool_timeouts: Optional[dict] = None):
+        self.tools_by_name = {t.name: t for t in tools}
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.timeout_seconds = float(timeout_seconds)
+        self.tool_timeouts = dict(tool_timeouts or {})
+
+    def _timeout_for(self, tool_name: str) -> float:
+        return float(self.tool_timeouts.get(tool_name, self.timeout_seconds))
+
+    @staticmethod
+    def _tool_calls(state) -> list:
+        messages = state["messages"] if isinstance(state, dict) else state
+        last_message = messages[-1]
+        if not isinstance(last_message, AIMessage):
+            raise ValueError("ParallelToolNode expects the last message to be an AIMessage with tool calls.")
+        return last_message.tool_calls
+
+    @staticmethod
+    def _error_message(call: dict, error: str) -> ToolMessage:
+        return ToolMessage(content=f"Error: {error}", name=call["name"], tool_call_id=call["id"], status="error")
+
+    @staticmethod
+    def _as_tool_call(call: dict) -> dict:
+        # Invoking a tool with a ToolCall dict makes it return a ToolMessage
+        return {**call, "type": "tool_call"}
+
+    def _run_tool(self, call: dict, config: Optional[RunnableConfig]) -> ToolMessage:
+        tool = self.tools_by_name.get(call["name"])
+        if tool is None:
+            return self._error_message(call, f"{call['name']} is not a valid tool.")
+        with timed(TOOL_CALL_SECONDS, "tool", call["name"], tool=call["name"]) as timing:
+            try:
+                result = tool.invoke(self._as_tool_call(call), config)
+            except Exception as e:
+                logger.warning("Tool %s failed: %s", call["name"], e)
+                timing["labels"]["status"] = "error"
+                return self._error_message(call, repr(e))
+            timing["labels"]["status"] = "error" if getattr(result, "status", None) == "error" else "ok"
+            return result
+
+    async def _arun_tool(self, call: dict, config: Optional[RunnableConfig],
+                         semaphore: asyncio.Semaphore) -> ToolMessage:
+        tool = self.tools_by_name.get(call["name"])
+        if tool is None:
+            return self._error_message(call, f"{call['name']} is not a valid tool.")
+
+        async with semaphore:
+            timeout = self._timeout_for(call["name"])
+            with timed(TOOL_CALL_SECONDS, "tool", call["name"], tool=call["name"]) as timing:
+                try:
+                    result = await asyncio.wait_for(tool.ainvoke(self._as_tool_call(call), config), timeout)
+                except asyncio.TimeoutError:
+                    logger.warning("Tool %s timed out after %.1fs", call["name"], timeout)
+                    timing["labels"]["status"] = "timeout"
+                    return self._error_message(call, f"{call['name']} timed out after {timeout:g}s.")
+                except Exception as e:
+                    logger.warning("Tool %s failed: %s", call["name"], e)
+                    timing["labels"]["status"] = "error"
+                    return self._error_message(call, repr(e))
+                timing["labels"]["status"] = "error" if getattr(result, "status", None) == "error" else "ok"
+                return result
+
+    def invoke(self, state, config: Optional[RunnableConfig] = None) -> dict:
+        """
+        Run the tool calls on a thread pool, at most `max_concurrency` at a
+        time (used by graph.invoke).
+
+        Threads cannot be interrupted, so a timed-out tool is abandoned: its
+        result is replaced by an error message, its slot goes to the next
+        queued call on a fresh thread, and the step moves on.
+        """
+        calls = self._tool_calls(state)
+        if not calls:
+            return {"messages": []}
+
+        results = [None] * len(calls)
+        queued = list(enumerate(calls))
+        running = {}   # future -> (call index, deadline)
+
+        # One thread per call at most: an abandoned tool keeps its thread, so a
+        # hung tool can never starve the calls queued behind it
+        executor = ThreadPoolExecutor(max_workers=len(calls))
+        try:
+            while queued or running:
+                while queued and len(running) < self.max_concurrency:
+                    index, call = queued.pop(0)
+                    # Each worker runs in a copy of the caller's context (per-request timings)
+                    future = executor.submit(contextvars.copy_context().run, self._run_tool, call, config)
+                    running[future] = (index, time.monotonic() + self._timeout_for(call["name"]))
+
+                # Wake up at the earliest deadline of a running tool
+                wait_timeout = max(0.0, min(deadline for _, deadline in running.values()) - time.monotonic())
+                done, _ = wait(running, timeout=wait_timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, _ = running.pop(future)
+                    results[index] = future.result()
+
+                now = time.monotonic()
+                for future, (index, deadline) in list(running.items()):
+                    if now >= deadline:
+                        name, timeout = calls[index]["name"], self._timeout_for(calls[index]["name"])
+                        logger.warning("Tool %s timed out after %.1fs", name, timeout)
+                        results[index] = self._error_message(calls[index], f"{name} timed out after {timeout:g}s.")
+                        del running[future]
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return {"messages": results}
+
+    async def ainvoke(self, state, config: Optional[RunnableConfig] = None) -> dict:
+        """Run the tool calls concurrently on the event loop (used by graph.ainvoke)."""
+        calls = self._tool_calls(state)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        # gather() keeps the results in tool-call order
+        results = await asyncio.gather(*(self._arun_tool(call, config, semaphore) for call in calls))
+        return {"messages": list(results)}
@@ -1,8 +1,34 @@
 import streamlit as st
 import requests
 import datetime
+import time
 
 BASE_URL = "http://localhost:8000"  # Backend endpoint
+REQUEST_TIMEOUT = (5, 30)           # (connect, read) seconds per backend call
+JOB_TIMEOUT_SECONDS = 600           # give up waiting for a plan after this long
+POLL_INTERVAL_SECONDS = 2
+
+
+def wait_for_plan(query: str) -> requests.Response:
+    """
+    Submit the query as a background job and poll until it finishes, so no
+    HTTP request stays open for the whole agent run.
+    """
+    response = requests.post(f"{BASE_URL}/jobs", json={"query": query}, timeout=REQUEST_TIMEOUT)
+    if response.status_code != 202:
+        return response
+
+    job_id = response.json()["id"]
+    deadline = time.monotonic() + JOB_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL_SECONDS)
+        response = requests.get(f"{BASE_URL}/jobs/{job_id}", timeout=REQUEST_TIMEOUT)
+        if response.status_code != 200 or response.json().get("status") in ("succeeded", "failed", "cancelled"):
+            return response
+
+    # Nobody is waiting for the answer any more
+    requests.delete(f"{BASE_URL}/jobs/{job_id}", timeout=REQUEST_TIMEOUT)
+    raise TimeoutError(f"No plan after {JOB_TIMEOUT_SECONDS} seconds")
 
 # ---------------------------
 # Page Config
@@ -41,11 +67,10 @@ if submit_button and user_input.strip():
     try:
         # Show spinner while waiting for backend
         with st.spinner("Bot is thinking..."):
-            # FIXED: Send correct payload (backend expects "query")
-            payload = {"query": user_input}
-            response = requests.post(f"{BASE_URL}/query", json=payload)
+            # Run the plan as a background job (POST /jobs, then poll GET /jobs/{id})
+            response = wait_for_plan(user_input)
 
-        if response.status_code == 200:
+        if response.status_code == 200 and response.json().get("status") == "succeeded":
             answer = response.json().get("answer", "No answer returned.")
 
             # Append conversation history
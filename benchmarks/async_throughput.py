@@ -0,0 +1,92 @@
+"""
+Concurrent throughput benchmark for the /query endpoint.
+
+Fires `--requests` queries at a running server with `--concurrency` clients in
+flight and reports throughput and latency percentiles. Run it once against a
+worker started in each execution mode to compare the blocking and async paths:
+
+    EXECUTION_MODE=sync  uvicorn main:app --port 8000 --workers 1
+    EXECUTION_MODE=async uvicorn main:app --port 8001 --workers 1
+
+    python -m benchmarks.async_throughput --url http://localhost:8000 --label sync
+    python -m benchmarks.async_throughput --url http://localhost:8001 --label async
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+DEFAULT_QUERY = "Plan a trip to Goa for 5 days"
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile of a list of numbers (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_benchmark(url: str, query: str, total_requests: int, concurrency: int, timeout: float) -> dict:
+    """
+    Send `total_requests` POST /query calls with at most `concurrency` in flight.
+
+    Returns:
+        dict: Throughput, error count and latency percentiles (seconds).
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async with httpx.AsyncClient(base_url=url, timeout=timeout) as client:
+
+        async def one_request():
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.post("/query", json={"query": query})
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one_request() for _ in range(total_requests)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total_requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total_requests / elapsed, 3) if elapsed else 0.0,
+        "latency_mean_s": round(statistics.mean(latencies), 3) if latencies else 0.0,
+        "latency_p50_s": round(percentile(latencies, 50), 3),
+        "latency_p95_s": round(percentile(latencies, 95), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent /query throughput benchmark")
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of the running server")
+    parser.add_argument("--query", default=DEFAULT_QUERY, help="Query text sent on every request")
+    parser.add_argument("--requests", type=int, default=20, help="Total number of requests")
+    parser.add_argument("--concurrency", type=int, default=10, help="Requests in flight at once")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Per-request timeout in seconds")
+    parser.add_argument("--label", default="", help="Label printed with the results (e.g. sync/async)")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_benchmark(args.url, args.query, args.requests, args.concurrency, args.timeout))
+
+    print(f"== /query throughput {args.label}".rstrip())
+    for key, value in result.items():
+        print(f"{key:>16}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Cold-start report: import time of the app's entry modules, measured with
+`python -X importtime` in a fresh interpreter per run (so nothing is cached
+in sys.modules), plus which provider SDKs each import pulled in.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --module main --runs 5 --top 15
+    python -m benchmarks.import_time --build groq     # also time GraphBuilder("groq")
+
+Provider SDKs (langchain_groq, langchain_openai, langchain_google_community,
+langchain_community) should only show up for `--build` with that provider or
+tool enabled, never for the plain imports.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+DEFAULT_MODULES = ["agent.agentic_workflow", "main", "app"]
+PROVIDER_SDKS = ["langchain_groq", "langchain_openai", "langchain_google_community", "langchain_community"]
+
+BUILD_SNIPPET = """
+import time
+started = time.perf_counter()
+from agent.agentic_workflow import GraphBuilder
+GraphBuilder(model_provider={provider!r})()
+print("BUILD_SECONDS", time.perf_counter() - started)
+"""
+
+
+def parse_importtime(stderr: str) -> dict:
+    """`-X importtime` output -> {module: (self microseconds, cumulative microseconds)}."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            times.setdefault(name.strip(), (int(self_us), int(cumulative_us)))
+        except ValueError:
+            continue  # header line
+    return times
+
+
+def package_totals(times: dict) -> dict:
+    """Self time summed per top-level package (e.g. every langchain_core.* module)."""
+    totals = {}
+    for name, (self_us, _) in times.items():
+        root = name.split(".")[0]
+        totals[root] = totals.get(root, 0) + self_us
+    return totals
+
+
+def run_once(code: str) -> tuple:
+    """Run `code` in a fresh interpreter; returns (importtime dict, stdout)."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed")
+    return parse_importtime(result.stderr), result.stdout
+
+
+def report_module(module: str, runs: int, top: int) -> None:
+    totals, samples = [], []
+    for _ in range(runs):
+        times, _ = run_once(f"import {module}")
+        totals.append(times.get(module, (0, 0))[1] / 1e6)
+        samples.append(times)
+
+    last = samples[-1]
+    loaded_sdks = [sdk for sdk in PROVIDER_SDKS if sdk in last]
+    print(f"\n{module}: median {statistics.median(totals):.3f}s over {runs} runs "
+          f"(min {min(totals):.3f}s, max {max(totals):.3f}s)")
+    print(f"  provider SDKs imported: {', '.join(loaded_sdks) or 'none'}")
+
+    # Heaviest top-level packages (self time of all their modules)
+    packages = package_totals(last)
+    print("  heaviest packages:")
+    for name, us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"    {name:<32}{us / 1e6:>8.3f}s")
+
+
+def report_build(provider: str, runs: int) -> None:
+    seconds, loaded = [], []
+    for _ in range(runs):
+        times, stdout = run_once(BUILD_SNIPPET.format(provider=provider))
+        line = next((l for l in stdout.splitlines() if l.startswith("BUILD_SECONDS")), None)
+        seconds.append(float(line.split()[1]) if line else float("nan"))
+        loaded = [sdk for sdk in PROVIDER_SDKS if sdk in times]
+    print(f"\nGraphBuilder({provider!r}) import + build: median {statistics.median(seconds):.3f}s over {runs} runs")
+    print(f"  provider SDKs imported: {', '.join(loaded) or 'none'}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import-time (cold start) report of the app modules.")
+    parser.add_argument("--module", action="append", help=f"Module to import (default: {', '.join(DEFAULT_MODULES)})")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per module (median reported)")
+    parser.add_argument("--top", type=int, default=10, help="Heaviest packages listed per module")
+    parser.add_argument("--build", help='Also time building the graph for a provider ("groq", "openai", "fake", "router")')
+    args = parser.parse_args()
+
+    for module in args.module or DEFAULT_MODULES:
+        try:
+            report_module(module, args.runs, args.top)
+        except RuntimeError as e:
+            print(f"\n{module}: import failed ({e})")
+    if args.build:
+        try:
+            report_build(args.build, args.runs)
+        except RuntimeError as e:
+            print(f"\nGraphBuilder({args.build!r}) failed ({e})")
+
+
+if __name__ == "__main__":
+    main()
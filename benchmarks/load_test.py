@@ -0,0 +1,253 @@
+"""
+Offline load test of POST /query: no API keys, no network.
+
+The app runs in-process (ASGI) with the scripted fake LLM (provider "fake",
+realistic tool-call rounds) and local stub servers in place of
+OpenWeatherMap, ExchangeRate-API, Google Places and Tavily, each with a
+log-normal latency distribution. The test fires `--requests` queries with
+`--concurrency` in flight and reports throughput, p50/p95/p99 latency and the
+mean time per stage (graph nodes, LLM, tools, upstream HTTP):
+
+    python -m benchmarks.load_test --requests 200 --concurrency 20
+    python -m benchmarks.load_test --latency tavily=1.5,4 --llm-latency 1.2
+
+Compare with a stored baseline; any metric worse than `--tolerance` makes the
+run exit with status 1:
+
+    python -m benchmarks.load_test --save-baseline benchmarks/baselines/load_test.json
+    python -m benchmarks.load_test --baseline benchmarks/baselines/load_test.json
+
+By default every request names a new destination, so tool caches never hit
+and each plan goes through the stubs; `--destinations N` cycles N cities
+instead (warm caches, coalescing of identical in-flight queries).
+
+Baselines are machine dependent: record one on the machine that compares.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import httpx
+import yaml
+
+from benchmarks.async_throughput import percentile
+from benchmarks.stub_providers import DEFAULT_LATENCY, StubProviders
+
+BASE_CONFIG = "config/config.yaml"
+CITIES = ["Goa", "Jaipur", "Kyoto", "Lisbon", "Istanbul", "Bali", "Hunza", "Dubai", "Bangkok", "Rome",
+          "Paris", "Cairo", "Colombo", "Kathmandu", "Hanoi", "Seoul", "Prague", "Vienna", "Cusco", "Reykjavik"]
+CURRENCIES = ["INR", "PKR", "EUR", "JPY", "TRY", "THB", "AED"]
+
+# Placeholder API keys (the googlemaps client only accepts keys shaped like real ones)
+STUB_KEYS = {"OPENWEATHERMAP_API_KEY": "stub-key", "EXCHANGE_RATE_API_KEY": "stub-key",
+             "GPLACES_API_KEY": "AIzaStubKeyForOfflineLoadTests", "TAVILY_API_KEY": "stub-key"}
+
+# Stages of the per-request breakdown reported by /query (include_timings)
+STAGES = [("node", "prefetch"), ("node", "agent"), ("node", "tools"), ("llm", None), ("tool", None), ("http", None)]
+
+# Metrics compared with the baseline: name -> True if higher is better
+COMPARED = {"throughput_rps": True, "latency_p50_s": False, "latency_p95_s": False, "latency_p99_s": False}
+
+
+def build_queries(count: int, destinations: int) -> list:
+    queries = []
+    for i in range(count):
+        city = CITIES[i % destinations] if destinations else f"Testville-{i}"
+        days = 3 + i % 5
+        queries.append(f"Plan a trip to {city} for {days} days with a budget in {CURRENCIES[i % len(CURRENCIES)]}")
+    return queries
+
+
+def write_config(directory: str, stubs: StubProviders, args) -> str:
+    """Copy of config.yaml pointing the app at the fake LLM and the stub providers."""
+    with open(BASE_CONFIG) as file:
+        config = yaml.safe_load(file)
+
+    config.setdefault("runtime", {}).update(model_provider="fake", execution_mode=args.execution_mode)
+    config.setdefault("llm", {})["fake"] = {
+        "provider": "fake", "latency_seconds": args.llm_latency, "jitter_seconds": args.llm_jitter,
+        "error_rate": 0.0, "scripted": True,
+    }
+    providers = config.setdefault("http", {}).setdefault("providers", {})
+    for provider, override in stubs.http_overrides().items():
+        providers[provider] = {**(providers.get(provider) or {}), **override}
+    config.setdefault("cache", {}).setdefault("places", {})["db_path"] = os.path.join(directory, "places.sqlite3")
+    config["cache"].setdefault("backend", {})["sqlite_path"] = os.path.join(directory, "shared_cache.sqlite3")
+    if args.prefetch is not None:
+        config.setdefault("prefetch", {})["enabled"] = args.prefetch == "on"
+
+    path = os.path.join(directory, "config.yaml")
+    with open(path, "w") as file:
+        yaml.safe_dump(config, file, sort_keys=False)
+    return path
+
+
+def stage_seconds(timings: dict) -> dict:
+    """Seconds per stage of one request's timing breakdown."""
+    stages = {}
+    for kind, name in STAGES:
+        entries = timings.get(kind) or {}
+        if name is not None:
+            entries = {name: entries[name]} if name in entries else {}
+        stages[f"{kind}:{name}" if name else kind] = sum(entry["seconds"] for entry in entries.values())
+    return stages
+
+
+async def run_load(queries: list, concurrency: int, timeout: float, warmup_queries: list) -> dict:
+    # Imported here: the environment (config path, provider) must be set first
+    import main
+    from agent.graph_registry import graph_registry
+
+    graph_registry.get(main.MODEL_PROVIDER)   # what the app lifespan does at startup
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, stages, errors = [], [], 0
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=timeout) as client:
+
+        async def one_request(query: str, record: bool = True):
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.post("/query", json={"query": query, "use_cache": False,
+                                                                  "include_timings": True})
+                    ok = response.status_code == 200 and "answer" in response.json()
+                except httpx.HTTPError:
+                    ok, response = False, None
+                if not record:
+                    return
+                latencies.append(time.perf_counter() - started)
+                if ok:
+                    stages.append(stage_seconds(response.json().get("timings") or {}))
+                else:
+                    errors += 1
+
+        for query in warmup_queries:
+            await one_request(query, record=False)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one_request(query) for query in queries))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(queries),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(queries) / elapsed, 3) if elapsed else 0.0,
+        "latency_mean_s": round(statistics.mean(latencies), 3) if latencies else 0.0,
+        "latency_p50_s": round(percentile(latencies, 50), 3),
+        "latency_p95_s": round(percentile(latencies, 95), 3),
+        "latency_p99_s": round(percentile(latencies, 99), 3),
+        "stage_mean_s": {stage: round(statistics.mean(s[stage] for s in stages), 4) if stages else 0.0
+                         for stage in (stages[0] if stages else {})},
+    }
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    """Rows (metric, baseline, current, change, regressed) for the compared metrics."""
+    rows = []
+    for metric, higher_is_better in COMPARED.items():
+        before, after = baseline["results"].get(metric), result.get(metric)
+        if not before or after is None:
+            continue
+        change = (after - before) / before
+        regressed = change < -tolerance if higher_is_better else change > tolerance
+        rows.append((metric, before, after, change, regressed))
+    return rows
+
+
+def parse_latency(values: list) -> dict:
+    """["tavily=1.5,4", ...] -> {"tavily": (1.5, 4.0)}"""
+    latency = {}
+    for value in values or []:
+        provider, _, numbers = value.partition("=")
+        median, _, p95 = numbers.partition(",")
+        if provider not in DEFAULT_LATENCY:
+            raise SystemExit(f"Unknown provider '{provider}' (one of {', '.join(DEFAULT_LATENCY)})")
+        latency[provider] = (float(median), float(p95 or float(median) * 3))
+    return latency
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline /query load test (fake LLM, stub providers).")
+    parser.add_argument("--requests", type=int, default=100, help="Measured requests")
+    parser.add_argument("--concurrency", type=int, default=10, help="Requests in flight at once")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured requests sent first")
+    parser.add_argument("--destinations", type=int, default=0,
+                        help="Cycle this many cities (0: a new destination per request, cold caches)")
+    parser.add_argument("--execution-mode", choices=["async", "sync"], default="async")
+    parser.add_argument("--prefetch", choices=["on", "off"], help="Override config.yaml prefetch.enabled")
+    parser.add_argument("--llm-latency", type=float, default=0.6, help="Fake LLM seconds per call")
+    parser.add_argument("--llm-jitter", type=float, default=0.2, help="Fake LLM latency +/- jitter")
+    parser.add_argument("--latency", action="append", metavar="PROVIDER=MEDIAN,P95",
+                        help="Stub latency override, e.g. tavily=1.5,4 (repeatable)")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Per-request timeout in seconds")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against (exit 1 on regression)")
+    parser.add_argument("--save-baseline", help="Write this run as the baseline JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    latency = parse_latency(args.latency)
+    queries = build_queries(args.warmup + args.requests, args.destinations)
+    # Warmup queries use their own destinations (so they do not warm the measured ones)
+    warmup_queries, queries = [f"{q} (warmup)" for q in queries[args.requests:]], queries[:args.requests]
+
+    with StubProviders(latency=latency) as stubs, tempfile.TemporaryDirectory() as directory:
+        os.environ["TRAVEL_PLANNER_CONFIG"] = write_config(directory, stubs, args)
+        os.environ["MODEL_PROVIDER"] = "fake"
+        os.environ["EXECUTION_MODE"] = args.execution_mode
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+        for key, value in STUB_KEYS.items():
+            os.environ.setdefault(key, value)
+
+        result = asyncio.run(run_load(queries, args.concurrency, args.timeout, warmup_queries))
+        result["upstream_hits"] = stubs.hits()
+
+    settings = {
+        "requests": args.requests, "concurrency": args.concurrency, "destinations": args.destinations,
+        "execution_mode": args.execution_mode, "prefetch": args.prefetch,
+        "llm_latency": args.llm_latency, "llm_jitter": args.llm_jitter,
+        "provider_latency": {**DEFAULT_LATENCY, **latency},
+    }
+
+    print(f"== /query load test ({args.requests} requests, concurrency {args.concurrency}, {args.execution_mode})")
+    for key, value in result.items():
+        if isinstance(value, dict):
+            print(f"{key:>16}:")
+            for name, number in value.items():
+                print(f"{name:>24}: {number}")
+        else:
+            print(f"{key:>16}: {value}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.save_baseline) or ".", exist_ok=True)
+        with open(args.save_baseline, "w") as file:
+            json.dump({"settings": settings, "results": result}, file, indent=2)
+        print(f"\nBaseline written to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline.get("settings") != json.loads(json.dumps(settings)):
+            print("\nWarning: baseline was recorded with different settings:", baseline.get("settings"))
+
+        print(f"\n== vs baseline {args.baseline} (tolerance {args.tolerance:.0%})")
+        rows = compare(result, baseline, args.tolerance)
+        for metric, before, after, change, regressed in rows:
+            print(f"{metric:>16}: {before:>9} -> {after:<9} {change:+7.1%}  {'REGRESSION' if regressed else 'ok'}")
+        if result["errors"] > baseline["results"].get("errors", 0):
+            print(f"{'errors':>16}: {baseline['results'].get('errors', 0)} -> {result['errors']}  REGRESSION")
+            rows.append(("errors", 0, 0, 0, True))
+        if any(row[4] for row in rows):
+            print("\nPerformance regression against the baseline")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Local stand-ins for every upstream provider (OpenWeatherMap, ExchangeRate-API,
+Google Places, Tavily), built on StubServer with realistic response bodies and
+latency distributions.
+
+    with StubProviders(latency={"google_places": (0.15, 0.6)}) as stubs:
+        config["http"]["providers"].update(stubs.http_overrides())
+
+Each provider's latency is (median, p95) seconds of a log-normal
+distribution, the usual shape of API latency (long right tail).
+"""
+import math
+import random
+import time
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.stub_server import StubServer
+
+# (median, p95) seconds per provider, roughly what the real APIs show
+DEFAULT_LATENCY = {
+    "openweathermap": (0.08, 0.25),
+    "exchangerate": (0.06, 0.2),
+    "google_places": (0.18, 0.6),
+    "tavily": (0.9, 2.5),
+}
+
+RATES = {"USD": 1.0, "EUR": 0.92, "GBP": 0.79, "INR": 83.2, "PKR": 278.5, "AED": 3.67, "JPY": 151.3,
+         "THB": 36.4, "TRY": 32.1, "SAR": 3.75, "CNY": 7.23, "AUD": 1.52, "CAD": 1.36, "LKR": 301.0}
+
+
+def lognormal_latency(median: float, p95: float):
+    """`() -> seconds` sampling a log-normal distribution with the given median and p95."""
+    sigma = math.log(max(p95, median * 1.0001) / median) / 1.645
+    return lambda: random.lognormvariate(math.log(median), sigma)
+
+
+def _query_param(path: str, name: str, default: str = "") -> str:
+    return (parse_qs(urlparse(path).query).get(name) or [default])[0]
+
+
+def current_weather(path: str) -> dict:
+    city = _query_param(path, "q", "Goa")
+    return {
+        "name": city, "dt": int(time.time()), "timezone": 19800,
+        "main": {"temp": 29.4, "feels_like": 32.1, "temp_min": 28.0, "temp_max": 30.2, "humidity": 74},
+        "weather": [{"main": "Clouds", "description": "scattered clouds"}],
+        "wind": {"speed": 4.1},
+    }
+
+
+def forecast(path: str) -> dict:
+    city = _query_param(path, "q", "Goa")
+    start = int(time.time()) // 10800 * 10800
+    descriptions = ["clear sky", "few clouds", "scattered clouds", "light rain", "moderate rain"]
+    steps = []
+    for i in range(40):
+        temp = 27 + 3 * math.sin(i / 8 * 2 * math.pi)
+        description = descriptions[(i // 3) % len(descriptions)]
+        step = {
+            "dt": start + i * 10800,
+            "main": {"temp": round(temp, 1), "temp_min": round(temp - 0.8, 1), "temp_max": round(temp + 0.8, 1)},
+            "weather": [{"main": description.split()[-1].title(), "description": description}],
+            "pop": 0.6 if "rain" in description else 0.1,
+        }
+        if "rain" in description:
+            step["rain"] = {"3h": 1.4}
+        steps.append(step)
+    return {"city": {"name": city, "timezone": 19800}, "cnt": len(steps), "list": steps}
+
+
+def exchange_rates(path: str) -> dict:
+    base = path.rstrip("/").rsplit("/", 1)[-1].upper()
+    base_rate = RATES.get(base, 1.0)
+    return {"result": "success", "base_code": base,
+            "conversion_rates": {code: round(rate / base_rate, 6) for code, rate in RATES.items()}}
+
+
+def places_text_search(path: str) -> dict:
+    query = _query_param(path, "query", "places")
+    results = [
+        {
+            "place_id": f"stub-{abs(hash((query, i))) % 10**8}",
+            "name": f"{query.split(' in ')[0].title()} #{i + 1}",
+            "formatted_address": f"{i + 10} Beach Road, {query.rsplit(' in ', 1)[-1]}",
+            "rating": round(3.8 + (i % 10) / 10, 1),
+            "user_ratings_total": 120 + 37 * i,
+            "price_level": i % 4 + 1,
+            "types": ["point_of_interest", "establishment"],
+        }
+        for i in range(20)
+    ]
+    return {"status": "OK", "results": results}
+
+
+def place_details(path: str) -> dict:
+    place_id = _query_param(path, "place_id", "stub")
+    return {"status": "OK", "result": {
+        "place_id": place_id, "name": f"Place {place_id[-4:]}", "formatted_address": "10 Beach Road",
+        "formatted_phone_number": "+91 832 000 0000", "rating": 4.4, "website": "https://example.com",
+    }}
+
+
+def tavily_search(path: str) -> dict:
+    return {
+        "query": "places",
+        "answer": "Popular picks include the old quarter, the beach promenade and the night market.",
+        "results": [{"title": f"Top things to do #{i + 1}", "url": f"https://example.com/{i}",
+                     "content": "A local favourite with great reviews.", "score": 0.9 - i * 0.1}
+                    for i in range(5)],
+    }
+
+
+class StubProviders:
+    """Starts one StubServer per provider; `http_overrides()` points the app at them."""
+
+    def __init__(self, latency: dict = None, statuses: dict = None):
+        """
+        Args:
+            latency (dict): {provider: (median, p95)} overriding DEFAULT_LATENCY.
+            statuses (dict): {provider: [status, ...]} scripted status codes (default 200).
+        """
+        latency = {**DEFAULT_LATENCY, **(latency or {})}
+        statuses = statuses or {}
+
+        def server(provider: str, routes: dict) -> StubServer:
+            return StubServer(statuses=statuses.get(provider), latency_fn=lognormal_latency(*latency[provider]),
+                              routes=routes)
+
+        self.servers = {
+            "openweathermap": server("openweathermap", {"/weather": current_weather, "/forecast": forecast}),
+            "exchangerate": server("exchangerate", {"/latest/": exchange_rates}),
+            "google_places": server("google_places", {"/textsearch/": places_text_search, "/details/": place_details}),
+            "tavily": server("tavily", {"/search": tavily_search}),
+        }
+
+    def http_overrides(self) -> dict:
+        """config.yaml `http.providers` entries with each provider's base_url set to its stub."""
+        return {provider: {"base_url": stub.url} for provider, stub in self.servers.items()}
+
+    def hits(self) -> dict:
+        return {provider: stub.hits for provider, stub in self.servers.items()}
+
+    def start(self) -> "StubProviders":
+        for stub in self.servers.values():
+            stub.start()
+        return self
+
+    def stop(self) -> None:
+        for stub in self.servers.values():
+            stub.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
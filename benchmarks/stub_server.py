@@ -0,0 +1,112 @@
+"""
+Local stub HTTP server for exercising upstream-provider behaviour offline.
+
+Every request is answered after a configurable latency with the next status
+code of a scripted sequence (the last status repeats once the sequence is
+exhausted), so retries, timeouts and circuit breakers can be driven without
+touching a real API:
+
+    with StubServer(statuses=[503, 503, 200], latency_seconds=0.05) as stub:
+        requests.get(stub.url + "/anything")
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubServer:
+    """ThreadingHTTPServer on 127.0.0.1 with scripted latency and status codes."""
+
+    def __init__(self, statuses=None, latency_seconds: float = 0.0, body: dict = None, latency_fn=None,
+                 routes: dict = None):
+        """
+        Args:
+            statuses (list[int]): Status code per request, in order (default [200]).
+            latency_seconds (float): Fixed delay before each response.
+            body (dict): JSON body returned with every response.
+            latency_fn (callable): Optional `() -> seconds`; overrides latency_seconds
+                                   (e.g. to sample a latency distribution).
+            routes (dict): Optional {path fragment: body or `(path) -> body`}; the first
+                           fragment found in the request path picks the body.
+        """
+        self.statuses = list(statuses or [200])
+        self.latency_seconds = latency_seconds
+        self.latency_fn = latency_fn
+        self.body = body if body is not None else {"ok": True}
+        self.routes = dict(routes or {})
+        self.hits = 0
+        self.max_concurrent = 0
+        self._concurrent = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def _next_status(self) -> int:
+        with self._lock:
+            index = min(self.hits, len(self.statuses) - 1)
+            self.hits += 1
+            self._concurrent += 1
+            self.max_concurrent = max(self.max_concurrent, self._concurrent)
+            return self.statuses[index]
+
+    def _body_for(self, path: str):
+        for fragment, body in self.routes.items():
+            if fragment in path:
+                return body(path) if callable(body) else body
+        return self.body
+
+    def _done(self) -> None:
+        with self._lock:
+            self._concurrent -= 1
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self):
+                status = stub._next_status()
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                    if length:
+                        self.rfile.read(length)
+                    time.sleep(stub.latency_fn() if stub.latency_fn else stub.latency_seconds)
+                    payload = json.dumps(stub._body_for(self.path)).encode()
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass   # client gave up (timeout) before the response was written
+                finally:
+                    stub._done()
+
+            do_GET = _respond
+            do_POST = _respond
+
+            def log_message(self, format, *args):
+                pass   # keep benchmark output clean
+
+        return Handler
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,87 @@
+"""
+Size report of tool outputs in "full" and "compact" mode (see config.yaml
+`tool_output`).
+
+Calls the real providers once per tool for a place (API keys from .env),
+renders each result both ways and prints bytes and estimated tokens before
+and after, i.e. what every agent step feeds back to the LLM:
+
+    python -m benchmarks.tool_output_report --place "Goa, India"
+"""
+import argparse
+
+from agent.context_manager import load_token_counter
+from tools.place_search_tool import PlaceSearchTool
+from tools.weather_info_tool import WeatherInfoTool
+from utils.place_search import PLACE_QUERIES
+
+
+def render_both(render) -> tuple:
+    """Call `render(compact)` for both modes; returns (full, compact) outputs."""
+    return render(False), render(True)
+
+
+def place_outputs(place: str) -> dict:
+    tool = PlaceSearchTool()
+    google = tool.google_places_search
+    outputs = {}
+
+    for category in PLACE_QUERIES:
+        def render(compact: bool, category=category) -> str:
+            tool.compact = google.compact = compact
+            try:
+                return tool._format_result(category, place, "google", google.search(category, place))
+            except Exception:
+                # Google unavailable: compare the Tavily answer instead
+                return tool._format_result(category, place, "tavily", tool.tavily_search.search(category, place))
+
+        outputs[f"search_{category}"] = render_both(render)
+    return outputs
+
+
+def weather_outputs(place: str) -> dict:
+    tool = WeatherInfoTool()
+    days = tool.weather_service.get_daily_forecast(place)
+
+    def render(compact: bool) -> str:
+        tool.compact = compact
+        return tool._format_forecast(place, days)
+
+    return {"get_weather_forecast": render_both(render)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bytes/tokens of tool outputs, full vs compact.")
+    parser.add_argument("--place", default="Goa, India")
+    parser.add_argument("--tokenizer", default="heuristic", help='"heuristic" or a tiktoken encoding name')
+    parser.add_argument("--show", action="store_true", help="Print the compact outputs as well")
+    args = parser.parse_args()
+
+    count_tokens = load_token_counter(args.tokenizer)
+    outputs = {}
+    for collect in (place_outputs, weather_outputs):
+        try:
+            outputs.update(collect(args.place))
+        except Exception as e:
+            print(f"{collect.__name__} failed: {e}")
+
+    header = f"{'tool':<26}{'full B':>9}{'full tok':>10}{'compact B':>11}{'compact tok':>13}{'saved':>8}"
+    print(header)
+    print("-" * len(header))
+    totals = [0, 0, 0, 0]
+    for name, (full, compact) in outputs.items():
+        row = [len(full.encode()), count_tokens(full), len(compact.encode()), count_tokens(compact)]
+        totals = [t + r for t, r in zip(totals, row)]
+        saved = 1 - row[3] / row[1] if row[1] else 0.0
+        print(f"{name:<26}{row[0]:>9}{row[1]:>10}{row[2]:>11}{row[3]:>13}{saved:>8.0%}")
+    saved = 1 - totals[3] / totals[1] if totals[1] else 0.0
+    print("-" * len(header))
+    print(f"{'total':<26}{totals[0]:>9}{totals[1]:>10}{totals[2]:>11}{totals[3]:>13}{saved:>8.0%}")
+
+    if args.show:
+        for name, (_, compact) in outputs.items():
+            print(f"\n{name}: {compact}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Offline check of the shared HTTP transport against local stub servers.
+
+Exercises, in order: retries on 5xx, read timeouts, the per-provider
+concurrency limit, the circuit breaker opening/recovering and the async path.
+Prints one line per scenario and the final transport stats:
+
+    python -m benchmarks.transport_check
+"""
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.stub_server import StubServer
+from exception.exception_handling import CircuitOpenError
+from utils.http_transport import HttpTransport
+
+SETTINGS = {
+    "defaults": {"connect_timeout": 1, "read_timeout": 2, "max_retries": 2,
+                 "backoff_base_seconds": 0.01, "backoff_max_seconds": 0.05},
+    "providers": {
+        "slow": {"read_timeout": 0.2, "max_retries": 0},
+        "limited": {"max_concurrency": 2, "max_retries": 0},
+        "flaky": {"max_retries": 0, "breaker_failure_threshold": 3, "breaker_reset_seconds": 0.5},
+    },
+}
+
+
+def report(name: str, ok: bool, detail: str) -> None:
+    print(f"[{'PASS' if ok else 'FAIL'}] {name}: {detail}")
+
+
+def check_retries(transport: HttpTransport) -> None:
+    with StubServer(statuses=[503, 502, 200]) as stub:
+        response = transport.get("retrying", stub.url)
+        report("retries", response.status_code == 200 and stub.hits == 3,
+               f"status={response.status_code} upstream_hits={stub.hits}")
+
+
+def check_timeout(transport: HttpTransport) -> None:
+    with StubServer(latency_seconds=1.0) as stub:
+        started = time.perf_counter()
+        try:
+            transport.get("slow", stub.url)
+            report("read timeout", False, "request did not time out")
+        except requests.Timeout:
+            elapsed = time.perf_counter() - started
+            report("read timeout", elapsed < 0.9, f"gave up after {elapsed:.2f}s")
+
+
+def check_concurrency(transport: HttpTransport) -> None:
+    with StubServer(latency_seconds=0.1) as stub:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: transport.get("limited", stub.url), range(8)))
+        report("concurrency limit", stub.max_concurrent <= 2, f"max concurrent upstream={stub.max_concurrent}")
+
+
+def check_breaker(transport: HttpTransport) -> None:
+    with StubServer(statuses=[500, 500, 500, 200]) as stub:
+        for _ in range(3):
+            transport.get("flaky", stub.url)
+        try:
+            transport.get("flaky", stub.url)
+            report("breaker opens", False, "call was not rejected")
+        except CircuitOpenError as e:
+            report("breaker opens", stub.hits == 3, str(e))
+
+        time.sleep(0.6)
+        response = transport.get("flaky", stub.url)
+        state = transport.provider("flaky").breaker.state
+        report("breaker recovers", response.status_code == 200 and state == "closed", f"state={state}")
+
+
+def check_async(transport: HttpTransport) -> None:
+    with StubServer(statuses=[429, 200]) as stub:
+        response = asyncio.run(transport.aget("async", stub.url))
+        report("async retries", response.status_code == 200 and stub.hits == 2,
+               f"status={response.status_code} upstream_hits={stub.hits}")
+
+
+def main() -> None:
+    transport = HttpTransport(SETTINGS)
+    check_retries(transport)
+    check_timeout(transport)
+    check_concurrency(transport)
+    check_breaker(transport)
+    check_async(transport)
+    print(json.dumps(transport.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+class CircuitOpenError(Exception):
+    """
+    Raised by the shared HTTP transport when a provider's circuit breaker is
+    open, so the call fails fast instead of waiting on a provider that is down.
+
+    Attributes:
+        provider (str): Name of the upstream provider (e.g. "openweathermap").
+        retry_after (float): Seconds until the breaker lets a trial call through.
+    """
+
+    def __init__(self, provider: str, retry_after: float):
+        self.provider = provider
+        self.retry_after = retry_after
+        super().__init__(f"Circuit open for provider '{provider}', retry in {retry_after:.1f}s")
+
+
+class AllModelsFailedError(Exception):
+    """
+    Raised by the model router when every candidate model failed with a
+    retryable error (rate limit, 5xx, timeout) for the same LLM call.
+
+    Attributes:
+        errors (list): (candidate name, exception) for each failed attempt, in order.
+    """
+
+    def __init__(self, errors: list):
+        self.errors = errors
+        details = "; ".join(f"{name}: {type(error).__name__}: {error}" for name, error in errors)
+        super().__init__(f"All model candidates failed ({details})")
+
+
+class CassetteMissError(Exception):
+    """
+    Raised by the HTTP transport in cassette replay mode when a provider
+    request was never recorded (so replay never silently goes upstream).
+
+    Attributes:
+        request (str): Credential-free description of the request.
+    """
+
+    def __init__(self, request: str):
+        self.request = request
+        super().__init__(f"No recorded response for: {request}")
+
+
+class JobQueueFullError(Exception):
+    """
+    Raised by the job queue when `max_queued` jobs are already waiting
+    (the API answers 429 so clients back off instead of piling up work).
+
+    Attributes:
+        max_queued (int): The queue limit that was hit.
+    """
+
+    def __init__(self, max_queued: int):
+        self.max_queued = max_queued
+        super().__init__(f"Job queue is full ({max_queued} jobs waiting), retry later")
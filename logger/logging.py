@@ -0,0 +1,29 @@
+import logging
+import os
+
+# Log level can be overridden from the environment (e.g. LOG_LEVEL=DEBUG)
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = "[%(asctime)s] %(levelname)s %(name)s - %(message)s"
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Return a module-level logger with the project-wide format applied.
+
+    Args:
+        name (str): Logger name, usually `__name__` of the calling module.
+
+    Returns:
+        logging.Logger: Configured logger instance.
+    """
+    logger = logging.getLogger(name)
+
+    # Attach a handler only once per logger (get_logger may be called repeatedly)
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        logger.addHandler(handler)
+        logger.setLevel(LOG_LEVEL)
+        logger.propagate = False
+
+    return logger
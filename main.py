@@ -1,15 +1,82 @@
+from contextlib import asynccontextmanager
+import os
+from typing import List, Optional
 from fastapi import FastAPI
 from pydantic import BaseModel, Field
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-import os
-from agent.agentic_workflow import GraphBuilder   # Your custom graph workflow
+from agent.graph_registry import graph_registry   # Process-level compiled graph cache
+from agent.batch_runner import run_batch
+from agent.job_queue import JobQueue
+from agent.plan_service import PlanService, coalesce_key
+from agent.streaming import StreamCoalescer, stream_plan_events
+from exception.exception_handling import JobQueueFullError
+from logger.logging import get_logger
+from utils.config_loader import load_config, load_model_provider
+from utils.currency_converter import CurrencyConverter
+from utils.weather_info import WeatherForecastTool
+from utils.place_cache import PlaceSearchCache
+from utils.place_search import GooglePlaceSearchTool
+from utils.http_transport import get_transport
+from utils.plan_cache import PlanCache
+from utils.cache_backend import get_cache_backend
+from utils.metrics import REGISTRY, request_timings
 import uvicorn
 
+logger = get_logger(__name__)
+
+# LLM provider used by the API routes: "groq", "openai", "fake" or "router"
+# (MODEL_PROVIDER env var overrides config.yaml)
+MODEL_PROVIDER = load_model_provider()
+
+# "async" runs the graph with ainvoke (non-blocking tools and HTTP clients);
+# "sync" keeps the original blocking invoke, mainly for benchmarking
+# (EXECUTION_MODE env var overrides config.yaml, handy for benchmark runs)
+EXECUTION_MODE = os.environ.get("EXECUTION_MODE") or load_config().get("runtime", {}).get("execution_mode", "async")
+
+# Storage of the tool and plan caches (config.yaml `cache.backend`)
+cache_backend = get_cache_backend()
+
+# Whole-plan answer cache (exact + near-duplicate query matching); plans are
+# also shared with the other workers when the backend is shared
+plan_cache = PlanCache(**load_config().get("cache", {}).get("plans", {}),
+                       backend=cache_backend if cache_backend.shared else None)
+
+# Answers /query and /query/batch (plan cache + coalescing of identical in-flight queries)
+plan_service = PlanService(MODEL_PROVIDER, EXECUTION_MODE, plan_cache)
+
+# Identical streams already running are shared instead of started again
+stream_flights = StreamCoalescer()
+
+# Batch limits (config.yaml `batch`)
+BATCH_SETTINGS = load_config().get("batch", {})
+
+# Background plans: a bounded worker pool answers queued jobs (config.yaml `jobs`)
+job_queue = JobQueue(plan_service, **load_config().get("jobs", {}))
+
+# --------------------------
+# App lifespan (startup / shutdown)
+# --------------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Build the agent graph once at startup so the first request does not pay
+    for loading the LLM, the tools and compiling the workflow.
+    """
+    try:
+        await graph_registry.aget(MODEL_PROVIDER)
+    except Exception as e:
+        # Keep the server up; /query reports the error and retries the build
+        logger.error("Could not build agent graph at startup: %s", e)
+    yield
+    await job_queue.stop()
+    graph_registry.clear()
+
 # --------------------------
 # Initialize FastAPI app
 # --------------------------
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Allow CORS (important if your frontend runs on a different port/domain)
 app.add_middleware(
@@ -29,6 +96,27 @@ class QueryRequest(BaseModel):
     Example: {"query": "Plan a trip to Paris in December"}
     """
     query: str = Field(..., example="Plan a trip to Paris in December")
+    use_cache: bool = Field(True, description="Set to false to skip the plan cache and always run the agent")
+    include_timings: bool = Field(False, description="Add a per-request timing breakdown (LLM, tools, HTTP) to the response")
+
+
+class BatchQueryRequest(BaseModel):
+    """
+    Request body for the batch endpoint.
+    Example: {"queries": ["Plan a trip to Goa for 5 days", "Plan a trip to Hunza for 3 days"]}
+    """
+    queries: List[str] = Field(..., example=["Plan a trip to Goa for 5 days", "Plan a trip to Hunza for 3 days"])
+    use_cache: bool = Field(True, description="Set to false to skip the plan cache lookups")
+
+
+class JobRequest(BaseModel):
+    """
+    Request body for the jobs endpoint.
+    Example: {"query": "Plan a trip to Goa for 5 days", "priority": 8}
+    """
+    query: str = Field(..., example="Plan a trip to Goa for 5 days")
+    priority: Optional[int] = Field(None, description="Higher runs first (default from config.yaml jobs.default_priority)")
+    use_cache: bool = Field(True, description="Set to false to skip the plan cache and always run the agent")
     
     
 # --------------------------
@@ -49,40 +137,203 @@ async def query_travel_agent(request: QueryRequest):
     try:
         print(f"Incoming query: {request.query}")
 
-        # Initialize GraphBuilder (agent workflow)
-        graph = GraphBuilder(model_provider="groq")
+        # Cached plan, joined in-flight run, or a fresh agent run
+        with request_timings() as timings:
+            result = await plan_service.answer(request.query, use_cache=request.use_cache)
+        if request.include_timings:
+            result["timings"] = timings.summary()
+        return result
+
+    except Exception as e:
+        # Handle unexpected errors gracefully
+        return JSONResponse(status_code=500, content={"error": str(e)})
+
+# --------------------------
+# Batch API Route
+# --------------------------
+@app.post("/query/batch")
+async def batch_travel_agent(request: BatchQueryRequest):
+    """
+    Answer many queries in one call with bounded concurrency.
+    Results come back in input order; a failed query carries "error" instead of "answer".
+    """
+    max_queries = BATCH_SETTINGS.get("max_queries", 100)
+    if len(request.queries) > max_queries:
+        return JSONResponse(status_code=413, content={"error": f"At most {max_queries} queries per batch"})
+
+    print(f"Incoming batch: {len(request.queries)} queries")
+    items = [{"id": str(index), "query": query} for index, query in enumerate(request.queries)]
+    results = await run_batch(plan_service, items, BATCH_SETTINGS.get("max_concurrency", 8), request.use_cache)
+    return {"results": results}
 
-        # Call the GraphBuilder (runs __call__)
-        react_app = graph()
+# --------------------------
+# Streaming API Route (SSE)
+# --------------------------
+@app.post("/query/stream")
+async def stream_travel_agent(request: QueryRequest):
+    """
+    Stream the agent run as server-sent events: tool start/end, LLM tokens,
+    then a final event carrying the full answer.
+    """
+    try:
+        print(f"Incoming streaming query: {request.query}")
+        react_app = await graph_registry.aget(MODEL_PROVIDER)
 
-        # Optional: save the agentic workflow as a PNG graph
-        png_graph = react_app.get_graph().draw_mermaid_png()
-        with open("my_graph.png", "wb") as f:
-            f.write(png_graph)
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"error": str(e)})
 
-        print(f"Graph saved as 'my_graph.png' in {os.getcwd()}")
+    # Identical streams already running are shared (events so far are replayed first)
+    events = stream_flights.subscribe(coalesce_key(request.query),
+                                      lambda: stream_plan_events(react_app, request.query))
 
-        # ------------------------------
-        # Pass user query to the agent
-        # ------------------------------
-        messages = {"messages": [request.query]}   # Wrap query in expected format
-        output = react_app.invoke(messages)
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},  # disable proxy buffering
+    )
 
-        # ------------------------------
-        # Extract final answer
-        # ------------------------------
-        if isinstance(output, dict) and "messages" in output:
-            # Take the last AI response
-            final_output = output["messages"][-1].content
-        else:
-            final_output = str(output)
+# --------------------------
+# Job API Routes
+# --------------------------
+@app.post("/jobs", status_code=202)
+async def submit_job(request: JobRequest):
+    """
+    Queue a plan and return its job id right away; poll GET /jobs/{id} for
+    progress and the answer.
+    """
+    try:
+        print(f"Incoming job: {request.query}")
+        job = await job_queue.submit(request.query, request.priority, request.use_cache)
+    except JobQueueFullError as e:
+        return JSONResponse(status_code=429, content={"error": str(e)})
+    return job.to_dict()
 
-        # Return the agent's response
-        return {"answer": final_output}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Status (queued, running, succeeded, failed, cancelled), progress so far
+    and, once finished, the answer or error of a job.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": f"Unknown or expired job '{job_id}'"})
+    return job.to_dict()
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """
+    Cancel a queued or running job.
+    """
+    job = await job_queue.cancel(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": f"Unknown or expired job '{job_id}'"})
+    return job.to_dict()
+
+
+@app.get("/jobs")
+async def job_stats():
+    """
+    Queue depth, running jobs and outcome counters of the job pool.
+    """
+    return job_queue.stats()
+
+# --------------------------
+# Cache Stats Route
+# --------------------------
+@app.get("/cache/stats")
+async def cache_stats():
+    """
+    Hit/miss counters and entry ages of the tool caches, plus per-namespace
+    stats of the cache backend (summed over all workers when it is shared).
+    """
+    return {
+        "currency": CurrencyConverter.cache_stats(),
+        "weather": WeatherForecastTool.cache_stats(),
+        "places": PlaceSearchCache.cache_stats(),
+        "google_lookups": GooglePlaceSearchTool.cache_stats(),
+        "plans": plan_cache.stats(),
+        "backend": cache_backend.stats(),
+    }
+
+# --------------------------
+# Coalescing Stats Route
+# --------------------------
+@app.get("/coalescing/stats")
+async def coalescing_stats():
+    """
+    How many agent runs identical in-flight requests shared instead of starting.
+    """
+    query_stats, stream_stats = plan_service.flights.stats(), stream_flights.stats()
+    return {
+        "query": query_stats,
+        "stream": stream_stats,
+        "runs_saved": query_stats["coalesced"] + stream_stats["coalesced"],
+    }
+
+# --------------------------
+# Metrics Route (Prometheus)
+# --------------------------
+@app.get("/metrics")
+async def metrics():
+    """
+    Latency histograms and counters (queries, graph nodes, LLM calls and
+    tokens, tools, upstream HTTP) in the Prometheus text format.
+    """
+    return Response(content=REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# --------------------------
+# Model Router Stats Route
+# --------------------------
+@app.get("/router/stats")
+async def router_stats():
+    """
+    Rolling latency, error rate and ranking of each LLM candidate
+    (only when MODEL_PROVIDER is "router").
+    """
+    router = graph_registry.get_router(MODEL_PROVIDER)
+    if router is None:
+        return {"enabled": False, "model_provider": MODEL_PROVIDER}
+    return {"enabled": True, **router.stats()}
+
+# --------------------------
+# HTTP Transport Stats Route
+# --------------------------
+@app.get("/http/stats")
+async def http_stats():
+    """
+    Pool use, retry/failure counters and circuit breaker state per upstream provider.
+    """
+    return get_transport().stats()
+
+# --------------------------
+# Cassette Stats Route
+# --------------------------
+@app.get("/cassette/stats")
+async def cassette_stats():
+    """
+    Record/replay mode of the upstream responses and how many were recorded,
+    replayed or missing.
+    """
+    return get_transport().cassette.stats()
+
+# --------------------------
+# Graph Diagram Route
+# --------------------------
+@app.get("/graph.png")
+async def graph_diagram():
+    """
+    Return the agentic workflow as a PNG diagram (rendered once and cached).
+    """
+    try:
+        # Rendering is a blocking network call; keep it off the event loop
+        png_graph = await run_in_threadpool(graph_registry.get_graph_png, MODEL_PROVIDER)
+        return Response(content=png_graph, media_type="image/png")
 
     except Exception as e:
-        # Handle unexpected errors gracefully
-        return JSONResponse(status_code=500, content={"error": str(e)})
+        # Rendering needs the mermaid.ink service; report instead of failing /query
+        return JSONResponse(status_code=503, content={"error": f"Graph rendering failed: {e}"})
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
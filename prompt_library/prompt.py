@@ -19,6 +19,8 @@ SYSTEM_PROMPT = SystemMessage(
     - Weather details
     
     Use the available tools to gather information and make detailed cost breakdowns.
+    For the cost breakdown, collect all costs first and call calculate_trip_budget once
+    with every item, instead of adding or multiplying numbers step by step.
     Provide everything in one comprehensive response formatted in clean Markdown.
     """
 )
\ No newline at end of file
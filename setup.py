@@ -38,5 +38,10 @@ setup(
     author = "Muhammad Hamza",
     author_email = "mr.hamxa942@gmail.com",
     packages = find_packages(),
-    install_requires = get_requirements()
+    install_requires = get_requirements(),
+    entry_points = {
+        "console_scripts": [
+            "travel-planner-batch=agent.batch_runner:main",
+        ],
+    },
 )
\ No newline at end of file
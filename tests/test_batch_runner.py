@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+import pytest
+
+import agent.batch_runner as batch_runner
+from utils.config_loader import load_config, load_model_provider
+
+
+class FlakyService:
+    """PlanService stand-in: queries listed in `failing` raise, the rest get a plan."""
+
+    failing = set()
+    providers = []
+
+    def __init__(self, model_provider, execution_mode, plan_cache):
+        FlakyService.providers.append(model_provider)
+
+    async def answer(self, query: str, use_cache: bool = True) -> dict:
+        if query in self.failing:
+            raise RuntimeError("model down")
+        return {"answer": f"plan for {query}"}
+
+
+@pytest.fixture
+def files(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_runner, "PlanService", FlakyService)
+    FlakyService.failing, FlakyService.providers = set(), []
+    input_path, output_path = tmp_path / "queries.jsonl", tmp_path / "plans.jsonl"
+    input_path.write_text("\n".join(json.dumps({"id": i, "query": q}) for i, q in [("1", "Goa"), ("2", "Rome"), ("3", "Lima")]))
+    return str(input_path), str(output_path)
+
+
+def read_lines(path: str) -> list:
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+
+def test_resume_keeps_one_line_per_id(files):
+    input_path, output_path = files
+    FlakyService.failing = {"Rome"}
+    first = asyncio.run(batch_runner.run_file(input_path, output_path, concurrency=2))
+    assert (first["answered"], first["failed"]) == (2, 1)
+
+    FlakyService.failing = set()
+    second = asyncio.run(batch_runner.run_file(input_path, output_path, concurrency=2))
+    assert (second["skipped"], second["answered"], second["failed"]) == (2, 1, 0)
+
+    lines = read_lines(output_path)
+    assert sorted(line["id"] for line in lines) == ["1", "2", "3"]
+    assert all("answer" in line for line in lines)
+
+
+def test_prune_checkpoint_drops_failures_and_partial_lines(tmp_path):
+    path = tmp_path / "plans.jsonl"
+    path.write_text('{"id": "1", "answer": "a"}\n{"id": "2", "error": "x"}\n{"id": "1", "answer": "b"}\n{"id": "3", "ans')
+    assert batch_runner.prune_checkpoint(str(path)) == {"1"}
+    assert read_lines(str(path)) == [{"id": "1", "answer": "a"}]
+
+
+def test_model_provider_resolution(monkeypatch):
+    load_config()   # loads .env first, so it cannot override the variables set below
+    monkeypatch.setenv("MODEL_PROVIDER", "fake")
+    assert load_model_provider() == "fake"
+    monkeypatch.delenv("MODEL_PROVIDER")
+    assert load_model_provider() == load_config()["runtime"]["model_provider"]
+
+
+def test_batch_uses_the_same_provider_as_the_api(files, monkeypatch):
+    input_path, output_path = files
+    monkeypatch.setenv("MODEL_PROVIDER", "fake")
+    asyncio.run(batch_runner.run_file(input_path, output_path, concurrency=1))
+    assert FlakyService.providers == ["fake"]
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from utils.cache import SingleFlight, TTLCache, normalize_place
+
+
+def test_normalize_place():
+    assert normalize_place("  Goa ,India") == normalize_place("goa, india") == "goa, india"
+
+
+def test_ttl_cache_freshness_stale_reads_and_lru():
+    cache = TTLCache(ttl_seconds=0.05, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None          # least recently used, evicted
+    time.sleep(0.1)
+    assert cache.get("a") is None          # past the cache TTL
+    assert cache.get("a", ttl=10) == 1     # a lookup may allow older entries
+    value, age = cache.get_entry("a", ttl=-1)
+    assert value == 1 and age >= 0.05      # stale read
+    assert len(cache) == 2
+
+
+def test_single_flight_do_runs_once_for_concurrent_threads():
+    flights = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def work():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return "value"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flights.do("k", work)))
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=lambda: results.append(flights.do("k", work))) for _ in range(4)]
+    for thread in followers:
+        thread.start()
+    for thread in [leader, *followers]:
+        thread.join()
+
+    assert calls == [1]
+    assert results == ["value"] * 5
+    assert flights.stats() == {"executions": 1, "coalesced": 4}
+
+
+def test_single_flight_do_shares_the_error():
+    flights = SingleFlight()
+    with pytest.raises(ValueError):
+        flights.do("k", lambda: (_ for _ in ()).throw(ValueError("boom")))
+    assert not flights.in_flight("k")
+
+
+def test_single_flight_ado_coalesces_and_shares_errors():
+    flights = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        raise RuntimeError("upstream down")
+
+    async def run():
+        return await asyncio.gather(*(flights.ado("k", work) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert calls == [1]
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert not flights.in_flight("k")
+
+
+def test_cancelling_one_waiter_keeps_the_shared_call():
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        first = asyncio.ensure_future(flights.ado("k", work))
+        second = asyncio.ensure_future(flights.ado("k", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second, first.cancelled()
+
+    assert asyncio.run(run()) == ("done", True)
+
+
+def test_cancelling_the_last_waiter_cancels_the_shared_call():
+    flights = SingleFlight()
+    finished = []
+
+    async def work():
+        await asyncio.sleep(0.2)
+        finished.append(1)
+
+    async def run():
+        waiter = asyncio.ensure_future(flights.ado("k", work))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.sleep(0.3)
+        return flights.in_flight("k")
+
+    assert asyncio.run(run()) is False
+    assert finished == []
@@ -0,0 +1,265 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from utils.cache import TTLCache
+from utils.cache_backend import CacheBackend, MemoryBackend, RedisBackend, SQLiteBackend, create_cache_backend, key_text
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class MiniRedis:
+    """In-process stand-in for the redis-py commands RedisBackend uses (bytes out, like redis-py)."""
+
+    def __init__(self):
+        self.values = {}        # key -> (bytes, expires_at or None)
+        self.zsets = {}         # key -> {member: score}
+        self.hashes = {}        # key -> {field: int}
+        self.expiries = {}      # key -> `ex` of the last set
+
+    @staticmethod
+    def _bytes(value) -> bytes:
+        return value if isinstance(value, bytes) else str(value).encode()
+
+    def get(self, key):
+        entry = self.values.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and time.time() >= expires_at:
+            del self.values[key]
+            return None
+        return value
+
+    def set(self, key, value, ex=None):
+        self.values[key] = (self._bytes(value), time.time() + ex if ex else None)
+        self.expiries[key] = ex
+
+    def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            found = [store.pop(key, None) is not None for store in (self.values, self.zsets)]
+            removed += int(any(found))
+        return removed
+
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update({self._bytes(member): score for member, score in mapping.items()})
+
+    def zrem(self, key, *members):
+        zset = self.zsets.get(key, {})
+        for member in members:
+            zset.pop(self._bytes(member), None)
+
+    def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    def zrange(self, key, start, end):
+        members = sorted(self.zsets.get(key, {}).items(), key=lambda item: item[1])
+        return [member for member, _ in members[start:None if end == -1 else end + 1]]
+
+    def zpopmin(self, key, count=1):
+        zset = self.zsets.get(key, {})
+        popped = sorted(zset.items(), key=lambda item: item[1])[:count]
+        for member, _ in popped:
+            del zset[member]
+        return popped
+
+    def hincrby(self, key, field, amount=1):
+        fields = self.hashes.setdefault(key, {})
+        fields[field] = fields.get(field, 0) + amount
+
+    def hgetall(self, key):
+        return {self._bytes(field): self._bytes(value) for field, value in self.hashes.get(key, {}).items()}
+
+
+NAMESPACES = {"weather": {"ttl_seconds": 60, "max_entries": 3}}
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBackend(NAMESPACES)
+    if request.param == "sqlite":
+        return SQLiteBackend(str(tmp_path / "cache.sqlite3"), NAMESPACES, flush_interval_seconds=0)
+    return RedisBackend(namespaces=NAMESPACES, client=MiniRedis(), flush_interval_seconds=0)
+
+
+# --------------------------
+# Behaviour shared by every backend
+# --------------------------
+def test_set_get_and_tuple_keys(backend):
+    backend.set("weather", ("current", "goa"), {"temp": 31})
+    value, age = backend.get("weather", ("current", "goa"))
+    assert value == {"temp": 31}
+    assert 0 <= age < 1
+    assert backend.get("weather", ("current", "rome")) is None
+
+
+def test_max_age_keeps_the_entry_for_stale_reads(backend):
+    backend.set("weather", "goa", 1)
+    time.sleep(0.02)
+    assert backend.get("weather", "goa", max_age=0.01) is None
+    assert backend.get("weather", "goa")[0] == 1
+
+
+def test_lru_eviction(backend):
+    for key in ("a", "b", "c"):
+        backend.set("weather", key, key)
+        time.sleep(0.01)        # distinct access times for the shared backends
+    backend.get("weather", "a")  # "b" is now the least recently used
+    time.sleep(0.01)
+    backend.set("weather", "d", "d")
+
+    assert backend.count("weather") == 3
+    assert backend.get("weather", "b") is None
+    assert [backend.get("weather", key)[0] for key in ("a", "c", "d")] == ["a", "c", "d"]
+    assert backend.stats("weather")["namespaces"]["weather"]["evictions"] == 1
+
+
+def test_delete_and_clear(backend):
+    backend.set("weather", "a", 1)
+    backend.set("weather", "b", 2)
+    backend.delete("weather", "a")
+    assert backend.get("weather", "a") is None
+    backend.clear("weather")
+    assert backend.count("weather") == 0
+    assert backend.get("weather", "b") is None
+
+
+def test_counters_and_hit_rate(backend):
+    backend.set("weather", "goa", 1)
+    backend.get("weather", "goa")
+    backend.get("weather", "goa")
+    backend.get("weather", "rome")
+    stats = backend.stats("weather")["namespaces"]["weather"]
+    assert (stats["hits"], stats["misses"], stats["sets"]) == (2, 1, 1)
+    assert stats["hit_rate"] == round(2 / 3, 4)
+    assert stats["ttl_seconds"] == 60 and stats["max_entries"] == 3
+
+
+# --------------------------
+# Backend specifics
+# --------------------------
+@pytest.mark.parametrize("make", [
+    lambda tmp_path: MemoryBackend({"weather": {"ttl_seconds": 0.05}}),
+    lambda tmp_path: SQLiteBackend(str(tmp_path / "cache.sqlite3"), {"weather": {"ttl_seconds": 0.05}}),
+], ids=["memory", "sqlite"])
+def test_ttl_expiry_drops_the_entry(make, tmp_path):
+    backend = make(tmp_path)
+    backend.set("weather", "goa", 1)
+    time.sleep(0.08)
+    assert backend.get("weather", "goa") is None
+    assert backend.count("weather") == 0
+    stats = backend.stats("weather")["namespaces"]["weather"]
+    assert (stats["expired"], stats["misses"]) == (1, 1)
+
+
+def test_incomplete_backend_fails_when_built():
+    class NoStorage(CacheBackend):
+        name = "broken"
+
+        def get(self, namespace, key, max_age=None):
+            return None
+
+    with pytest.raises(TypeError):
+        NoStorage()
+
+
+def test_memory_backend_is_not_shared():
+    stats = MemoryBackend(NAMESPACES).stats()
+    assert stats["shared"] is False
+    assert "all_workers" not in stats["namespaces"]["weather"]
+
+
+def test_sqlite_entries_and_counters_are_shared(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    first = SQLiteBackend(path, NAMESPACES, flush_interval_seconds=0)
+    second = SQLiteBackend(path, NAMESPACES, flush_interval_seconds=0)
+    second.worker = "other-worker"
+
+    first.set("weather", "goa", {"temp": 31})
+    assert second.get("weather", "goa")[0] == {"temp": 31}
+    second.get("weather", "rome")
+
+    stats = first.stats("weather")["namespaces"]["weather"]
+    assert (stats["sets"], stats["hits"], stats["misses"]) == (1, 0, 0)   # this worker only
+    totals = stats["all_workers"]
+    assert (totals["sets"], totals["hits"], totals["misses"], totals["workers"]) == (1, 1, 1, 2)
+
+
+def test_sqlite_is_shared_across_processes(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    SQLiteBackend(path, NAMESPACES).set("weather", ["forecast", "goa"], [20, 21])
+
+    code = (
+        "from utils.cache_backend import SQLiteBackend; "
+        f"backend = SQLiteBackend({path!r}); "
+        "print(backend.get('weather', ['forecast', 'goa'])[0]); "
+        "backend.set('weather', 'rome', 'set by child')"
+    )
+    child = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    assert child.stdout.strip() == "[20, 21]"
+    assert SQLiteBackend(path, NAMESPACES).get("weather", "rome")[0] == "set by child"
+
+
+def test_redis_uses_server_ttl_and_prefix():
+    client = MiniRedis()
+    backend = RedisBackend(namespaces=NAMESPACES, client=client, key_prefix="test")
+    backend.set("weather", "goa", 1)
+    entry_key = f"test:weather:{key_text('goa')}"
+    assert client.expiries[entry_key] == 60
+
+    # The server dropped the entry: it is a miss and leaves the LRU index
+    client.values.pop(entry_key)
+    assert backend.get("weather", "goa") is None
+    assert backend.count("weather") == 0
+
+
+def test_redis_counters_add_up_across_workers():
+    client = MiniRedis()
+    first = RedisBackend(namespaces=NAMESPACES, client=client, flush_interval_seconds=0)
+    second = RedisBackend(namespaces=NAMESPACES, client=client, flush_interval_seconds=0)
+    first.set("weather", "goa", 1)
+    second.get("weather", "goa")
+    second.get("weather", "rome")
+
+    totals = first.stats("weather")["namespaces"]["weather"]["all_workers"]
+    assert (totals["sets"], totals["hits"], totals["misses"]) == (1, 1, 1)
+
+
+# --------------------------
+# Factory and TTLCache on a backend
+# --------------------------
+def test_create_cache_backend_env_override(monkeypatch, tmp_path):
+    settings = {"type": "memory", "sqlite_path": str(tmp_path / "shared.sqlite3"), "namespaces": NAMESPACES}
+    monkeypatch.delenv("CACHE_BACKEND", raising=False)
+    assert isinstance(create_cache_backend(settings), MemoryBackend)
+
+    monkeypatch.setenv("CACHE_BACKEND", "sqlite")
+    backend = create_cache_backend(settings)
+    assert isinstance(backend, SQLiteBackend)
+    assert backend.path == settings["sqlite_path"]
+    assert backend.policy("weather") == NAMESPACES["weather"]
+
+    monkeypatch.setenv("CACHE_BACKEND", "memcached")
+    with pytest.raises(ValueError):
+        create_cache_backend(settings)
+
+
+def test_ttl_cache_on_a_shared_backend(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    # Config values win over the cache's own maxsize
+    writer = TTLCache(ttl_seconds=60, maxsize=100, namespace="weather", backend=SQLiteBackend(path, NAMESPACES))
+    reader = TTLCache(ttl_seconds=60, maxsize=100, namespace="weather", backend=SQLiteBackend(path, NAMESPACES))
+    assert writer.backend.policy("weather")["max_entries"] == 3
+
+    writer.set(("current", "goa"), {"temp": 31})
+    assert reader.get(("current", "goa")) == {"temp": 31}
+    assert len(reader) == 1
+    # A negative ttl reads the entry whatever its age (stale reads)
+    time.sleep(0.02)
+    assert reader.get(("current", "goa"), ttl=0.01) is None
+    assert reader.get(("current", "goa"), ttl=-1) == {"temp": 31}
@@ -0,0 +1,35 @@
+import pytest
+
+from utils.expense_calculator import BudgetEngine
+
+ITEMS = [
+    {"name": "Hotel", "amount": 80, "category": "lodging", "per": "night"},
+    {"name": "Meals", "amount": 20, "category": "food", "per": "person_day"},
+    {"name": "Visa", "amount": 50, "per": "trip"},
+]
+
+
+def test_totals_follow_the_trip_shape():
+    budget = BudgetEngine().calculate(ITEMS, days=5, travelers=2, contingency_percent=10)
+    assert budget["nights"] == 4
+    assert budget["subtotals"] == {"lodging": 320, "food": 200, "other": 50}
+    assert budget["total"] == pytest.approx(627)
+    assert budget["per_person"] == pytest.approx(313.5)
+
+
+def test_day_trip_has_no_lodging_nights():
+    budget = BudgetEngine().calculate(ITEMS, days=1)
+    assert budget["nights"] == 0
+    assert "lodging" not in budget["subtotals"]
+    assert budget["total"] == 70
+
+
+def test_explicit_nights_win():
+    assert BudgetEngine().calculate(ITEMS, days=1, nights=1)["subtotals"]["lodging"] == 80
+
+
+def test_invalid_input_is_rejected():
+    with pytest.raises(ValueError):
+        BudgetEngine().calculate(ITEMS, days=0)
+    with pytest.raises(ValueError):
+        BudgetEngine().calculate([{"name": "x", "amount": 1, "per": "week"}], days=2)
@@ -0,0 +1,67 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+import agent.graph_registry as graph_registry_module
+from agent.graph_registry import GraphRegistry
+
+
+class SlowBuilder:
+    """GraphBuilder stand-in whose build blocks for `BUILD_SECONDS` (like loading the LLM and tools)."""
+
+    BUILD_SECONDS = 0.3
+    builds = 0
+
+    def __init__(self, model_provider: str = "groq"):
+        self.model_provider = model_provider
+        self.llm_with_tools = None
+
+    def __call__(self):
+        time.sleep(self.BUILD_SECONDS)
+        SlowBuilder.builds += 1
+        return f"graph for {self.model_provider} #{SlowBuilder.builds}"
+
+
+@pytest.fixture
+def registry(monkeypatch, tmp_path):
+    monkeypatch.setattr(graph_registry_module, "GraphBuilder", SlowBuilder)
+    SlowBuilder.builds = 0
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text("runtime: {}\n")
+    return GraphRegistry(str(config_path))
+
+
+def test_graph_is_built_once_and_shared(registry):
+    assert registry.get("fake") == "graph for fake #1"
+    assert asyncio.run(registry.aget("fake")) == "graph for fake #1"
+    assert SlowBuilder.builds == 1
+
+
+def test_config_change_rebuilds(registry):
+    registry.get("fake")
+    stat = os.stat(registry.config_path)
+    os.utime(registry.config_path, (stat.st_atime, stat.st_mtime + 10))
+    assert registry.get("fake") == "graph for fake #2"
+
+
+def test_async_rebuild_does_not_block_the_event_loop(registry):
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        graph = await registry.aget("fake")
+        task.cancel()
+        return graph, ticks
+
+    graph, ticks = asyncio.run(run())
+    assert graph == "graph for fake #1"
+    # Other coroutines kept running during the whole build
+    assert ticks >= 10
@@ -0,0 +1,144 @@
+import asyncio
+import time
+
+import pytest
+
+from utils.hedged_search import HedgedPlaceSearch, LatencyHistogram
+from utils.place_search import GOOGLE_NO_RESULTS
+
+
+class FakeProvider:
+    """Place search stand-in answering after `delay` seconds (or raising `error`)."""
+
+    def __init__(self, name: str, delay: float = 0.0, result=None, error: Exception = None):
+        self.name = name
+        self.delay = delay
+        self.result = f"{name} places" if result is None else result
+        self.error = error
+        self.calls = 0
+
+    def search(self, category: str, place: str):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.result
+
+    async def asearch(self, category: str, place: str):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+class CachingProvider(FakeProvider):
+    """FakeProvider that keeps each answer, like Google's combined lookup cache."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.answers = {}
+
+    def cached(self, category: str, place: str):
+        return self.answers.get((category, place))
+
+    def search(self, category: str, place: str):
+        result = super().search(category, place)
+        self.answers[(category, place)] = result
+        return result
+
+
+def both_paths(hedged: HedgedPlaceSearch):
+    """Results of the sync and async search for the same providers."""
+    return [hedged.search("attractions", "Goa"), asyncio.run(hedged.asearch("attractions", "Goa"))]
+
+
+def test_fast_google_wins_without_hedging():
+    tavily = FakeProvider("tavily")
+    hedged = HedgedPlaceSearch(FakeProvider("google", 0.01), tavily, initial_delay_seconds=0.5)
+    for provider, result, google_error in both_paths(hedged):
+        assert (provider, result, google_error) == ("google", "google places", None)
+    assert tavily.calls == 0 and hedged.hedges == 0
+
+
+def test_slow_google_is_hedged_with_tavily():
+    hedged = HedgedPlaceSearch(FakeProvider("google", 0.6), FakeProvider("tavily", 0.01), initial_delay_seconds=0.05)
+    for provider, result, _ in both_paths(hedged):
+        assert (provider, result) == ("tavily", "tavily places")
+    assert hedged.hedges == 2 and hedged.wins == {"google": 0, "tavily": 2}
+
+
+@pytest.mark.parametrize("google", [
+    FakeProvider("google", error=RuntimeError("quota exceeded")),
+    FakeProvider("google", result=f"{GOOGLE_NO_RESULTS} for Goa"),
+])
+def test_failed_or_empty_google_starts_tavily_at_once(google):
+    hedged = HedgedPlaceSearch(google, FakeProvider("tavily"), initial_delay_seconds=5)
+    started = time.perf_counter()
+    for provider, _, google_error in both_paths(hedged):
+        assert provider == "tavily" and google_error is not None
+    assert time.perf_counter() - started < 1
+
+
+def test_fallback_mode_waits_for_google():
+    tavily = FakeProvider("tavily")
+    hedged = HedgedPlaceSearch(FakeProvider("google", 0.2), tavily, mode="fallback")
+    for provider, _, _ in both_paths(hedged):
+        assert provider == "google"
+    assert tavily.calls == 0
+
+
+def test_both_failing_raises_the_last_error():
+    hedged = HedgedPlaceSearch(FakeProvider("google", error=RuntimeError("google down")),
+                               FakeProvider("tavily", error=RuntimeError("tavily down")))
+    with pytest.raises(RuntimeError, match="tavily down"):
+        hedged.search("attractions", "Goa")
+    with pytest.raises(RuntimeError, match="tavily down"):
+        asyncio.run(hedged.asearch("attractions", "Goa"))
+
+
+def test_cancelled_losing_call_is_not_a_latency_sample():
+    hedged = HedgedPlaceSearch(FakeProvider("google", 1.0), FakeProvider("tavily", 0.01), initial_delay_seconds=0.05)
+    asyncio.run(hedged.asearch("attractions", "Goa"))
+    assert hedged.latency["google"].count == 0
+    assert hedged.latency["tavily"].count == 1
+
+
+def test_failed_calls_are_latency_samples():
+    hedged = HedgedPlaceSearch(FakeProvider("google", 0.05, error=RuntimeError("down")), FakeProvider("tavily"))
+    asyncio.run(hedged.asearch("attractions", "Goa"))
+    assert hedged.latency["google"].count == 1
+
+
+def test_google_cache_hits_are_not_latency_samples():
+    google, tavily = CachingProvider("google", 0.05), FakeProvider("tavily")
+    hedged = HedgedPlaceSearch(google, tavily, initial_delay_seconds=0.5)
+    hedged.search("attractions", "Goa")          # goes upstream
+
+    for provider, result, _ in both_paths(hedged) + both_paths(hedged):
+        assert (provider, result) == ("google", "google places")
+    assert google.calls == 1 and tavily.calls == 0
+    assert hedged.latency["google"].count == 1
+    assert hedged.stats()["google_cache_hits"] == 4
+
+
+def test_hedge_delay_tracks_the_google_quantile_within_bounds():
+    hedged = HedgedPlaceSearch(FakeProvider("google"), FakeProvider("tavily"), quantile=0.9,
+                               initial_delay_seconds=1.0, min_delay_seconds=0.3, max_delay_seconds=3.0, min_samples=10)
+    assert hedged.hedge_delay() == 1.0
+    for i in range(10):
+        hedged.latency["google"].record(0.5 + i * 0.1)     # 0.5 .. 1.4
+    assert hedged.hedge_delay() == pytest.approx(1.4)
+    for _ in range(200):
+        hedged.latency["google"].record(10.0)
+    assert hedged.hedge_delay() == 3.0
+
+
+def test_latency_histogram_buckets_and_window():
+    histogram = LatencyHistogram(window=3)
+    for seconds in (0.05, 0.3, 0.7, 4.0):
+        histogram.record(seconds)
+    stats = histogram.stats()
+    assert stats["count"] == 4
+    assert stats["buckets"]["le_0.1"] == 1 and stats["buckets"]["le_5"] == 1
+    assert histogram.quantile(0.0) == 0.3   # the oldest sample left the window
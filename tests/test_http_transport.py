@@ -0,0 +1,137 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from benchmarks.stub_server import StubServer
+from exception.exception_handling import CassetteMissError, CircuitOpenError
+from utils.cassette import Cassette
+from utils.http_transport import CircuitBreaker, HttpTransport
+
+# Tiny backoff so retries do not slow the suite down
+SETTINGS = {
+    "defaults": {"connect_timeout": 1, "read_timeout": 2, "max_retries": 2,
+                 "backoff_base_seconds": 0.01, "backoff_max_seconds": 0.02},
+    "providers": {
+        "slow": {"read_timeout": 0.2, "max_retries": 0},
+        "limited": {"max_concurrency": 2, "max_retries": 0},
+        "flaky": {"max_retries": 0, "breaker_failure_threshold": 3, "breaker_reset_seconds": 0.3},
+    },
+}
+
+
+@pytest.fixture
+def transport():
+    return HttpTransport(SETTINGS)
+
+
+def test_retries_5xx_until_success(transport):
+    with StubServer(statuses=[503, 502, 200]) as stub:
+        response = transport.get("retrying", stub.url)
+    assert response.status_code == 200
+    assert stub.hits == 3
+    assert transport.stats()["retrying"]["retries"] == 2
+
+
+def test_gives_up_after_max_retries(transport):
+    with StubServer(statuses=[500]) as stub:
+        response = transport.get("retrying", stub.url)
+    # The last retryable response is handed back for the caller's own status handling
+    assert response.status_code == 500
+    assert stub.hits == 3
+
+
+def test_client_errors_are_not_retried(transport):
+    with StubServer(statuses=[404, 200]) as stub:
+        response = transport.get("retrying", stub.url)
+    assert response.status_code == 404
+    assert stub.hits == 1
+
+
+def test_read_timeout(transport):
+    with StubServer(latency_seconds=1.0) as stub:
+        started = time.perf_counter()
+        with pytest.raises(requests.Timeout):
+            transport.get("slow", stub.url)
+    assert time.perf_counter() - started < 0.9
+
+
+def test_concurrency_limit(transport):
+    with StubServer(latency_seconds=0.05) as stub:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            responses = list(pool.map(lambda _: transport.get("limited", stub.url), range(8)))
+    assert all(response.status_code == 200 for response in responses)
+    assert stub.max_concurrent <= 2
+
+
+def test_breaker_opens_and_recovers(transport):
+    with StubServer(statuses=[500, 500, 500, 200]) as stub:
+        for _ in range(3):
+            transport.get("flaky", stub.url)
+        # Open: fails fast without going upstream
+        with pytest.raises(CircuitOpenError):
+            transport.get("flaky", stub.url)
+        assert stub.hits == 3
+
+        time.sleep(0.35)
+        response = transport.get("flaky", stub.url)
+
+    breaker = transport.provider("flaky").breaker
+    assert response.status_code == 200
+    assert breaker.state == "closed"
+    assert breaker.times_opened == 1
+    assert transport.stats()["flaky"]["rejected_by_breaker"] == 1
+
+
+def test_breaker_half_open_allows_one_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.0)
+    breaker.record_failure("p")
+    assert breaker.state == "open"
+
+    breaker.before_call("p")   # the trial call
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("p")
+
+    # A failed trial reopens the circuit
+    breaker.record_failure("p")
+    assert breaker.state == "open"
+    assert breaker.times_opened == 2
+
+
+def test_async_retries(transport):
+    with StubServer(statuses=[429, 200]) as stub:
+        response = asyncio.run(transport.aget("async", stub.url))
+    assert response.status_code == 200
+    assert stub.hits == 2
+
+
+def test_async_breaker_opens(transport):
+    async def calls(url):
+        for _ in range(3):
+            await transport.aget("flaky", url)
+        await transport.aget("flaky", url)
+
+    with StubServer(statuses=[500]) as stub:
+        with pytest.raises(CircuitOpenError):
+            asyncio.run(calls(stub.url))
+    assert stub.hits == 3
+
+
+def test_cassette_record_then_replay(tmp_path):
+    path = str(tmp_path / "providers.sqlite3")
+    with StubServer(body={"temp": 31}) as stub:
+        recorder = HttpTransport(SETTINGS, Cassette(path, "record"))
+        recorded = recorder.get("weather", stub.url + "/current", params={"q": "Goa", "appid": "secret"})
+        url = stub.url
+
+    # The stub is gone; replay must not go upstream
+    player = HttpTransport(SETTINGS, Cassette(path, "replay", latency="zero"))
+    replayed = player.get("weather", url + "/current", params={"q": "Goa", "appid": "other"})
+    assert replayed.status_code == recorded.status_code == 200
+    assert replayed.json() == {"temp": 31}
+
+    with pytest.raises(CassetteMissError):
+        player.get("weather", url + "/current", params={"q": "Rome"})
@@ -0,0 +1,174 @@
+import asyncio
+import time
+
+import pytest
+
+from agent.job_queue import CANCELLED, FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueue
+from exception.exception_handling import JobQueueFullError
+
+
+class FakeService:
+    """PlanService stand-in: answers after `delay`, or waits for `gate` when one is set."""
+
+    def __init__(self, delay: float = 0.0, gate: asyncio.Event = None, error: Exception = None):
+        self.delay = delay
+        self.gate = gate
+        self.error = error
+        self.calls = []
+
+    async def answer(self, query: str, use_cache: bool = True) -> dict:
+        self.calls.append(query)
+        if self.gate is not None:
+            await self.gate.wait()
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return {"answer": f"plan for {query}"}
+
+
+async def wait_until(predicate, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached in time"
+        await asyncio.sleep(0.01)
+
+
+def test_job_runs_to_success():
+    async def run():
+        queue = JobQueue(FakeService(), workers=2)
+        job = await queue.submit("Plan a trip to Goa")
+        await wait_until(lambda: job.done)
+        await queue.stop()
+        return queue, job
+
+    queue, job = asyncio.run(run())
+    data = job.to_dict()
+    assert data["status"] == SUCCEEDED
+    assert data["answer"] == "plan for Plan a trip to Goa"
+    assert job.finished_at >= job.started_at
+    assert queue.counts[SUCCEEDED] == 1
+
+
+def test_failed_job_keeps_the_error():
+    async def run():
+        queue = JobQueue(FakeService(error=RuntimeError("model down")), workers=1)
+        job = await queue.submit("Plan a trip to Goa")
+        await wait_until(lambda: job.done)
+        await queue.stop()
+        return queue, job
+
+    queue, job = asyncio.run(run())
+    assert job.status == FAILED
+    assert job.to_dict()["error"] == "model down"
+    assert queue.counts[FAILED] == 1
+
+
+def test_higher_priority_runs_first():
+    async def run():
+        gate = asyncio.Event()
+        service = FakeService(gate=gate)
+        queue = JobQueue(service, workers=1)
+        first = await queue.submit("first", priority=5)
+        await wait_until(lambda: first.status == RUNNING)
+        # Queued behind the running job: priority order, FIFO within a priority
+        jobs = [await queue.submit(query, priority=priority)
+                for query, priority in [("low", 1), ("high a", 9), ("mid", 5), ("high b", 9)]]
+        gate.set()
+        await wait_until(lambda: all(job.done for job in jobs))
+        await queue.stop()
+        return service.calls
+
+    assert asyncio.run(run()) == ["first", "high a", "high b", "mid", "low"]
+
+
+def test_full_queue_rejects_submissions():
+    async def run():
+        queue = JobQueue(FakeService(), workers=1, max_queued=2)
+        await queue.submit("a")
+        await queue.submit("b")
+        with pytest.raises(JobQueueFullError):
+            await queue.submit("c")
+        await queue.stop()
+        return queue
+
+    queue = asyncio.run(run())
+    assert queue.counts["submitted"] == 2
+    assert queue.counts["rejected"] == 1
+
+
+def test_cancel_queued_job():
+    async def run():
+        gate = asyncio.Event()
+        service = FakeService(gate=gate)
+        queue = JobQueue(service, workers=1)
+        first = await queue.submit("first")
+        await wait_until(lambda: first.status == RUNNING)
+        waiting = await queue.submit("waiting")
+        await queue.cancel(waiting.id)
+        gate.set()
+        await wait_until(lambda: first.done)
+        await queue.stop()
+        return queue, service, waiting
+
+    queue, service, waiting = asyncio.run(run())
+    assert waiting.status == CANCELLED
+    assert waiting.finished_at is not None
+    assert service.calls == ["first"]
+    assert queue.counts[CANCELLED] == 1
+
+
+def test_cancel_running_job():
+    async def run():
+        queue = JobQueue(FakeService(gate=asyncio.Event()), workers=1)
+        job = await queue.submit("Plan a trip to Goa")
+        await wait_until(lambda: job.status == RUNNING)
+        await queue.cancel(job.id)
+        # The worker survives the cancel and takes the next job
+        queue.service.gate.set()
+        following = await queue.submit("next")
+        await wait_until(lambda: following.done)
+        await queue.stop()
+        return queue, job, following
+
+    queue, job, following = asyncio.run(run())
+    assert job.status == CANCELLED
+    assert job.finished_at is not None
+    assert following.status == SUCCEEDED
+    assert queue.counts[CANCELLED] == 1
+
+
+def test_cancel_between_pick_and_start():
+    async def run():
+        service = FakeService()
+        queue = JobQueue(service, workers=1)
+        job = await queue.submit("Plan a trip to Goa")
+        # One loop step: the worker picks the job and creates its task, which has not run yet
+        await asyncio.sleep(0)
+        assert job.task is not None and job.status == QUEUED
+
+        await queue.cancel(job.id)
+        following = await queue.submit("next")
+        await wait_until(lambda: following.done)
+        await queue.stop()
+        return queue, service, job
+
+    queue, service, job = asyncio.run(run())
+    assert job.status == CANCELLED
+    assert job.finished_at is not None
+    assert service.calls == ["next"]
+    assert queue.counts[CANCELLED] == 1
+
+
+def test_finished_jobs_expire():
+    async def run():
+        queue = JobQueue(FakeService(), workers=1, result_ttl_seconds=0.05)
+        job = await queue.submit("Plan a trip to Goa")
+        await wait_until(lambda: job.done)
+        assert queue.get(job.id) is job
+        await asyncio.sleep(0.1)
+        await queue.stop()
+        return queue, job
+
+    queue, job = asyncio.run(run())
+    assert queue.get(job.id) is None
+    assert queue.counts["expired"] == 1
@@ -0,0 +1,51 @@
+import sqlite3
+import time
+
+from utils.place_cache import PlaceSearchCache
+
+
+def test_lookup_prefers_google_and_normalizes_the_place(tmp_path):
+    cache = PlaceSearchCache(str(tmp_path / "places.sqlite3"))
+    cache.set("tavily", "attractions", "Goa", "tavily text")
+    cache.set("google", "attractions", "Goa", "google text")
+    assert cache.lookup("attractions", "  goa ") == ("google", "google text")
+    assert cache.lookup("restaurants", "Goa") is None
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+
+def test_output_modes_never_share_entries(tmp_path):
+    cache = PlaceSearchCache(str(tmp_path / "places.sqlite3"))
+    cache.set("google", "attractions", "Goa", "1. Baga Beach, long details...", mode="full")
+    assert cache.lookup("attractions", "Goa", mode="compact") is None
+
+    cache.set("google", "attractions", "Goa", [{"name": "Baga Beach"}], mode="compact")
+    assert cache.lookup("attractions", "Goa", mode="compact") == ("google", [{"name": "Baga Beach"}])
+    assert cache.lookup("attractions", "Goa", mode="full") == ("google", "1. Baga Beach, long details...")
+
+
+def test_category_ttl_and_lru_bound(tmp_path):
+    cache = PlaceSearchCache(str(tmp_path / "places.sqlite3"), category_ttl_seconds={"restaurants": 0.05}, max_entries=2)
+    cache.set("google", "restaurants", "Goa", "r")
+    cache.set("google", "attractions", "Goa", "a")
+    time.sleep(0.08)
+    assert cache.get("google", "restaurants", "Goa") is None
+    assert cache.get("google", "attractions", "Goa") == "a"
+
+    cache.set("google", "activities", "Goa", "x")
+    assert cache.stats()["entries"] == 2 and cache.evictions == 1
+
+
+def test_cache_file_without_output_modes_is_rebuilt(tmp_path):
+    path = str(tmp_path / "places.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE place_search (provider TEXT, category TEXT, place TEXT, value TEXT, "
+                 "created_at REAL, accessed_at REAL, PRIMARY KEY (provider, category, place))")
+    conn.execute("INSERT INTO place_search VALUES ('google', 'attractions', 'goa', '\"old\"', ?, ?)",
+                 (time.time(), time.time()))
+    conn.commit()
+    conn.close()
+
+    cache = PlaceSearchCache(path)
+    assert cache.lookup("attractions", "Goa") is None
+    cache.set("google", "attractions", "Goa", "new", mode="full")
+    assert cache.lookup("attractions", "Goa") == ("google", "new")
@@ -0,0 +1,98 @@
+import time
+
+import pytest
+
+from utils.cache_backend import MemoryBackend, SQLiteBackend
+from utils.plan_cache import PlanCache, query_tokens
+
+
+def test_query_tokens_keep_numbers_with_units_and_direction():
+    assert query_tokens("Plan a 5-day trip from Delhi to Goa for 2 people") == [
+        "plan", "5 day", "trip", "from delhi", "to goa", "2 people"
+    ]
+    assert query_tokens("Plan a trip to Goa for five days") == query_tokens("plan a TRIP to goa for 5 days!")
+
+
+def test_infinitive_to_is_not_a_direction():
+    assert query_tokens("I want to visit Goa") == ["visit", "goa"]
+
+
+def test_direction_is_only_kept_with_origin_and_destination():
+    assert query_tokens("Plan a trip to Goa") == ["plan", "trip", "goa"]
+    assert query_tokens("Trip to Goa from Delhi") == ["trip", "to goa", "from delhi"]
+
+
+def test_exact_hit_ignores_stopwords_case_and_punctuation():
+    cache = PlanCache()
+    cache.set("Plan a trip to Goa for 5 days", "GOA")
+    assert cache.get("plan trip to goa for 5 days, please") == ("GOA", "exact")
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("Plan a 2 day trip to Goa for 5 people", "Plan a 5 day trip to Goa for 2 people"),
+    ("Trip from Goa to Delhi", "Trip from Delhi to Goa"),
+    ("Trip from Goa to Delhi", "Trip to Goa"),
+    ("Goa to Delhi road trip", "Delhi to Goa road trip"),
+    ("Plan a trip to Goa for 5 days", "Plan a trip to Goa for 7 days"),
+    ("Visit Kyoto then Osaka for 4 days", "Visit Osaka then Kyoto for 4 days"),
+    ("Plan a trip to Goa for 5 days", "Plan a trip to Goa and Mumbai for 5 days"),
+])
+def test_different_trips_never_share_a_plan(stored, asked):
+    cache = PlanCache()
+    cache.set(stored, "STORED")
+    assert cache.get(asked) is None
+
+
+@pytest.mark.parametrize("asked", [
+    "Can you plan a 5 day trip to Goa",
+    "5 day Goa trip plan",
+    "Goa trip for 5 days",
+])
+def test_near_duplicate_rewording_hits(asked):
+    cache = PlanCache()
+    cache.set("Plan a trip to Goa for 5 days", "GOA")
+    assert cache.get(asked) == ("GOA", "near")
+    assert cache.stats()["near_hits"] == 1
+
+
+def test_same_origin_and_destination_in_any_order_hits():
+    cache = PlanCache()
+    cache.set("Trip from Delhi to Goa", "DELHI-GOA")
+    assert cache.get("Trip to Goa from Delhi") == ("DELHI-GOA", "near")
+
+
+def test_entries_expire_after_ttl():
+    cache = PlanCache(ttl_seconds=0.05)
+    cache.set("Plan a trip to Goa for 5 days", "GOA")
+    time.sleep(0.1)
+    assert cache.get("Plan a trip to Goa for 5 days") is None
+
+
+def test_least_recently_used_plan_is_evicted():
+    cache = PlanCache(max_entries=2)
+    cache.set("Trip to Goa for 3 days", "GOA")
+    cache.set("Trip to Rome for 3 days", "ROME")
+    cache.get("Trip to Goa for 3 days")
+    cache.set("Trip to Lima for 3 days", "LIMA")
+    assert cache.get("Trip to Rome for 3 days") is None
+    assert cache.get("Trip to Goa for 3 days") == ("GOA", "exact")
+    assert cache.stats()["entries"] == 2
+
+
+def test_shared_backend_serves_plans_of_other_workers(tmp_path):
+    path = str(tmp_path / "plans.sqlite3")
+    worker_a, worker_b = PlanCache(backend=SQLiteBackend(path)), PlanCache(backend=SQLiteBackend(path))
+    worker_a.set("Plan a trip to Goa for 5 days", "GOA")
+
+    assert worker_b.get("plan a trip to goa for 5 days") == ("GOA", "exact")
+    # Pulled into the local index, so near duplicates now hit too
+    assert worker_b.get("Can you plan a 5 day trip to Goa") == ("GOA", "near")
+
+
+def test_clear_empties_the_backend_too():
+    backend = MemoryBackend()
+    cache = PlanCache(backend=backend)
+    cache.set("Plan a trip to Goa for 5 days", "GOA")
+    cache.clear()
+    assert backend.count("plans") == 0
+    assert cache.get("Plan a trip to Goa for 5 days") is None
@@ -0,0 +1,83 @@
+import asyncio
+
+import time
+
+from agent.plan_service import PlanService, coalesce_key
+from utils.metrics import current_timings, request_timings
+from utils.plan_cache import PlanCache
+
+
+class CountingPlanService(PlanService):
+    """PlanService whose agent run is a short sleep returning a plan per query."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.runs = []
+
+    async def run_agent(self, query: str) -> str:
+        self.runs.append(query)
+        started = time.perf_counter()
+        await asyncio.sleep(0.05)
+        if current_timings() is not None:
+            current_timings().add("llm", "fake", started, time.perf_counter() - started)
+        return f"plan for {query}"
+
+
+def test_coalesce_key_only_normalizes_case_and_whitespace():
+    assert coalesce_key("  Plan a trip to  Goa\n") == coalesce_key("plan a TRIP to goa")
+    assert coalesce_key("5 days for 2 people in Goa") != coalesce_key("2 days for 5 people in Goa")
+    assert coalesce_key("Trip from Delhi to Goa") != coalesce_key("Trip from Goa to Delhi")
+
+
+def test_identical_in_flight_queries_share_one_run():
+    service = CountingPlanService()
+
+    async def run():
+        return await asyncio.gather(*(service.answer("Plan a trip to Goa") for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert service.runs == ["Plan a trip to Goa"]
+    assert results[0] == {"answer": "plan for Plan a trip to Goa"}
+    assert all(result == {"answer": "plan for Plan a trip to Goa", "coalesced": True} for result in results[1:])
+
+
+def test_coalesced_requests_get_the_shared_run_timings():
+    service = CountingPlanService()
+
+    async def timed_answer():
+        with request_timings() as timings:
+            result = await service.answer("Plan a trip to Goa")
+        return result, timings.summary()
+
+    async def run():
+        return await asyncio.gather(*(timed_answer() for _ in range(3)))
+
+    results = asyncio.run(run())
+    assert service.runs == ["Plan a trip to Goa"]
+    for _, summary in results:
+        assert summary["llm"]["fake"]["calls"] == 1
+        assert summary["llm"]["fake"]["seconds"] >= 0.04
+
+
+def test_swapped_queries_in_flight_get_their_own_plans():
+    service = CountingPlanService()
+    queries = ["Trip from Delhi to Goa", "Trip from Goa to Delhi"]
+
+    async def run():
+        return await asyncio.gather(*(service.answer(query) for query in queries))
+
+    results = asyncio.run(run())
+    assert sorted(service.runs) == sorted(queries)
+    assert [result["answer"] for result in results] == [f"plan for {query}" for query in queries]
+
+
+def test_cached_plan_is_served_without_a_run():
+    cache = PlanCache()
+    cache.set("Plan a trip to Goa for 5 days", "cached plan")
+    service = CountingPlanService(plan_cache=cache)
+
+    assert asyncio.run(service.answer("plan a trip to goa for 5 days")) == {"answer": "cached plan", "cached": "exact"}
+    assert service.runs == []
+    # use_cache=False always runs the agent
+    assert asyncio.run(service.answer("Plan a trip to Goa for 5 days", use_cache=False))["answer"].startswith("plan for")
+    assert len(service.runs) == 1
@@ -0,0 +1,44 @@
+import pytest
+
+from agent.prefetch import TripRequest, parse_trip_request
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Plan a trip to Goa for 5 days in INR", TripRequest("Goa", 5, "INR")),
+    ("Plan a 3 day trip to New York City", TripRequest("New York City", 3, None)),
+    ("trip to new york for 2 weeks", TripRequest("New York", 14, None)),
+    ("a week in Bali cost in euros", TripRequest("Bali", 7, "EUR")),
+    ("I'm planning to travel in December to Paris", TripRequest("Paris", None, None)),
+    ("I want to visit Kyoto and Osaka for three nights", TripRequest("Kyoto", 4, None)),
+    ("visit Goa, India on a budget of ₹50000", TripRequest("Goa, India", None, "INR")),
+    ("5 day Goa trip plan", TripRequest("Goa", 5, None)),
+    ("Plan a 3-night New York City getaway", TripRequest("New York City", 4, None)),
+    ("Plan a honeymoon to the Maldives for 6 days", TripRequest("Maldives", 6, None)),
+])
+def test_parses_destination_days_and_currency(query, expected):
+    assert parse_trip_request(query) == expected
+
+
+@pytest.mark.parametrize("query", [
+    "Tell me about Tokyo",
+    "What should I pack for Iceland?",
+    "Can you plan a trip for me?",
+    "Hello! Plan me a trip",
+    "Plan 5 days in INR",
+    "Plan a trip in December",
+    "Plan a 5 day family trip",
+    "Plan a 5 day Luxury trip",
+    "5 day goa trip plan",
+    "Take me to the beach",
+])
+def test_no_destination_is_guessed_from_other_words(query):
+    assert parse_trip_request(query).destination is None
+
+
+def test_the_beach_does_not_hide_a_later_destination():
+    assert parse_trip_request("Take me to the beach in Goa for 3 days").destination == "Goa"
+
+
+def test_try_is_only_a_currency_in_uppercase():
+    assert parse_trip_request("I want to try a trip to Istanbul").currency is None
+    assert parse_trip_request("Trip to Istanbul in TRY").currency == "TRY"
@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import StructuredTool
+
+from agent.tool_executor import ParallelToolNode
+
+
+def sleepy_tool(name: str, seconds: float) -> StructuredTool:
+    """Tool that sleeps `seconds` (sync and async) and returns its own name."""
+
+    def run(city: str) -> str:
+        time.sleep(seconds)
+        return f"{name}:{city}"
+
+    async def arun(city: str) -> str:
+        await asyncio.sleep(seconds)
+        return f"{name}:{city}"
+
+    return StructuredTool.from_function(func=run, coroutine=arun, name=name, description=f"{name} tool")
+
+
+def failing_tool() -> StructuredTool:
+    def run(city: str) -> str:
+        raise RuntimeError("provider down")
+
+    return StructuredTool.from_function(func=run, name="broken", description="always fails")
+
+
+def state_with_calls(*names: str) -> dict:
+    calls = [{"name": name, "args": {"city": "Goa"}, "id": f"call_{i}"} for i, name in enumerate(names)]
+    return {"messages": [AIMessage(content="", tool_calls=calls)]}
+
+
+TOOLS = [sleepy_tool("slow", 0.3), sleepy_tool("fast", 0.05), sleepy_tool("stuck", 5), failing_tool()]
+
+
+def test_results_keep_tool_call_order_sync_and_async():
+    node = ParallelToolNode(TOOLS)
+    state = state_with_calls("slow", "fast", "slow")
+
+    for messages in (node.invoke(state)["messages"], asyncio.run(node.ainvoke(state))["messages"]):
+        assert [m.tool_call_id for m in messages] == ["call_0", "call_1", "call_2"]
+        assert [m.content for m in messages] == ["slow:Goa", "fast:Goa", "slow:Goa"]
+
+
+def test_calls_run_concurrently():
+    node = ParallelToolNode(TOOLS, max_concurrency=6)
+    started = time.perf_counter()
+    node.invoke(state_with_calls("slow", "slow", "slow", "slow"))
+    assert time.perf_counter() - started < 0.6
+
+
+def test_max_concurrency_bounds_parallelism():
+    node = ParallelToolNode(TOOLS, max_concurrency=2)
+    started = time.perf_counter()
+    asyncio.run(node.ainvoke(state_with_calls("slow", "slow", "slow", "slow")))
+    assert time.perf_counter() - started >= 0.6
+
+
+def test_timed_out_tool_yields_an_error_without_blocking_the_step():
+    node = ParallelToolNode(TOOLS, timeout_seconds=2, tool_timeouts={"stuck": 0.2})
+    state = state_with_calls("stuck", "fast")
+
+    for run in (lambda: node.invoke(state), lambda: asyncio.run(node.ainvoke(state))):
+        started = time.perf_counter()
+        messages = run()["messages"]
+        assert time.perf_counter() - started < 1.0
+        assert messages[0].status == "error" and "timed out after 0.2s" in messages[0].content
+        assert messages[1].content == "fast:Goa"
+
+
+def test_queued_tools_get_their_full_timeout_from_when_they_start():
+    # With one worker the second call starts after the first; its deadline counts from its own start
+    node = ParallelToolNode(TOOLS, max_concurrency=1, timeout_seconds=0.45)
+    messages = node.invoke(state_with_calls("slow", "slow"))["messages"]
+    assert [m.content for m in messages] == ["slow:Goa", "slow:Goa"]
+
+
+def test_hung_tool_does_not_starve_queued_calls():
+    # The only worker slot is held by a tool that never returns in time
+    node = ParallelToolNode(TOOLS, max_concurrency=1, timeout_seconds=2, tool_timeouts={"stuck": 0.2})
+    state = state_with_calls("stuck", "fast", "fast")
+
+    for run in (lambda: node.invoke(state), lambda: asyncio.run(node.ainvoke(state))):
+        started = time.perf_counter()
+        messages = run()["messages"]
+        assert time.perf_counter() - started < 1.0
+        assert messages[0].status == "error"
+        assert [m.content for m in messages[1:]] == ["fast:Goa", "fast:Goa"]
+
+
+def test_failing_and_unknown_tools_become_error_messages():
+    node = ParallelToolNode(TOOLS)
+    state = state_with_calls("broken", "missing", "fast")
+
+    for messages in (node.invoke(state)["messages"], asyncio.run(node.ainvoke(state))["messages"]):
+        assert messages[0].status == "error" and "provider down" in messages[0].content
+        assert messages[1].status == "error" and "not a valid tool" in messages[1].content
+        assert messages[2].content == "fast:Goa"
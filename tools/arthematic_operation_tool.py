@@ -1,9 +1,9 @@
 import os
-from dotenv import load_dotenv
 from langchain.tools import tool
-from langchain_community.utilities.alpha_vantage import AlphaVantageAPIWrapper
+from utils.http_transport import get_transport
+from utils.settings import load_env
 
-load_dotenv()
+load_env()
 
 @tool
 def multiply(a: int, b: int) -> int:
@@ -51,11 +51,23 @@ def currency_converter(from_curr: str, to_curr: str, value: float) -> float:
     if not api_key:
         raise ValueError("Missing ALPHAVANTAGE_API_KEY in environment variables.")
 
-    # Set environment variable so AlphaVantageAPIWrapper can pick it up
-    os.environ["ALPHAVANTAGE_API_KEY"] = api_key
-
-    alpha_vantage = AlphaVantageAPIWrapper()
-    response = alpha_vantage._get_exchange_rate(from_curr, to_curr)
+    # Same request as langchain_community's AlphaVantageAPIWrapper, sent through the
+    # shared transport (timeouts, retries, circuit breaker, cassette record/replay)
+    http = get_transport()
+    result = http.get(
+        "alphavantage",
+        http.base_url("alphavantage", "https://www.alphavantage.co") + "/query/",
+        params={
+            "function": "CURRENCY_EXCHANGE_RATE",
+            "from_currency": from_curr,
+            "to_currency": to_curr,
+            "apikey": api_key,
+        },
+    )
+    result.raise_for_status()
+    response = result.json()
+    if "Error Message" in response:
+        raise ValueError(f"API Error: {response['Error Message']}")
 
     # Defensive: make sure response has the expected structure
     try:
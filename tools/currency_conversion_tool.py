@@ -1,8 +1,9 @@
 import os
 from utils.currency_converter import CurrencyConverter
+from utils.config_loader import load_config
+from utils.settings import load_env
 from typing import List
-from langchain.tools import tool
-from dotenv import load_dotenv
+from langchain_core.tools import StructuredTool
 
 class CurrencyConverterTool:
     """
@@ -21,12 +22,17 @@ class CurrencyConverterTool:
         Initialize the CurrencyConverterTool.
         - Load environment variables
         - Fetch API key for currency conversion
-        - Initialize currency service
+        - Initialize currency service (rate-table cache settings from config.yaml)
         - Register tool functions
         """
-        load_dotenv()  
+        load_env()  # .env is read once per process
         self.api_key = os.environ.get("EXCHANGE_RATE_API_KEY")  # API key from .env
-        self.currency_service = CurrencyConverter(self.api_key)  # Service instance
+        cache_settings = (load_config().get("cache") or {}).get("currency", {})
+        self.currency_service = CurrencyConverter(  # Service instance
+            self.api_key,
+            ttl_seconds=cache_settings.get("ttl_seconds", 3600),
+            pivot_currency=cache_settings.get("pivot_currency", "USD"),
+        )
         self.currency_converter_tool_list = self._setup_tools()  # Register tool
 
     def _setup_tools(self) -> List:
@@ -37,7 +43,6 @@ class CurrencyConverterTool:
             list: List of tool functions (in this case, only one: convert_currency).
         """
 
-        @tool
         def convert_currency(amount: float, from_currency: str, to_currency: str):
             """
             Convert an amount from one currency to another.
@@ -51,5 +56,8 @@ class CurrencyConverterTool:
                 str: Converted amount or error message if conversion fails.
             """
             return self.currency_service.convert(amount, from_currency, to_currency)
+
+        async def aconvert_currency(amount: float, from_currency: str, to_currency: str):
+            return await self.currency_service.aconvert(amount, from_currency, to_currency)
         
-        return [convert_currency]
+        return [StructuredTool.from_function(func=convert_currency, coroutine=aconvert_currency)]
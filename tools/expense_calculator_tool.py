@@ -1,6 +1,21 @@
-from utils.expense_calculator import Calculator
-from typing import List
-from langchain.tools import tool
+import os
+from utils.expense_calculator import Calculator, BudgetEngine
+from utils.currency_converter import CurrencyConverter
+from utils.config_loader import load_config
+from utils.settings import load_env
+from utils.compact_output import compact_json
+from typing import List, Optional
+from pydantic import BaseModel, Field
+from langchain_core.tools import StructuredTool
+
+
+class BudgetItem(BaseModel):
+    """One line of the trip budget."""
+    name: str = Field(..., description="What the cost is for, e.g. 'Hotel Fidalgo' or 'Lunch'")
+    amount: float = Field(..., description="Cost of one unit (see 'per')")
+    category: str = Field("other", description="lodging | food | transport | activities | other")
+    per: str = Field("trip", description="trip | day | night | person | person_day | person_night")
+    quantity: float = Field(1, description="Units per charge, e.g. 2 rooms or 3 meals a day")
 
 class CalculatorTool:
     """
@@ -10,19 +25,40 @@ class CalculatorTool:
     """
 
     def __init__(self):
-        """Initialize the CalculatorTool with an instance of Calculator."""
+        """
+        Initialize the CalculatorTool with an instance of Calculator, the budget
+        engine and a currency converter (for budgets in a target currency).
+        """
+        load_env()  # .env is read once per process
         self.calculator = Calculator()
+        self.budget_engine = BudgetEngine()
+        cache_settings = (load_config().get("cache") or {}).get("currency", {})
+        self.currency_service = CurrencyConverter(  # Shares the process-wide rate-table cache
+            os.environ.get("EXCHANGE_RATE_API_KEY"),
+            ttl_seconds=cache_settings.get("ttl_seconds", 3600),
+            pivot_currency=cache_settings.get("pivot_currency", "USD"),
+        )
         self.calculator_tool_list = self._setup_tools()
 
+    def _budget(self, items, days, travelers, currency, target_currency, nights, contingency_percent, rate) -> str:
+        """Run the budget engine on tool arguments and serialize the breakdown compactly."""
+        items = [item.model_dump() if isinstance(item, BaseModel) else dict(item) for item in items]
+        breakdown = self.budget_engine.calculate(
+            items, days, travelers=travelers, nights=nights, currency=currency,
+            contingency_percent=contingency_percent, target_currency=target_currency, rate=rate,
+        )
+        return compact_json(breakdown)
+
     def _setup_tools(self) -> List:
         """
         Setup all tools for the calculator tool.
+        The calculations are pure CPU work, so the async implementations
+        simply call the calculator directly instead of using a worker thread.
 
         Returns:
             list: List of registered calculator tool functions.
         """
 
-        @tool
         def estimate_total_hotel_cost(price_per_night: float, total_days: float) -> float:
             """
             Calculate total hotel cost.
@@ -35,8 +71,10 @@ class CalculatorTool:
                 float: Total hotel cost.
             """
             return self.calculator.multiply(price_per_night, total_days)
+
+        async def aestimate_total_hotel_cost(price_per_night: float, total_days: float) -> float:
+            return self.calculator.multiply(price_per_night, total_days)
         
-        @tool
         def calculate_total_expense(*costs: float) -> float:
             """
             Calculate total expense of the trip.
@@ -48,8 +86,10 @@ class CalculatorTool:
                 float: Sum of all provided costs.
             """
             return self.calculator.calculate_total(*costs)
+
+        async def acalculate_total_expense(*costs: float) -> float:
+            return self.calculator.calculate_total(*costs)
         
-        @tool
         def calculate_daily_expense_budget(total_cost: float, days: int) -> float:
             """
             Calculate daily expense budget.
@@ -62,9 +102,47 @@ class CalculatorTool:
                 float: Daily budget.
             """
             return self.calculator.calculate_daily_budget(total_cost, days)
+
+        async def acalculate_daily_expense_budget(total_cost: float, days: int) -> float:
+            return self.calculator.calculate_daily_budget(total_cost, days)
+        
+        def calculate_trip_budget(items: List[BudgetItem], days: int, travelers: int = 1,
+                                  currency: str = "USD", target_currency: Optional[str] = None,
+                                  nights: Optional[int] = None, contingency_percent: float = 0.0) -> str:
+            """
+            Compute the complete trip budget in one call: every cost line, subtotals
+            per category, total, per-day and per-person budgets, optionally also in
+            a target currency. Prefer this over chaining the single-step calculators.
+
+            Args:
+                items (list): Cost lines; each has name, amount, category and the unit
+                              it is charged 'per' (trip, day, night, person, person_day, person_night).
+                days (int): Trip length in days.
+                travelers (int): Number of people.
+                currency (str): Currency of the item amounts (e.g. "USD").
+                target_currency (str): Optional currency to also show the totals in (e.g. "PKR").
+                nights (int): Nights of lodging (default: days - 1).
+                contingency_percent (float): Safety buffer added to the total, in percent.
+
+            Returns:
+                str: JSON breakdown with items, subtotals, total and per-day / per-person budgets.
+            """
+            rate = None
+            if target_currency and target_currency.upper() != currency.upper():
+                rate = self.currency_service.get_rate(currency, target_currency)
+            return self._budget(items, days, travelers, currency, target_currency, nights, contingency_percent, rate)
+
+        async def acalculate_trip_budget(items: List[BudgetItem], days: int, travelers: int = 1,
+                                         currency: str = "USD", target_currency: Optional[str] = None,
+                                         nights: Optional[int] = None, contingency_percent: float = 0.0) -> str:
+            rate = None
+            if target_currency and target_currency.upper() != currency.upper():
+                rate = await self.currency_service.aget_rate(currency, target_currency)
+            return self._budget(items, days, travelers, currency, target_currency, nights, contingency_percent, rate)
         
         return [
-            estimate_total_hotel_cost, 
-            calculate_total_expense, 
-            calculate_daily_expense_budget
+            StructuredTool.from_function(func=calculate_trip_budget, coroutine=acalculate_trip_budget),
+            StructuredTool.from_function(func=estimate_total_hotel_cost, coroutine=aestimate_total_hotel_cost),
+            StructuredTool.from_function(func=calculate_total_expense, coroutine=acalculate_total_expense),
+            StructuredTool.from_function(func=calculate_daily_expense_budget, coroutine=acalculate_daily_expense_budget),
         ]
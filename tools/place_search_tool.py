@@ -1,75 +1,155 @@
 import os
+import asyncio
 from utils.place_search import GooglePlaceSearchTool, TavilyPlaceSearchTool
+from utils.place_cache import PlaceSearchCache
+from utils.hedged_search import HedgedPlaceSearch
+from utils.config_loader import load_config
+from utils.settings import load_env
+from utils.compact_output import compact_json, truncate_text
 from typing import List
-from langchain.tools import tool
-from dotenv import load_dotenv
+from langchain_core.tools import StructuredTool
+
+# How each category is described in the tool output
+PLACE_LABELS = {
+    "attractions": "attractions of",
+    "restaurants": "restaurants of",
+    "activities": "activities in and around",
+    "transportation": "modes of transportation available in",
+}
 
 class PlaceSearchTool:
     def __init__(self):
         # Load environment variables from .env file
-        load_dotenv()
-        
+        load_env()  # .env is read once per process
+
         # Fetch Google Places API key from environment
         self.google_api_key = os.environ.get("GPLACES_API_KEY")
-        
-        # Initialize Google and Tavily search helpers
-        self.google_places_search = GooglePlaceSearchTool(self.google_api_key)
-        self.tavily_search = TavilyPlaceSearchTool()
-        
+
+        config = load_config()
+        search_settings = config.get("place_search") or {}
+
+        # "compact" returns top-k structured places; "full" the provider text as-is
+        output_settings = config.get("tool_output") or {}
+        self.compact = output_settings.get("mode", "compact") == "compact"
+        self.output_mode = "compact" if self.compact else "full"   # part of the place cache key
+        self.max_chars = output_settings.get("max_chars", 1500)
+
+        # Initialize Google and Tavily search helpers (pooled clients, built once per process)
+        self.google_places_search = GooglePlaceSearchTool(
+            self.google_api_key,
+            top_k_results=search_settings.get("google_top_k", 10),
+            lookup_ttl_seconds=search_settings.get("google_lookup_ttl_seconds", 300),
+            compact=self.compact,
+            compact_top_k=output_settings.get("top_k", 5),
+        )
+        self.tavily_search = TavilyPlaceSearchTool(os.environ.get("TAVILY_API_KEY"))
+
+        # Google first, Tavily hedged after a latency-driven delay (or on failure)
+        self.place_searcher = HedgedPlaceSearch(
+            self.google_places_search,
+            self.tavily_search,
+            mode=search_settings.get("mode", "hedged"),
+            **(search_settings.get("hedge") or {}),
+        )
+
+        # Persistent (SQLite) cache consulted before any network call
+        cache_settings = (config.get("cache") or {}).get("places", {})
+        self.place_cache = PlaceSearchCache.shared(
+            cache_settings.get("db_path", "cache/place_search.sqlite3"),
+            default_ttl_seconds=cache_settings.get("default_ttl_seconds", 259200),
+            category_ttl_seconds=cache_settings.get("category_ttl_seconds"),
+            max_entries=cache_settings.get("max_entries", 5000),
+        )
+
         # Setup LangChain-compatible tools
         self.place_search_tool_list = self._setup_tools()
 
+    def _format_result(self, category: str, place: str, provider: str, result, google_error=None) -> str:
+        """Describe a provider result for the LLM."""
+        if self.compact or isinstance(result, list):
+            return self._format_compact(category, place, provider, result, google_error)
+
+        label = PLACE_LABELS[category]
+        if provider == "google":
+            return f"Following are the {label} {place} as suggested by Google: {result}"
+        if google_error is not None:
+            return f"Google cannot find the details due to {google_error}. \nFollowing are the {label} {place}: {result}"
+        return f"Following are the {label} {place}: {result}"
+
+    def _format_compact(self, category: str, place: str, provider: str, result, google_error=None) -> str:
+        """
+        Compact JSON for the LLM: structured places (Google) or a length-capped
+        answer (Tavily).
+        """
+        output = {"category": category, "place": place, "source": provider}
+        if isinstance(result, list):
+            output["places"] = result
+        else:
+            output["summary"] = truncate_text(result, self.max_chars)
+        if google_error is not None:
+            output["note"] = truncate_text(f"Google failed: {google_error}", 160)
+        return compact_json(output)
+
+    def _search_place(self, category: str, place: str) -> str:
+        """
+        Search one category: persistent cache first, then Google and Tavily
+        (hedged or sequential fallback, see config.yaml). Fresh results are
+        written to the cache.
+        """
+        cached = self.place_cache.lookup(category, place, self.output_mode)
+        if cached is not None:
+            return self._format_result(category, place, *cached)
+
+        provider, result, google_error = self.place_searcher.search(category, place)
+        self.place_cache.set(provider, category, place, result, self.output_mode)
+        return self._format_result(category, place, provider, result, google_error)
+
+    async def _asearch_place(self, category: str, place: str) -> str:
+        """Async version of `_search_place` (used by graph.ainvoke)."""
+        # SQLite is blocking, so cache access runs in a worker thread
+        cached = await asyncio.to_thread(self.place_cache.lookup, category, place, self.output_mode)
+        if cached is not None:
+            return self._format_result(category, place, *cached)
+
+        provider, result, google_error = await self.place_searcher.asearch(category, place)
+        await asyncio.to_thread(self.place_cache.set, provider, category, place, result, self.output_mode)
+        return self._format_result(category, place, provider, result, google_error)
+
     def _setup_tools(self) -> List:
-        """Setup all tools for the place search tool"""
+        """Setup all tools for the place search tool (sync + async implementations)"""
 
-        @tool
         def search_attractions(place: str) -> str:
             """Search attractions of a place"""
-            try:
-                # Try fetching from Google Places
-                attraction_result = self.google_places_search.google_search_attractions(place)
-                if attraction_result:
-                    return f"Following are the attractions of {place} as suggested by Google: {attraction_result}"
-            except Exception as e:
-                # Fallback to Tavily if Google fails
-                tavily_result = self.tavily_search.tavily_search_attractions(place)
-                return f"Google cannot find the details due to {e}. \nFollowing are the attractions of {place}: {tavily_result}"
-
-        @tool
+            return self._search_place("attractions", place)
+
+        async def asearch_attractions(place: str) -> str:
+            return await self._asearch_place("attractions", place)
+
         def search_restaurants(place: str) -> str:
             """Search restaurants of a place"""
-            try:
-                restaurants_result = self.google_places_search.google_search_restaurants(place)
-                if restaurants_result:
-                    return f"Following are the restaurants of {place} as suggested by Google: {restaurants_result}"
-            except Exception as e:
-                # Fallback to Tavily if Google fails
-                tavily_result = self.tavily_search.tavily_search_restaurants(place)
-                return f"Google cannot find the details due to {e}. \nFollowing are the restaurants of {place}: {tavily_result}"
-
-        @tool
+            return self._search_place("restaurants", place)
+
+        async def asearch_restaurants(place: str) -> str:
+            return await self._asearch_place("restaurants", place)
+
         def search_activities(place: str) -> str:
             """Search activities of a place"""
-            try:
-                activities_result = self.google_places_search.google_search_activity(place)
-                if activities_result:
-                    return f"Following are the activities in and around {place} as suggested by Google: {activities_result}"
-            except Exception as e:
-                # Fallback to Tavily if Google fails
-                tavily_result = self.tavily_search.tavily_search_activity(place)
-                return f"Google cannot find the details due to {e}. \nFollowing are the activities of {place}: {tavily_result}"
-
-        @tool
+            return self._search_place("activities", place)
+
+        async def asearch_activities(place: str) -> str:
+            return await self._asearch_place("activities", place)
+
         def search_transportation(place: str) -> str:
             """Search transportation of a place"""
-            try:
-                transportation_result = self.google_places_search.google_search_transportation(place)
-                if transportation_result:
-                    return f"Following are the modes of transportation available in {place} as suggested by Google: {transportation_result}"
-            except Exception as e:
-                # Fallback to Tavily if Google fails
-                tavily_result = self.tavily_search.tavily_search_transportation(place)
-                return f"Google cannot find the details due to {e}. \nFollowing are the modes of transportation available in {place}: {tavily_result}"
+            return self._search_place("transportation", place)
+
+        async def asearch_transportation(place: str) -> str:
+            return await self._asearch_place("transportation", place)
 
         # Return list of all defined tools
-        return [search_attractions, search_restaurants, search_activities, search_transportation]
+        return [
+            StructuredTool.from_function(func=search_attractions, coroutine=asearch_attractions),
+            StructuredTool.from_function(func=search_restaurants, coroutine=asearch_restaurants),
+            StructuredTool.from_function(func=search_activities, coroutine=asearch_activities),
+            StructuredTool.from_function(func=search_transportation, coroutine=asearch_transportation),
+        ]
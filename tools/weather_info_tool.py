@@ -1,8 +1,11 @@
 import os
-from langchain.tools import tool
-from typing import List
-from dotenv import load_dotenv
+from langchain_core.tools import StructuredTool
+from typing import List, Optional
 from utils.weather_info import WeatherForecastTool
+from utils.config_loader import load_config
+from utils.settings import load_env
+from utils.compact_output import compact_json
+from utils.forecast_aggregator import select_days
 
 class WeatherInfoTool:
     """
@@ -27,17 +30,61 @@ class WeatherInfoTool:
         - Initialize the weather service client.
         - Register weather tools (current weather and forecast).
         """
-        load_dotenv()  # Load environment variables from .env file
+        load_env()  # .env is read once per process
         self.api_key = os.environ.get("OPENWEATHERMAP_API_KEY")  # Get API key safely
-        self.weather_service = WeatherForecastTool(self.api_key)  # Weather service instance
+        config = load_config()
+        cache_settings = (config.get("cache") or {}).get("weather", {})
+        self.weather_service = WeatherForecastTool(  # Weather service instance (cached lookups)
+            self.api_key,
+            current_ttl_seconds=cache_settings.get("current_ttl_seconds", 600),
+            forecast_ttl_seconds=cache_settings.get("forecast_ttl_seconds", 3600),
+            stale_ttl_seconds=cache_settings.get("stale_ttl_seconds", 1800),
+        )
+        
+        # "compact" returns the daily forecast as JSON rows instead of text lines
+        self.compact = (config.get("tool_output") or {}).get("mode", "compact") == "compact"
         
         # NOTE: Your method is named `_setup_tool`, but here you're calling `_setup_tools`
         # This will raise an AttributeError. Fix by renaming consistently.
         self.weather_tool_list = self._setup_tool()
     
+    @staticmethod
+    def _format_current_weather(city: str, weather_data: dict) -> str:
+        """Format an OpenWeatherMap current-weather response for the LLM."""
+        if weather_data:
+            temp = weather_data.get('main', {}).get('temp', 'N/A')
+            desc = weather_data.get('weather', [{}])[0].get('description', 'N/A')
+            return f"Current weather in {city}: {temp}°C, {desc}"
+        
+        return f"Could not fetch weather for {city}"
+
+    def _format_forecast(self, city: str, days: list, start_date: Optional[str] = None,
+                         end_date: Optional[str] = None) -> str:
+        """Format the per-day forecast (optionally limited to the trip dates) for the LLM."""
+        if not days:
+            return f"Could not fetch forecast for {city}"
+
+        selected = select_days(days, start_date, end_date)
+        if not selected:
+            return (f"No forecast for {city} on the requested dates; "
+                    f"forecasts cover {days[0]['date']} to {days[-1]['date']}")
+
+        if self.compact:
+            rows = [{k: day[k] for k in ("date", "min", "max", "mean", "pop", "rain_mm", "condition")} for day in selected]
+            return compact_json({"city": city, "unit": "C", "days": rows})
+
+        forecast_summary = [
+            f"{day['date']}: {day['min']}–{day['max']}°C (avg {day['mean']}), {day['condition']}, "
+            f"rain chance {day['pop']}% ({day['rain_mm']} mm)"
+            for day in selected
+        ]
+        return f"Weather forecast for {city}:\n" + "\n".join(forecast_summary)
+    
     def _setup_tool(self) -> list:
         """
         Initializes and returns a list of weather-related tool functions.
+        Each tool has a sync implementation (graph.invoke) and an async one
+        (graph.ainvoke) that does not block the event loop.
         Defines and registers:
             1. get_current_weather(city: str) -> str
             2. get_weather_forecast(city: str) -> str
@@ -45,7 +92,6 @@ class WeatherInfoTool:
             list: A list of tool functions.
         """
 
-        @tool
         def get_current_weather(city: str) -> str:
             """
             Fetches real-time weather data for a given city.
@@ -56,42 +102,32 @@ class WeatherInfoTool:
             """
             # Fetch weather from service
             weather_data = self.weather_service.get_current_weather(city)
-            
-            if weather_data:
-                temp = weather_data.get('main', {}).get('temp', 'N/A')
-                desc = weather_data.get('weather', [{}])[0].get('description', 'N/A')
-                return f"Current weather in {city}: {temp}°C, {desc}"
-            
-            return f"Could not fetch weather for {city}"
+            return self._format_current_weather(city, weather_data)
+
+        async def aget_current_weather(city: str) -> str:
+            weather_data = await self.weather_service.aget_current_weather(city)
+            return self._format_current_weather(city, weather_data)
         
-        @tool
-        def get_weather_forecast(city: str) -> str:
+        def get_weather_forecast(city: str, start_date: Optional[str] = None, end_date: Optional[str] = None) -> str:
             """
-            Retrieves the weather forecast for a city.
+            Retrieves the daily weather forecast (up to 5 days ahead) for a city.
             Args:
                 city (str): City name.
+                start_date (str): Optional first trip day, YYYY-MM-DD.
+                end_date (str): Optional last trip day, YYYY-MM-DD.
             Returns:
-                str: Forecast summary or error message.
+                str: Per-day min/max/mean temperature, rain chance and condition, or error message.
             """
-            forecast_data = self.weather_service.get_forecast_weather(city)
-            
-            # Check if forecast data is valid
-            if forecast_data and 'list' in forecast_data:
-                forecast_summary = []
-                
-                # Loop through forecast list (3-hour intervals usually)
-                for i in range(len(forecast_data['list'])):
-                    item = forecast_data['list'][i]
-                    date = item['dt_txt'].split(' ')[0]
-                    temp = item['main']['temp']
-                    desc = item['weather'][0]['description']
-                    
-                    # Append formatted forecast string
-                    forecast_summary.append(f"{date}: {temp}°C, {desc}")
-                    
-                return f"Weather forecast for {city}:\n" + "\n".join(forecast_summary)
-            
-            return f"Could not fetch forecast for {city}"
+            days = self.weather_service.get_daily_forecast(city)
+            return self._format_forecast(city, days, start_date, end_date)
+
+        async def aget_weather_forecast(city: str, start_date: Optional[str] = None,
+                                        end_date: Optional[str] = None) -> str:
+            days = await self.weather_service.aget_daily_forecast(city)
+            return self._format_forecast(city, days, start_date, end_date)
     
         # Return both tools as a list
-        return [get_current_weather, get_weather_forecast]
\ No newline at end of file
+        return [
+            StructuredTool.from_function(func=get_current_weather, coroutine=aget_current_weather),
+            StructuredTool.from_function(func=get_weather_forecast, coroutine=aget_weather_forecast),
+        ]
@@ -0,0 +1,169 @@
+import asyncio
+import re
+import threading
+from typing import Any, Callable, Optional
+
+from utils.cache_backend import CacheBackend, MemoryBackend, get_cache_backend
+
+
+def normalize_place(place: str) -> str:
+    """
+    Normalize a place name for use in cache keys, so "  Goa ,India" and
+    "goa, india" share one entry.
+    """
+    place = re.sub(r"\s*,\s*", ", ", place.strip().lower())
+    return re.sub(r"\s+", " ", place)
+
+
+class TTLCache:
+    """
+    Thread-safe cache with per-entry age tracking, stored in a cache backend.
+
+    - Entries expire `ttl_seconds` after they were stored (a lookup may pass
+      its own `ttl` to apply a different freshness bound).
+    - When `maxsize` is set, the least recently used entry is evicted first.
+    - Hit/miss counters and entry ages are available through `stats()`.
+    - Without a `namespace` entries live in a private in-process store; with
+      one they go to the configured backend (utils.cache_backend), which may
+      be shared with the other workers on the host.
+    """
+
+    def __init__(self, ttl_seconds: float = 3600.0, maxsize: Optional[int] = None,
+                 namespace: Optional[str] = None, backend: Optional[CacheBackend] = None):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self.namespace = namespace or "default"
+        self._backend = backend if backend is not None or namespace else MemoryBackend()
+        if self._backend is not None:
+            self._backend.configure(self.namespace, max_entries=maxsize)
+
+    @property
+    def backend(self) -> CacheBackend:
+        # The configured backend is resolved on first use, not at import time
+        if self._backend is None:
+            backend = get_cache_backend()
+            backend.configure(self.namespace, max_entries=self.maxsize)
+            self._backend = backend
+        return self._backend
+
+    def get_entry(self, key, ttl: Optional[float] = None):
+        """
+        Return (value, age_seconds) for a key, or None when missing.
+        Expired entries are still returned when `ttl` is negative (used for
+        stale reads); otherwise they count as a miss.
+        """
+        ttl = self.ttl_seconds if ttl is None else ttl
+        return self.backend.get(self.namespace, key, max_age=ttl if ttl >= 0 else None)
+
+    def get(self, key, default=None, ttl: Optional[float] = None):
+        """Return the cached value for a key if it is still fresh, else `default`."""
+        entry = self.get_entry(key, ttl)
+        return default if entry is None else entry[0]
+
+    def set(self, key, value) -> None:
+        """Store a value (resets its age) and evict LRU entries over `maxsize`."""
+        self.backend.set(self.namespace, key, value)
+
+    def delete(self, key) -> None:
+        self.backend.delete(self.namespace, key)
+
+    def clear(self) -> None:
+        self.backend.clear(self.namespace)
+
+    def __len__(self) -> int:
+        return self.backend.count(self.namespace)
+
+    def stats(self) -> dict:
+        """Return hit/miss counters, hit rate and the age of every entry."""
+        stats = self.backend.stats(self.namespace)["namespaces"][self.namespace]
+        return {**stats, "ttl_seconds": self.ttl_seconds, "backend": self.backend.name,
+                "ages_seconds": self.backend.ages(self.namespace)}
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait for and share its result (or exception). Works for both
+    threads (`do`) and asyncio tasks (`ado`).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}          # key -> (threading.Event, result holder)
+        self._async_calls = {}    # (event loop, key) -> asyncio.Future
+        self._async_waiters = {}  # (event loop, key) -> callers awaiting the future
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key, fn: Callable[[], Any]) -> Any:
+        """Run `fn()` once per in-flight key and return its result to every caller."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = (threading.Event(), {})
+                self._calls[key] = call
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        event, holder = call
+        if not leader:
+            # Wait for the leader and share its outcome
+            event.wait()
+            if "error" in holder:
+                raise holder["error"]
+            return holder["value"]
+
+        try:
+            holder["value"] = fn()
+            return holder["value"]
+        except BaseException as e:
+            holder["error"] = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            event.set()
+
+    async def ado(self, key, coro_fn: Callable[[], Any]) -> Any:
+        """Async version of `do`: `coro_fn()` must return an awaitable."""
+        # Futures belong to one event loop, so in-flight calls are tracked per loop
+        key = (asyncio.get_running_loop(), key)
+        future = self._async_calls.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            future = asyncio.ensure_future(coro_fn())
+            self._async_calls[key] = future
+            self.executions += 1
+            future.add_done_callback(lambda done: self._forget(key, done))
+
+        # shield() so one cancelled caller does not cancel the shared call ...
+        self._async_waiters[key] = self._async_waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # ... but when the last caller is cancelled nobody needs it any more
+            if self._async_waiters.get(key) == 1 and not future.done():
+                future.cancel()
+            raise
+        finally:
+            self._async_waiters[key] -= 1
+            if not self._async_waiters[key]:
+                del self._async_waiters[key]
+
+    def in_flight(self, key) -> bool:
+        """True if a call for this key is currently running (thread or asyncio)."""
+        if key in self._calls:
+            return True
+        return any(k[1] == key for k in self._async_calls)
+
+    def _forget(self, key, future) -> None:
+        if self._async_calls.get(key) is future:
+            del self._async_calls[key]
+
+    def stats(self) -> dict:
+        return {"executions": self.executions, "coalesced": self.coalesced}
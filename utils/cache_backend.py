@@ -0,0 +1,530 @@
+"""
+Pluggable storage behind the tool and plan caches.
+
+Every cache names a namespace ("currency", "weather", "google_lookups",
+"plans") and stores entries through the process-wide backend picked in
+config.yaml `cache.backend` (CACHE_BACKEND env var overrides the type):
+
+- "memory": per-process OrderedDict (the default; nothing is shared).
+- "sqlite": one WAL-mode SQLite file, shared by every uvicorn worker on the
+  host and kept across restarts.
+- "redis":  any Redis-compatible server (redis-py client, or a stand-in with
+  the same commands), shared across hosts.
+
+Each namespace has its own retention TTL and LRU bound. Hit/miss/eviction
+counters are kept per namespace; the shared backends also add up the
+counters of all workers, so /cache/stats shows whether workers reuse each
+other's entries.
+"""
+import json
+import os
+from abc import ABC, abstractmethod
+import socket
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Mapping, Optional
+
+from logger.logging import get_logger
+from utils.config_loader import load_config
+
+logger = get_logger(__name__)
+
+COUNTERS = ("hits", "misses", "sets", "evictions", "expired")
+
+
+def key_text(key) -> str:
+    """Stable text form of a cache key (tuples and strings alike) for shared stores."""
+    return json.dumps(key, default=str, separators=(",", ":"))
+
+
+class CacheBackend(ABC):
+    """
+    Base class: namespace policies and counters; subclasses store the entries.
+
+    Entries are (value, stored_at). `get` returns (value, age_seconds) while
+    the entry is younger than the namespace TTL (and than `max_age` when
+    given); an entry older than `max_age` but within the TTL stays stored, so
+    callers can still read it as stale data.
+
+    Subclasses must implement every abstract method; an incomplete backend
+    fails when it is built (TypeError), not on its first use.
+    """
+
+    name = "base"
+    shared = False      # True when other processes see the same entries
+
+    def __init__(self, namespaces: Optional[Mapping] = None, flush_interval_seconds: float = 5.0):
+        """
+        Args:
+            namespaces (Mapping): {namespace: {"ttl_seconds", "max_entries"}} (None = unbounded).
+            flush_interval_seconds (float): How often shared backends publish this worker's counters.
+        """
+        self.policies = {}
+        for namespace, policy in (namespaces or {}).items():
+            policy = policy or {}
+            self.policies[namespace] = {"ttl_seconds": policy.get("ttl_seconds"),
+                                        "max_entries": policy.get("max_entries")}
+        self.flush_interval_seconds = float(flush_interval_seconds)
+        self._counters = {}         # namespace -> {counter: total in this process}
+        self._unflushed = {}        # namespace -> {counter: not yet published}
+        self._last_flush = time.monotonic()
+        self._counter_lock = threading.Lock()
+
+    # --------------------------
+    # Policies and counters
+    # --------------------------
+    def configure(self, namespace: str, ttl_seconds: Optional[float] = None,
+                  max_entries: Optional[int] = None) -> None:
+        """Defaults for a namespace (values set in config.yaml take precedence)."""
+        policy = self.policies.setdefault(namespace, {"ttl_seconds": None, "max_entries": None})
+        if policy["ttl_seconds"] is None:
+            policy["ttl_seconds"] = ttl_seconds
+        if policy["max_entries"] is None:
+            policy["max_entries"] = max_entries
+
+    def policy(self, namespace: str) -> dict:
+        return self.policies.get(namespace) or {"ttl_seconds": None, "max_entries": None}
+
+    def _count(self, namespace: str, counter: str, amount: int = 1) -> None:
+        if not amount:
+            return
+        with self._counter_lock:
+            for table in (self._counters, self._unflushed):
+                counts = table.setdefault(namespace, dict.fromkeys(COUNTERS, 0))
+                counts[counter] += amount
+        if self.shared and time.monotonic() - self._last_flush >= self.flush_interval_seconds:
+            self.flush_counters()
+
+    def flush_counters(self) -> None:
+        """Publish this worker's counters to the shared store (no-op for memory)."""
+        with self._counter_lock:
+            pending, self._unflushed = self._unflushed, {}
+            self._last_flush = time.monotonic()
+        if pending and self.shared:
+            try:
+                self._publish_counters(pending)
+            except Exception as e:
+                # Stats must never break a cache lookup
+                logger.warning("Could not publish %s cache counters: %s", self.name, e)
+
+    @abstractmethod
+    def _publish_counters(self, pending: dict) -> None:
+        """Add this worker's pending counters to the shared totals."""
+
+    def _all_worker_counters(self) -> dict:
+        """namespace -> counters summed over every worker (shared backends)."""
+        return {}
+
+    @staticmethod
+    def _expired(stored_at: float, now: float, ttl: Optional[float]) -> bool:
+        return ttl is not None and now - stored_at > ttl
+
+    # --------------------------
+    # Storage (implemented by subclasses)
+    # --------------------------
+    @abstractmethod
+    def get(self, namespace: str, key, max_age: Optional[float] = None) -> Optional[tuple]:
+        """(value, age_seconds) of a fresh entry, or None (counted as a hit or a miss)."""
+
+    @abstractmethod
+    def set(self, namespace: str, key, value) -> None:
+        """Store a value and evict LRU entries beyond the namespace bound."""
+
+    @abstractmethod
+    def delete(self, namespace: str, key) -> None:
+        """Remove one entry (no-op when missing)."""
+
+    @abstractmethod
+    def clear(self, namespace: str) -> None:
+        """Remove every entry of a namespace."""
+
+    @abstractmethod
+    def count(self, namespace: str) -> int:
+        """Number of stored entries in a namespace."""
+
+    def ages(self, namespace: str, limit: int = 100) -> dict:
+        """Age in seconds of (up to `limit`) stored entries, keyed by text key."""
+        return {}
+
+    # --------------------------
+    # Stats
+    # --------------------------
+    def stats(self, namespace: Optional[str] = None) -> dict:
+        """
+        Per-namespace entries, policy and counters (hit rate included); shared
+        backends add "all_workers" with the counters of every worker.
+        """
+        self.flush_counters()
+        with self._counter_lock:
+            counters = {ns: dict(counts) for ns, counts in self._counters.items()}
+        all_workers = self._all_worker_counters() if self.shared else {}
+
+        namespaces = [namespace] if namespace else sorted(set(self.policies) | set(counters) | set(all_workers))
+        result = {}
+        for ns in namespaces:
+            counts = counters.get(ns) or dict.fromkeys(COUNTERS, 0)
+            entry = {"entries": self.count(ns), **self.policy(ns), **counts,
+                     "hit_rate": _hit_rate(counts)}
+            if self.shared:
+                totals = all_workers.get(ns) or dict.fromkeys(COUNTERS, 0)
+                entry["all_workers"] = {**totals, "hit_rate": _hit_rate(totals)}
+            result[ns] = entry
+        return {"backend": self.name, "shared": self.shared, "namespaces": result}
+
+
+def _hit_rate(counts: dict) -> float:
+    lookups = counts.get("hits", 0) + counts.get("misses", 0)
+    return round(counts.get("hits", 0) / lookups, 4) if lookups else 0.0
+
+
+class MemoryBackend(CacheBackend):
+    """In-process LRU dicts per namespace; values are stored as-is (no copies)."""
+
+    name = "memory"
+
+    def __init__(self, namespaces: Optional[Mapping] = None, **settings):
+        super().__init__(namespaces, **settings)
+        self._entries = {}          # namespace -> OrderedDict(key -> (value, stored_at))
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, key, max_age: Optional[float] = None) -> Optional[tuple]:
+        ttl = self.policy(namespace)["ttl_seconds"]
+        with self._lock:
+            entries = self._entries.get(namespace)
+            entry = entries.get(key) if entries is not None else None
+            if entry is None:
+                outcome = "misses"
+            else:
+                value, stored_at = entry
+                age = time.monotonic() - stored_at
+                if self._expired(stored_at, time.monotonic(), ttl):
+                    del entries[key]
+                    outcome = "expired"
+                elif max_age is not None and age > max_age:
+                    outcome = "misses"
+                else:
+                    entries.move_to_end(key)
+                    outcome = "hits"
+
+        if outcome == "expired":
+            self._count(namespace, "expired")
+            outcome = "misses"
+        self._count(namespace, outcome)
+        return (value, age) if outcome == "hits" else None
+
+    def set(self, namespace: str, key, value) -> None:
+        max_entries = self.policy(namespace)["max_entries"]
+        evicted = 0
+        with self._lock:
+            entries = self._entries.setdefault(namespace, OrderedDict())
+            entries[key] = (value, time.monotonic())
+            entries.move_to_end(key)
+            if max_entries is not None:
+                while len(entries) > max_entries:
+                    entries.popitem(last=False)
+                    evicted += 1
+        self._count(namespace, "sets")
+        self._count(namespace, "evictions", evicted)
+
+    def delete(self, namespace: str, key) -> None:
+        with self._lock:
+            self._entries.get(namespace, {}).pop(key, None)
+
+    def clear(self, namespace: str) -> None:
+        with self._lock:
+            self._entries.pop(namespace, None)
+
+    def count(self, namespace: str) -> int:
+        return len(self._entries.get(namespace, ()))
+
+    def _publish_counters(self, pending: dict) -> None:
+        pass   # per process: nothing to share with other workers
+
+    def ages(self, namespace: str, limit: int = 100) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            items = list(self._entries.get(namespace, {}).items())[-limit:]
+        return {str(key): round(now - stored_at, 1) for key, (_, stored_at) in items}
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Entries in one SQLite file in WAL mode, so every worker process on the
+    host reads and writes the same cache (values are stored as JSON).
+    """
+
+    name = "sqlite"
+    shared = True
+
+    def __init__(self, path: str = "cache/shared_cache.sqlite3", namespaces: Optional[Mapping] = None, **settings):
+        super().__init__(namespaces, **settings)
+        self.path = path
+        self.worker = f"{socket.gethostname()}:{os.getpid()}"
+        # sqlite3 connections are per thread
+        self._local = threading.local()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._create_schema()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)  # autocommit
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self) -> None:
+        conn = self._connection()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace   TEXT NOT NULL,
+                key         TEXT NOT NULL,
+                value       TEXT NOT NULL,
+                stored_at   REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_entries_accessed ON cache_entries (namespace, accessed_at)")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_counters (
+                namespace TEXT NOT NULL,
+                worker    TEXT NOT NULL,
+                hits      INTEGER NOT NULL DEFAULT 0,
+                misses    INTEGER NOT NULL DEFAULT 0,
+                sets      INTEGER NOT NULL DEFAULT 0,
+                evictions INTEGER NOT NULL DEFAULT 0,
+                expired   INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (namespace, worker)
+            )
+            """
+        )
+
+    def get(self, namespace: str, key, max_age: Optional[float] = None) -> Optional[tuple]:
+        now = time.time()
+        text = key_text(key)
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT value, stored_at FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, text)
+        ).fetchone()
+
+        if row is None:
+            self._count(namespace, "misses")
+            return None
+        if self._expired(row[1], now, self.policy(namespace)["ttl_seconds"]):
+            conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, text))
+            self._count(namespace, "expired")
+            self._count(namespace, "misses")
+            return None
+        age = now - row[1]
+        if max_age is not None and age > max_age:
+            self._count(namespace, "misses")
+            return None
+
+        conn.execute("UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?", (now, namespace, text))
+        self._count(namespace, "hits")
+        return json.loads(row[0]), age
+
+    def set(self, namespace: str, key, value) -> None:
+        now = time.time()
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (namespace, key, value, stored_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+            (namespace, key_text(key), json.dumps(value, default=str), now, now),
+        )
+        self._count(namespace, "sets")
+
+        max_entries = self.policy(namespace)["max_entries"]
+        if max_entries is not None:
+            overflow = self.count(namespace) - max_entries
+            if overflow > 0:
+                conn.execute(
+                    "DELETE FROM cache_entries WHERE rowid IN (SELECT rowid FROM cache_entries "
+                    "WHERE namespace = ? ORDER BY accessed_at ASC LIMIT ?)",
+                    (namespace, overflow),
+                )
+                self._count(namespace, "evictions", overflow)
+
+    def delete(self, namespace: str, key) -> None:
+        self._connection().execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                                   (namespace, key_text(key)))
+
+    def clear(self, namespace: str) -> None:
+        self._connection().execute("DELETE FROM cache_entries WHERE namespace = ?", (namespace,))
+
+    def count(self, namespace: str) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM cache_entries WHERE namespace = ?",
+                                          (namespace,)).fetchone()[0]
+
+    def ages(self, namespace: str, limit: int = 100) -> dict:
+        now = time.time()
+        rows = self._connection().execute(
+            "SELECT key, stored_at FROM cache_entries WHERE namespace = ? ORDER BY accessed_at DESC LIMIT ?",
+            (namespace, limit),
+        ).fetchall()
+        return {key: round(now - stored_at, 1) for key, stored_at in rows}
+
+    def _publish_counters(self, pending: dict) -> None:
+        conn = self._connection()
+        for namespace, counts in pending.items():
+            conn.execute(
+                "INSERT INTO cache_counters (namespace, worker, hits, misses, sets, evictions, expired) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (namespace, worker) DO UPDATE SET "
+                "hits = hits + excluded.hits, misses = misses + excluded.misses, sets = sets + excluded.sets, "
+                "evictions = evictions + excluded.evictions, expired = expired + excluded.expired",
+                (namespace, self.worker, *(counts[name] for name in COUNTERS)),
+            )
+
+    def _all_worker_counters(self) -> dict:
+        rows = self._connection().execute(
+            "SELECT namespace, SUM(hits), SUM(misses), SUM(sets), SUM(evictions), SUM(expired), COUNT(*) "
+            "FROM cache_counters GROUP BY namespace"
+        ).fetchall()
+        return {row[0]: {**dict(zip(COUNTERS, row[1:6])), "workers": row[6]} for row in rows}
+
+
+class RedisBackend(CacheBackend):
+    """
+    Entries in a Redis-compatible server (values as JSON, expiry through the
+    server's own TTLs, LRU order in one sorted set per namespace).
+
+    Only get/set/delete, sorted-set and hash commands are used, so an
+    in-process stand-in with the redis-py interface works as well.
+    """
+
+    name = "redis"
+    shared = True
+
+    def __init__(self, url: str = "redis://localhost:6379/0", namespaces: Optional[Mapping] = None,
+                 key_prefix: str = "travel-planner", client: Any = None, **settings):
+        super().__init__(namespaces, **settings)
+        if client is None:
+            # Optional dependency, only needed for this backend
+            import redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.key_prefix = key_prefix
+
+    def _entry_key(self, namespace: str, text: str) -> str:
+        return f"{self.key_prefix}:{namespace}:{text}"
+
+    def _index_key(self, namespace: str) -> str:
+        return f"{self.key_prefix}:lru:{namespace}"
+
+    def _counters_key(self, namespace: str) -> str:
+        return f"{self.key_prefix}:counters:{namespace}"
+
+    def get(self, namespace: str, key, max_age: Optional[float] = None) -> Optional[tuple]:
+        now = time.time()
+        text = key_text(key)
+        raw = self.client.get(self._entry_key(namespace, text))
+        if raw is None:
+            # Gone (the server expired or evicted it): drop it from the LRU index too
+            self.client.zrem(self._index_key(namespace), text)
+            self._count(namespace, "misses")
+            return None
+
+        entry = json.loads(raw)
+        age = now - entry["stored_at"]
+        if max_age is not None and age > max_age:
+            self._count(namespace, "misses")
+            return None
+
+        self.client.zadd(self._index_key(namespace), {text: now})
+        self._count(namespace, "hits")
+        return entry["value"], age
+
+    def set(self, namespace: str, key, value) -> None:
+        now = time.time()
+        text = key_text(key)
+        policy = self.policy(namespace)
+        ttl = policy["ttl_seconds"]
+        payload = json.dumps({"value": value, "stored_at": now}, default=str)
+        self.client.set(self._entry_key(namespace, text), payload, ex=int(ttl) if ttl else None)
+        self.client.zadd(self._index_key(namespace), {text: now})
+        self._count(namespace, "sets")
+
+        max_entries = policy["max_entries"]
+        if max_entries is not None:
+            overflow = self.client.zcard(self._index_key(namespace)) - max_entries
+            if overflow > 0:
+                oldest = [member for member, _ in self.client.zpopmin(self._index_key(namespace), overflow)]
+                self.client.delete(*(self._entry_key(namespace, _text(member)) for member in oldest))
+                self._count(namespace, "evictions", len(oldest))
+
+    def delete(self, namespace: str, key) -> None:
+        text = key_text(key)
+        self.client.delete(self._entry_key(namespace, text))
+        self.client.zrem(self._index_key(namespace), text)
+
+    def clear(self, namespace: str) -> None:
+        members = [_text(member) for member in self.client.zrange(self._index_key(namespace), 0, -1)]
+        self.client.delete(self._index_key(namespace), *(self._entry_key(namespace, text) for text in members))
+
+    def count(self, namespace: str) -> int:
+        # LRU index size; may include a few entries the server has expired since
+        return self.client.zcard(self._index_key(namespace))
+
+    def _publish_counters(self, pending: dict) -> None:
+        for namespace, counts in pending.items():
+            for name, amount in counts.items():
+                if amount:
+                    self.client.hincrby(self._counters_key(namespace), name, amount)
+
+    def _all_worker_counters(self) -> dict:
+        totals = {}
+        for namespace in self.policies:
+            raw = self.client.hgetall(self._counters_key(namespace)) or {}
+            counts = {_text(name): int(value) for name, value in raw.items()}
+            if counts:
+                totals[namespace] = {name: counts.get(name, 0) for name in COUNTERS}
+        return totals
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+BACKENDS = {"memory": MemoryBackend, "sqlite": SQLiteBackend, "redis": RedisBackend}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def create_cache_backend(settings: Optional[Mapping] = None) -> CacheBackend:
+    """
+    Build a backend from config.yaml `cache.backend` (CACHE_BACKEND env var
+    overrides the type).
+    """
+    settings = dict(settings or {})
+    kind = os.environ.get("CACHE_BACKEND") or settings.get("type") or "memory"
+    if kind not in BACKENDS:
+        raise ValueError(f"Unknown cache backend '{kind}' (one of {', '.join(BACKENDS)})")
+
+    common = {"namespaces": settings.get("namespaces"),
+              "flush_interval_seconds": settings.get("flush_interval_seconds", 5.0)}
+    if kind == "sqlite":
+        return SQLiteBackend(settings.get("sqlite_path", "cache/shared_cache.sqlite3"), **common)
+    if kind == "redis":
+        return RedisBackend(settings.get("redis_url", "redis://localhost:6379/0"),
+                            key_prefix=settings.get("key_prefix", "travel-planner"), **common)
+    return MemoryBackend(**common)
+
+
+def get_cache_backend() -> CacheBackend:
+    """The process-wide cache backend (built on first use from config.yaml)."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_cache_backend(load_config().get("cache", {}).get("backend"))
+            logger.info("Cache backend: %s", _backend.name)
+        return _backend
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from exception.exception_handling import CassetteMissError
+from logger.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Query/body fields that carry credentials; they never reach the cassette key or file
+SECRET_FIELDS = {"appid", "key", "apikey", "api_key", "signature", "client", "token"}
+# Environment variables whose values are scrubbed wherever they appear (e.g. in URL paths)
+SECRET_ENV_VARS = ("OPENWEATHERMAP_API_KEY", "EXCHANGE_RATE_API_KEY", "GPLACES_API_KEY",
+                   "TAVILY_API_KEY", "ALPHAVANTAGE_API_KEY")
+REDACTED = "REDACTED"
+
+
+def _scrub(text: str) -> str:
+    for name in SECRET_ENV_VARS:
+        secret = os.environ.get(name)
+        if secret and len(secret) >= 6:
+            text = text.replace(secret, REDACTED)
+    return text
+
+
+def request_key(provider: str, method: str, url: str, params=None, json_body=None) -> tuple:
+    """
+    Canonical form of a request, without credentials: (key hash, readable description).
+
+    Query parameters from the URL and `params` are merged and sorted, so the
+    same request always maps to the same cassette entry.
+    """
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)]
+    if params:
+        query += list(params.items()) if isinstance(params, dict) else list(params)
+    query = sorted((str(k), str(v)) for k, v in query if str(k).lower() not in SECRET_FIELDS)
+    canonical_url = _scrub(urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), "")))
+
+    body = ""
+    if json_body is not None:
+        if isinstance(json_body, dict):
+            json_body = {k: v for k, v in json_body.items() if str(k).lower() not in SECRET_FIELDS}
+        body = _scrub(json.dumps(json_body, sort_keys=True, default=str))
+
+    description = f"{provider} {method.upper()} {canonical_url}" + (f" {body}" if body else "")
+    return hashlib.sha256(description.encode()).hexdigest(), description
+
+
+class Cassette:
+    """
+    Record/replay store for upstream provider responses (SQLite file, one
+    zlib-compressed row per distinct request).
+
+    - "record": requests go upstream as usual; every completed response is
+      stored with its status, content type and latency.
+    - "replay": responses are served from the file, after the recorded latency
+      ("original") or immediately ("zero"); nothing goes upstream. A request
+      that was never recorded raises CassetteMissError, or goes upstream when
+      `on_miss` is "live".
+    - "off": the transport behaves as if the cassette did not exist.
+
+    Keys are credential-free (see request_key), so cassettes can be shared.
+    """
+
+    MODES = ("off", "record", "replay")
+
+    def __init__(self, path: str = "cassettes/providers.sqlite3", mode: str = "off",
+                 latency: str = "original", on_miss: str = "error"):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown cassette mode '{mode}' (one of {', '.join(self.MODES)})")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.on_miss = on_miss
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, settings: Optional[dict] = None) -> "Cassette":
+        """Build from config.yaml `cassette` (CASSETTE_MODE env var overrides the mode)."""
+        settings = dict(settings or {})
+        mode = os.environ.get("CASSETTE_MODE") or settings.get("mode") or "off"
+        return cls(settings.get("path", "cassettes/providers.sqlite3"), mode,
+                   latency=settings.get("latency", "original"), on_miss=settings.get("on_miss", "error"))
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    # --------------------------
+    # SQLite plumbing
+    # --------------------------
+    def _connection(self) -> sqlite3.Connection:
+        # Caller must hold self._lock
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key          TEXT PRIMARY KEY,
+                    provider     TEXT NOT NULL,
+                    request      TEXT NOT NULL,
+                    status       INTEGER NOT NULL,
+                    content_type TEXT,
+                    body         BLOB NOT NULL,
+                    elapsed      REAL NOT NULL,
+                    recorded_at  REAL NOT NULL
+                )
+                """
+            )
+            self._conn = conn
+        return self._conn
+
+    # --------------------------
+    # Public API
+    # --------------------------
+    def record(self, provider: str, method: str, url: str, kwargs: dict, status: int,
+               content_type: Optional[str], body: bytes, elapsed: float) -> None:
+        """Store one upstream response (the latest recording of a request wins)."""
+        key, description = request_key(provider, method, url, kwargs.get("params"), kwargs.get("json"))
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, provider, description, status, content_type, zlib.compress(body, 6), elapsed, time.time()),
+            )
+            self.recorded += 1
+
+    def lookup(self, provider: str, method: str, url: str, kwargs: dict) -> Optional[dict]:
+        """
+        The recorded response of a request as {"status", "content_type", "body",
+        "elapsed", "delay"} (delay = seconds to wait before serving it); None on a
+        miss with on_miss "live"; raises CassetteMissError otherwise.
+        """
+        key, description = request_key(provider, method, url, kwargs.get("params"), kwargs.get("json"))
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT status, content_type, body, elapsed FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+            else:
+                self.replayed += 1
+
+        if row is None:
+            if self.on_miss == "live":
+                logger.warning("Cassette miss, going upstream: %s", description)
+                return None
+            raise CassetteMissError(description)
+
+        status, content_type, body, elapsed = row
+        return {"status": status, "content_type": content_type, "body": zlib.decompress(body),
+                "elapsed": elapsed, "delay": elapsed if self.latency == "original" else 0.0}
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = 0
+            if self.mode != "off" and (self._conn is not None or os.path.exists(self.path)):
+                entries = self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"mode": self.mode, "path": self.path, "latency": self.latency, "entries": entries,
+                "recorded": self.recorded, "replayed": self.replayed, "misses": self.misses}
@@ -0,0 +1,72 @@
+import json
+import re
+
+# Google price_level (0-4) as the familiar symbols
+PRICE_SYMBOLS = {0: "free", 1: "$", 2: "$$", 3: "$$$", 4: "$$$$"}
+
+
+def compact_json(data) -> str:
+    """Serialize tool output without indentation or spaces after separators."""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def truncate_text(text: str, max_chars: int) -> str:
+    """
+    Collapse whitespace and cut text to `max_chars`, preferring the end of a
+    sentence, then a word boundary.
+    """
+    text = " ".join(str(text).split())
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    sentence_end = max(cut.rfind(". "), cut.rfind("! "), cut.rfind("? "))
+    if sentence_end > max_chars // 2:
+        return cut[:sentence_end + 1]
+    return cut.rsplit(" ", 1)[0] + "…"
+
+
+def short_address(address: str, max_chars: int = 60) -> str:
+    """
+    Shorten a Google formatted address to its locality part:
+    "Fort Aguada Rd, Candolim, Goa 403515, India" -> "Candolim, Goa".
+    """
+    parts = [part.strip() for part in (address or "").split(",") if part.strip()]
+    if len(parts) > 2:
+        parts = parts[:-1]            # country
+    parts = parts[-2:]                # locality, region
+    # Drop postcodes ("Goa 403515", "75007 Paris")
+    parts = [re.sub(r"^\d[\d -]*\s+|\s*\b[A-Z0-9]*\d[A-Z0-9 -]*$", "", part).strip() or part for part in parts]
+    return truncate_text(", ".join(parts), max_chars)
+
+
+def compact_places(results: list, top_k: int = 5, address_chars: int = 60) -> list:
+    """
+    Reduce Google Places text-search results to the fields a travel plan
+    needs, deduplicated by place id / name and capped at `top_k`.
+
+    Returns:
+        list: [{"name", "rating", "reviews", "price", "address"}] (missing fields omitted).
+    """
+    places, seen = [], set()
+    for result in results:
+        name = (result.get("name") or "").strip()
+        key = result.get("place_id") or name.lower()
+        if not name or key in seen or name.lower() in seen:
+            continue
+        seen.update({key, name.lower()})
+
+        item = {"name": name}
+        if result.get("rating") is not None:
+            item["rating"] = result["rating"]
+        if result.get("user_ratings_total"):
+            item["reviews"] = result["user_ratings_total"]
+        if result.get("price_level") is not None:
+            item["price"] = PRICE_SYMBOLS.get(result["price_level"], result["price_level"])
+        address = result.get("formatted_address") or result.get("vicinity")
+        if address:
+            item["address"] = short_address(address, address_chars)
+        places.append(item)
+        if len(places) >= top_k:
+            break
+    return places
+
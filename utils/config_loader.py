@@ -1,22 +1,37 @@
-import yaml
 import os
+from typing import Mapping
 
-def load_config(config_path: str = "config/config.yaml") -> dict:
+from utils.settings import CONFIG_PATH, get_settings
+
+
+def load_config(config_path: str = CONFIG_PATH) -> Mapping:
     """
     Load configuration settings from a YAML file.
 
+    The file is parsed once per process (and again only when it changes on
+    disk); every caller shares the same read-only copy.
+
     Args:
-        config_path (str): Path to the config.yaml file. 
-                           Defaults to "config/config.yaml".
+        config_path (str): Path to the config.yaml file.
+                           Defaults to "config/config.yaml"
+                           (or the TRAVEL_PLANNER_CONFIG env var).
 
     Returns:
-        dict: Parsed configuration as a Python dictionary.
+        Mapping: Parsed configuration (read-only, dictionary-style access).
     """
-    with open(config_path, "r") as file:
-        # Load YAML content into a Python dictionary
-        config = yaml.safe_load(file)
+    return get_settings(config_path).config
 
-        # Debug (optional): Uncomment if you want to see loaded config
-        # print(config)
 
-    return config
+def load_model_provider(config_path: str = CONFIG_PATH) -> str:
+    """
+    LLM provider the app runs with: the MODEL_PROVIDER env var, else
+    config.yaml `runtime.model_provider`, else "groq".
+
+    Args:
+        config_path (str): Path to the config.yaml file.
+
+    Returns:
+        str: "groq", "openai", "fake" or "router".
+    """
+    config = load_config(config_path)   # also loads .env into the environment
+    return os.environ.get("MODEL_PROVIDER") or config.get("runtime", {}).get("model_provider", "groq")
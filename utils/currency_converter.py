@@ -1,47 +1,135 @@
-import requests
+from utils.cache import TTLCache, SingleFlight
+from utils.http_transport import get_transport
+
+# Rate tables shared by every CurrencyConverter in the process (and by the
+# other workers with a shared cache backend): base currency -> rates
+RATE_TABLE_CACHE = TTLCache(ttl_seconds=3600, namespace="currency")
+_RATE_TABLE_FLIGHTS = SingleFlight()
 
 class CurrencyConverter:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, ttl_seconds: float = 3600, pivot_currency: str = "USD"):
         """
         Initialize the CurrencyConverter with API key.
         Args:
             api_key (str): Your ExchangeRate API key.
+            ttl_seconds (float): How long a downloaded rate table stays fresh.
+            pivot_currency (str): Base currency of the single rate table that
+                                  every conversion is derived from (cross rates).
         """
+        self.ttl_seconds = ttl_seconds
+        self.pivot_currency = pivot_currency.upper()
+        self.rate_cache = RATE_TABLE_CACHE
+
+        # Shared HTTP transport (pooling, timeouts, retries, circuit breaker)
+        self.http = get_transport()
+
         # Base URL for ExchangeRate API (latest exchange rates by base currency)
-        self.base_url = f"https://v6.exchangerate-api.com/v6/{api_key}/latest"
-    
+        host = self.http.base_url("exchangerate", "https://v6.exchangerate-api.com")
+        self.base_url = f"{host}/v6/{api_key}/latest"
+
+    # --------------------------
+    # Rate tables (cached)
+    # --------------------------
+    def get_rate_table(self, base_currency: str) -> dict:
+        """
+        Return the `conversion_rates` table for a base currency.
+        Served from the cache while fresh; concurrent misses share one API call.
+        """
+        base = base_currency.upper()
+        rates = self.rate_cache.get(base, ttl=self.ttl_seconds)
+        if rates is not None:
+            return rates
+        return _RATE_TABLE_FLIGHTS.do(base, lambda: self._fetch_rate_table(base))
+
+    async def aget_rate_table(self, base_currency: str) -> dict:
+        """Async version of `get_rate_table`."""
+        base = base_currency.upper()
+        rates = self.rate_cache.get(base, ttl=self.ttl_seconds)
+        if rates is not None:
+            return rates
+        return await _RATE_TABLE_FLIGHTS.ado(base, lambda: self._afetch_rate_table(base))
+
+    def _fetch_rate_table(self, base: str) -> dict:
+        response = self.http.get("exchangerate", f"{self.base_url}/{base}")
+        rates = self._rates_from_response(response)
+        self.rate_cache.set(base, rates)
+        return rates
+
+    async def _afetch_rate_table(self, base: str) -> dict:
+        response = await self.http.aget("exchangerate", f"{self.base_url}/{base}")
+        rates = self._rates_from_response(response)
+        self.rate_cache.set(base, rates)
+        return rates
+
+    @staticmethod
+    def _rates_from_response(response) -> dict:
+        """
+        Extract the rate table from an ExchangeRate API response (requests or httpx).
+        """
+        if response.status_code != 200:
+            # Safer to return JSON only if it's valid, else str
+            try:
+                error_message = response.json()
+            except Exception:
+                error_message = response.text
+            raise Exception(f"API call failed: {error_message}")
+
+        return response.json().get("conversion_rates", {})
+
+    @staticmethod
+    def _cross_rate(rates: dict, from_currency: str, to_currency: str) -> float:
+        """
+        Derive the from->to rate from a table quoted against any base:
+        rates[X] is units of X per base unit, so from->to = rates[to] / rates[from].
+        """
+        for code in (from_currency, to_currency):
+            if code not in rates:
+                raise ValueError(f"{code} not found in exchange rates.")
+        return rates[to_currency] / rates[from_currency]
+
+    # --------------------------
+    # Conversions
+    # --------------------------
+    def get_rate(self, from_currency: str, to_currency: str) -> float:
+        """Return the exchange rate from one currency to another."""
+        from_currency, to_currency = from_currency.upper(), to_currency.upper()
+        if from_currency == to_currency:
+            return 1.0
+        return self._cross_rate(self.get_rate_table(self.pivot_currency), from_currency, to_currency)
+
+    async def aget_rate(self, from_currency: str, to_currency: str) -> float:
+        """Async version of `get_rate`."""
+        from_currency, to_currency = from_currency.upper(), to_currency.upper()
+        if from_currency == to_currency:
+            return 1.0
+        return self._cross_rate(await self.aget_rate_table(self.pivot_currency), from_currency, to_currency)
+
     def convert(self, amount: float, from_currency: str, to_currency: str) -> float:
         """
         Convert the amount from one currency to another.
-        
+
         Args:
             amount (float): Amount to convert.
             from_currency (str): Source currency code (e.g., "USD").
             to_currency (str): Target currency code (e.g., "PKR").
-        
+
         Returns:
             float: Converted amount in target currency.
-        
+
         Raises:
             Exception: If API call fails.
-            ValueError: If the target currency is not found.
+            ValueError: If a currency is not found.
         """
-        # API endpoint for base currency
-        url = f"{self.base_url}/{from_currency.upper()}"
-        response = requests.get(url)
+        return round(amount * self.get_rate(from_currency, to_currency), 2)  # Rounded for user-friendliness
 
-        if response.status_code != 200:
-            # Safer to return JSON only if it's valid, else str
-            try:
-                error_message = response.json()
-            except Exception:
-                error_message = response.text
-            raise Exception(f"API call failed: {error_message}")
-        
-        data = response.json()
-        rates = data.get("conversion_rates", {})
-
-        if to_currency.upper() not in rates:
-            raise ValueError(f"{to_currency.upper()} not found in exchange rates.")
+    async def aconvert(self, amount: float, from_currency: str, to_currency: str) -> float:
+        """
+        Async version of `convert` (does not block the event loop).
+        Raises the same errors as `convert`.
+        """
+        return round(amount * await self.aget_rate(from_currency, to_currency), 2)
 
-        return round(amount * rates[to_currency.upper()], 2)  # Rounded for user-friendliness
+    @staticmethod
+    def cache_stats() -> dict:
+        """Hit/miss counters and table ages of the shared rate-table cache."""
+        return {**RATE_TABLE_CACHE.stats(), **_RATE_TABLE_FLIGHTS.stats()}
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 class Calculator:
     @staticmethod
     def multiply(a: int, b: int) -> int:
@@ -42,3 +45,100 @@ class Calculator:
         """
         # To avoid ZeroDivisionError, return 0 if days is 0
         return total / days if days > 0 else 0
+
+
+class BudgetEngine:
+    """
+    Itemized trip budget in one vectorized computation.
+
+    Every item has an amount and a unit it is charged `per`; the unit is
+    turned into a multiplier from the trip shape (days, nights, travelers):
+
+        trip         x 1                  (e.g. visa, airport transfer)
+        day          x days               (e.g. car rental)
+        night        x nights             (e.g. hotel room)
+        person       x travelers          (e.g. flight ticket)
+        person_day   x travelers * days   (e.g. meals)
+        person_night x travelers * nights (e.g. hostel bed)
+    """
+
+    CATEGORIES = ("lodging", "food", "transport", "activities", "other")
+    PER_UNITS = ("trip", "day", "night", "person", "person_day", "person_night")
+
+    def calculate(self, items: list, days: int, travelers: int = 1, nights: int = None, currency: str = "USD",
+                  contingency_percent: float = 0.0, target_currency: str = None, rate: float = None) -> dict:
+        """
+        Compute the full cost breakdown.
+
+        Args:
+            items (list): Dicts with "name", "amount", optional "category" (see CATEGORIES,
+                          default "other"), "per" (see PER_UNITS, default "trip") and "quantity" (default 1).
+            days (int): Trip length in days.
+            travelers (int): Number of people.
+            nights (int): Nights of lodging (defaults to days - 1, so a day trip has none).
+            currency (str): Currency the amounts are given in.
+            contingency_percent (float): Buffer added on top of the subtotal.
+            target_currency (str): Optional currency to also express the totals in.
+            rate (float): Units of target_currency per unit of currency (required with target_currency).
+
+        Returns:
+            dict: Line items, category subtotals, totals and per-day / per-person budgets
+                  (plus a "converted" section when a target currency is given).
+
+        Raises:
+            ValueError: On an unknown `per` unit, non-positive days/travelers or a missing rate.
+        """
+        if days <= 0 or travelers <= 0:
+            raise ValueError("days and travelers must be positive")
+        nights = max(0, days - 1) if nights is None else nights
+        if target_currency and rate is None:
+            raise ValueError("rate is required when target_currency is given")
+
+        names = [str(item.get("name", "item")) for item in items]
+        categories = [item.get("category", "other") if item.get("category") in self.CATEGORIES else "other"
+                      for item in items]
+        units = [item.get("per", "trip") for item in items]
+        for unit in units:
+            if unit not in self.PER_UNITS:
+                raise ValueError(f"Unknown 'per' unit '{unit}', expected one of {', '.join(self.PER_UNITS)}")
+
+        amounts = np.array([float(item.get("amount", 0)) for item in items], dtype=float)
+        quantities = np.array([float(item.get("quantity", 1)) for item in items], dtype=float)
+        multipliers = np.array([1, days, nights, travelers, travelers * days, travelers * nights], dtype=float)
+        unit_index = np.array([self.PER_UNITS.index(unit) for unit in units], dtype=np.int64)
+        category_index = np.array([self.CATEGORIES.index(category) for category in categories], dtype=np.int64)
+
+        # One pass: line totals, then category subtotals
+        line_totals = amounts * quantities * multipliers[unit_index] if items else np.zeros(0)
+        subtotals = np.bincount(category_index, weights=line_totals, minlength=len(self.CATEGORIES))
+
+        subtotal = float(subtotals.sum())
+        contingency = subtotal * contingency_percent / 100
+        total = subtotal + contingency
+
+        def summary(factor: float) -> dict:
+            return {
+                "subtotals": {c: round(float(v) * factor, 2) for c, v in zip(self.CATEGORIES, subtotals) if v},
+                "contingency": round(contingency * factor, 2),
+                "total": round(total * factor, 2),
+                "per_day": round(total * factor / days, 2),
+                "per_person": round(total * factor / travelers, 2),
+                "per_person_per_day": round(total * factor / (travelers * days), 2),
+            }
+
+        breakdown = {
+            "currency": currency.upper(),
+            "days": days,
+            "nights": nights,
+            "travelers": travelers,
+            "items": [
+                {"name": name, "category": category, "per": unit, "amount": round(float(amount), 2),
+                 "quantity": float(quantity), "total": round(float(line), 2)}
+                for name, category, unit, amount, quantity, line
+                in zip(names, categories, units, amounts, quantities, line_totals)
+            ],
+            **summary(1.0),
+        }
+        if target_currency and target_currency.upper() != currency.upper():
+            breakdown["converted"] = {"currency": target_currency.upper(), "rate": rate, **summary(rate)}
+        return breakdown
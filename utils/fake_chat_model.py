@@ -0,0 +1,134 @@
+import asyncio
+import json
+import random
+import time
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+# Tool rounds of a typical plan (used when `scripted` is on): the standard
+# lookups, then the exchange rate, then the itemized budget, then the answer
+DEFAULT_SCRIPT = [
+    ["get_current_weather", "get_weather_forecast", "search_attractions", "search_restaurants",
+     "search_activities", "search_transportation"],
+    ["convert_currency"],
+    ["calculate_trip_budget"],
+]
+
+
+def _scripted_args(tool_name: str, trip) -> dict:
+    """Plausible arguments for a tool call about `trip` (a prefetch.TripRequest)."""
+    destination = trip.destination or "Goa"
+    currency = trip.currency or "INR"
+    if tool_name in ("get_current_weather", "get_weather_forecast"):
+        return {"city": destination}
+    if tool_name.startswith("search_"):
+        return {"place": destination}
+    if tool_name == "convert_currency":
+        return {"amount": 1, "from_currency": "USD", "to_currency": currency}
+    if tool_name == "calculate_trip_budget":
+        return {
+            "items": [
+                {"name": "Hotel", "amount": 60, "category": "lodging", "per": "night"},
+                {"name": "Meals", "amount": 25, "category": "food", "per": "person_day"},
+                {"name": "Local transport", "amount": 15, "category": "transport", "per": "day"},
+                {"name": "Tours and tickets", "amount": 80, "category": "activities", "per": "person"},
+            ],
+            "days": trip.days or 5, "travelers": 2, "currency": "USD", "target_currency": currency,
+        }
+    return {}
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class FakeRateLimitError(Exception):
+    """Stand-in for a provider's HTTP 429 response (carries `status_code` like the SDK errors)."""
+
+    status_code = 429
+
+
+class FakeTravelChatModel(BaseChatModel):
+    """
+    Local chat model for benchmarks and offline runs (provider "fake").
+
+    It sleeps for a configurable latency (optionally with jitter), fails a
+    configurable fraction of calls with a 429-style error, and answers with a
+    short canned plan that mentions how many tool results it was given.
+
+    With `scripted` on and tools bound, it first requests tool calls round by
+    round (`script`, default DEFAULT_SCRIPT) with arguments for the trip in the
+    user query, skipping tools already called (e.g. by the prefetch node),
+    and answers once every round is done. Responses carry token usage
+    estimates like a real provider.
+    """
+
+    model_name: str = "fake-travel"
+    latency_seconds: float = 0.2
+    jitter_seconds: float = 0.0
+    error_rate: float = 0.0
+    answer: str = "Here is your travel plan."
+    scripted: bool = False
+    script: Optional[List[List[str]]] = None
+    bound_tools: Optional[List[str]] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-travel"
+
+    def _delay(self) -> float:
+        return max(0.0, self.latency_seconds + random.uniform(-self.jitter_seconds, self.jitter_seconds))
+
+    def _next_tool_calls(self, messages: List[BaseMessage]) -> list:
+        """Tool calls of the first script round not done yet ([] when the plan can be written)."""
+        if not self.scripted or not self.bound_tools:
+            return []
+        called = {call["name"] for message in messages if isinstance(message, AIMessage)
+                  for call in message.tool_calls}
+        query = next((m.content for m in messages if isinstance(m, HumanMessage) and isinstance(m.content, str)), "")
+
+        from agent.prefetch import parse_trip_request   # local query parser (no LLM call)
+        trip = parse_trip_request(query)
+        for round_tools in self.script or DEFAULT_SCRIPT:
+            pending = [name for name in round_tools if name in self.bound_tools and name not in called]
+            if pending:
+                return [{"name": name, "args": _scripted_args(name, trip), "id": f"fake_{len(messages)}_{i}"}
+                        for i, name in enumerate(pending)]
+        return []
+
+    def _respond(self, messages: List[BaseMessage]) -> ChatResult:
+        if self.error_rate and random.random() < self.error_rate:
+            raise FakeRateLimitError(f"{self.model_name}: rate limited (simulated)")
+
+        tool_calls = self._next_tool_calls(messages)
+        if tool_calls:
+            content = ""
+            output_tokens = _estimate_tokens(json.dumps(tool_calls))
+        else:
+            tool_results = sum(1 for message in messages if isinstance(message, ToolMessage))
+            content = f"{self.answer} (based on {tool_results} tool results)"
+            output_tokens = _estimate_tokens(content)
+        input_tokens = sum(_estimate_tokens(str(message.content)) for message in messages)
+        message = AIMessage(content=content, tool_calls=tool_calls, usage_metadata={
+            "input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens,
+        })
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        time.sleep(self._delay())
+        return self._respond(messages)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self._delay())
+        return self._respond(messages)
+
+    def bind_tools(self, tools: Any, **kwargs: Any):
+        # Only the tool names matter (for the scripted tool calls)
+        names = [getattr(tool, "name", None) or getattr(tool, "__name__", str(tool)) for tool in tools]
+        return self.model_copy(update={"bound_tools": names})
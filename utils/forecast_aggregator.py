@@ -0,0 +1,89 @@
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+import numpy as np
+
+
+def parse_date(value) -> Optional[date]:
+    """Accept a date, an ISO "YYYY-MM-DD" string or None."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value).strip()[:10], "%Y-%m-%d").date()
+
+
+def aggregate_daily(forecast_data: dict) -> list:
+    """
+    Reduce an OpenWeatherMap 5-day / 3-hour forecast to one row per local day
+    in a single vectorized pass.
+
+    Args:
+        forecast_data (dict): Response of the /forecast endpoint (all 40 steps).
+
+    Returns:
+        list: [{"date", "min", "max", "mean", "pop", "rain_mm", "condition", "steps"}]
+              in date order; temperatures in the units the API was queried with,
+              pop is the highest precipitation probability of the day (0-100).
+    """
+    steps = forecast_data.get("list") or []
+    if not steps:
+        return []
+
+    # Group by the city's local calendar day, not UTC
+    offset = int((forecast_data.get("city") or {}).get("timezone", 0))
+    timestamps = np.array([step["dt"] for step in steps], dtype=np.int64) + offset
+    day_numbers = timestamps // 86400
+
+    temp_min = np.array([step["main"].get("temp_min", step["main"]["temp"]) for step in steps], dtype=float)
+    temp_max = np.array([step["main"].get("temp_max", step["main"]["temp"]) for step in steps], dtype=float)
+    temp = np.array([step["main"]["temp"] for step in steps], dtype=float)
+    pop = np.array([step.get("pop", 0.0) for step in steps], dtype=float)
+    rain = np.array([(step.get("rain") or {}).get("3h", 0.0) + (step.get("snow") or {}).get("3h", 0.0)
+                     for step in steps], dtype=float)
+    conditions = [step["weather"][0].get("description") or step["weather"][0].get("main", "") for step in steps]
+
+    days, day_index, counts = np.unique(day_numbers, return_inverse=True, return_counts=True)
+    n_days = len(days)
+
+    mins = np.full(n_days, np.inf)
+    maxs = np.full(n_days, -np.inf)
+    pops = np.zeros(n_days)
+    np.minimum.at(mins, day_index, temp_min)
+    np.maximum.at(maxs, day_index, temp_max)
+    np.maximum.at(pops, day_index, pop)
+    means = np.bincount(day_index, weights=temp, minlength=n_days) / counts
+    rain_totals = np.bincount(day_index, weights=rain, minlength=n_days)
+
+    # Dominant condition: most frequent description per day (ties -> earliest seen)
+    names, condition_index = np.unique(conditions, return_inverse=True)
+    tally = np.zeros((n_days, len(names)), dtype=np.int64)
+    np.add.at(tally, (day_index, condition_index), 1)
+    first_seen = np.full((n_days, len(names)), len(steps))
+    np.minimum.at(first_seen, (day_index, condition_index), np.arange(len(steps)))
+    dominant = np.argmax(tally * (len(steps) + 1) - first_seen, axis=1)
+
+    epoch = date(1970, 1, 1)
+    return [
+        {
+            "date": (epoch + timedelta(days=int(days[i]))).isoformat(),
+            "min": round(float(mins[i]), 1),
+            "max": round(float(maxs[i]), 1),
+            "mean": round(float(means[i]), 1),
+            "pop": int(round(float(pops[i]) * 100)),
+            "rain_mm": round(float(rain_totals[i]), 1),
+            "condition": str(names[dominant[i]]),
+            "steps": int(counts[i]),
+        }
+        for i in range(n_days)
+    ]
+
+
+def select_days(days: list, start_date=None, end_date=None) -> list:
+    """Keep the aggregated days inside [start_date, end_date] (either bound optional)."""
+    start, end = parse_date(start_date), parse_date(end_date)
+    return [
+        day for day in days
+        if (start is None or day["date"] >= start.isoformat()) and (end is None or day["date"] <= end.isoformat())
+    ]
+
@@ -0,0 +1,263 @@
+import asyncio
+import bisect
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Optional
+
+from logger.logging import get_logger
+from utils.place_search import GOOGLE_NO_RESULTS
+
+logger = get_logger(__name__)
+
+# Worker threads for the blocking (sync) search path, shared by all searches
+_SEARCH_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="place-search")
+
+
+class LatencyHistogram:
+    """
+    Latency histogram of the most recent calls to one provider.
+
+    Keeps a bounded window of samples so quantiles follow the provider's
+    current behaviour, plus cumulative bucket counts for reporting.
+    """
+
+    BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 30.0)
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._bucket_counts = [0] * (len(self.BUCKETS) + 1)   # last bucket is +Inf
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self._bucket_counts[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+            self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Return the q-quantile (0..1) of the recent window, or None without samples."""
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def stats(self) -> dict:
+        labels = [f"le_{b:g}" for b in self.BUCKETS] + ["le_inf"]
+        return {
+            "count": self.count,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "buckets": dict(zip(labels, self._bucket_counts)),
+        }
+
+
+class HedgedPlaceSearch:
+    """
+    Place search across Google (primary) and Tavily (secondary).
+
+    In "hedged" mode Google starts first and Tavily is launched after a hedge
+    delay, or immediately if Google fails or returns nothing. The first good
+    answer wins and the other call is cancelled (or, for a blocking call that
+    is already running, its result is discarded). The hedge delay tracks a
+    quantile of Google's recent latency, clamped to [min_delay, max_delay].
+
+    In "fallback" mode Tavily only runs after Google fails or returns nothing.
+    """
+
+    def __init__(self, google_search, tavily_search, mode: str = "hedged", quantile: float = 0.9,
+                 initial_delay_seconds: float = 1.0, min_delay_seconds: float = 0.3,
+                 max_delay_seconds: float = 3.0, min_samples: int = 20):
+        self.google_search = google_search
+        self.tavily_search = tavily_search
+        self.mode = mode
+        self.quantile = quantile
+        self.initial_delay_seconds = initial_delay_seconds
+        self.min_delay_seconds = min_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.min_samples = min_samples
+        self.latency = {"google": LatencyHistogram(), "tavily": LatencyHistogram()}
+        self.wins = {"google": 0, "tavily": 0}
+        self.hedges = 0
+        self.google_cache_hits = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait for Google before starting Tavily (None = only on failure)."""
+        if self.mode == "fallback":
+            return None
+        histogram = self.latency["google"]
+        if histogram.count < self.min_samples:
+            return self.initial_delay_seconds
+        delay = histogram.quantile(self.quantile)
+        return min(self.max_delay_seconds, max(self.min_delay_seconds, delay))
+
+    @staticmethod
+    def _is_good(result) -> bool:
+        if not result:
+            return False
+        return not (isinstance(result, str) and result.startswith(GOOGLE_NO_RESULTS))
+
+    def _providers(self) -> dict:
+        return {"google": self.google_search, "tavily": self.tavily_search}
+
+    # Latency is recorded only for calls that completed (with a result or an
+    # error): a call cancelled because the other provider won has an unknown
+    # latency, and counting its elapsed time would drag the quantile (and so
+    # the hedge delay) down
+    def _timed_call(self, provider: str, category: str, place: str):
+        start = time.perf_counter()
+        try:
+            result = self._providers()[provider].search(category, place)
+        except Exception:
+            self.latency[provider].record(time.perf_counter() - start)
+            raise
+        self.latency[provider].record(time.perf_counter() - start)
+        return result
+
+    async def _atimed_call(self, provider: str, category: str, place: str):
+        start = time.perf_counter()
+        try:
+            result = await self._providers()[provider].asearch(category, place)
+        except Exception:
+            self.latency[provider].record(time.perf_counter() - start)
+            raise
+        self.latency[provider].record(time.perf_counter() - start)
+        return result
+
+    def _cached_google(self, category: str, place: str):
+        """
+        Google's cached answer, if the provider keeps one (e.g. the combined
+        lookup cache). Served without racing Tavily and without a latency
+        sample: near-instant cache hits would drag the quantile down and
+        make Tavily start on almost every real Google call.
+        """
+        cached = getattr(self.google_search, "cached", None)
+        result = cached(category, place) if cached is not None else None
+        if not self._is_good(result):
+            return None
+        self.google_cache_hits += 1
+        return result
+
+    def _win(self, provider: str, result, google_error):
+        self.wins[provider] += 1
+        return provider, result, google_error
+
+    @staticmethod
+    def _empty_error(provider: str) -> Exception:
+        return ValueError(f"{provider} returned no results")
+
+    def _hedge_deadline(self) -> Optional[float]:
+        delay = self.hedge_delay()
+        return None if delay is None else time.monotonic() + delay
+
+    def _log_hedge(self, category: str, place: str) -> None:
+        self.hedges += 1
+        logger.info("Hedging %s search for %s with Tavily", category, place)
+
+    # --------------------------
+    # Sync (thread) path
+    # --------------------------
+    def search(self, category: str, place: str):
+        """
+        Search one category for a place.
+
+        Returns:
+            tuple: (provider, result, google_error) where google_error is the
+                   reason Google did not answer (None if Google won).
+        Raises:
+            Exception: The last provider error when neither returns a result.
+        """
+        cached = self._cached_google(category, place)
+        if cached is not None:
+            return "google", cached, None
+
+        futures = {_SEARCH_EXECUTOR.submit(self._timed_call, "google", category, place): "google"}
+        errors = {}
+        tavily_started = False
+        deadline = self._hedge_deadline()
+
+        while futures:
+            # Until Tavily starts, wake up at the hedge deadline
+            timeout = None
+            if not tavily_started and deadline is not None:
+                timeout = max(0.0, deadline - time.monotonic())
+
+            done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                self._log_hedge(category, place)
+            for future in done:
+                provider = futures.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors[provider] = e
+                    continue
+                if self._is_good(result):
+                    for loser in futures:
+                        loser.cancel()   # only stops it if not started yet
+                    return self._win(provider, result, errors.get("google"))
+                errors[provider] = self._empty_error(provider)
+
+            # Start Tavily once: hedge delay elapsed, or Google already failed
+            if not tavily_started and (not done or "google" in errors):
+                futures[_SEARCH_EXECUTOR.submit(self._timed_call, "tavily", category, place)] = "tavily"
+                tavily_started = True
+
+        raise errors.get("tavily") or errors.get("google")
+
+    # --------------------------
+    # Async path
+    # --------------------------
+    async def asearch(self, category: str, place: str):
+        """Async version of `search`; the losing task is cancelled."""
+        cached = self._cached_google(category, place)
+        if cached is not None:
+            return "google", cached, None
+
+        tasks = {asyncio.create_task(self._atimed_call("google", category, place)): "google"}
+        errors = {}
+        tavily_started = False
+        deadline = self._hedge_deadline()
+
+        try:
+            while tasks:
+                timeout = None
+                if not tavily_started and deadline is not None:
+                    timeout = max(0.0, deadline - time.monotonic())
+
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self._log_hedge(category, place)
+                for task in done:
+                    provider = tasks.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        errors[provider] = e
+                        continue
+                    if self._is_good(result):
+                        return self._win(provider, result, errors.get("google"))
+                    errors[provider] = self._empty_error(provider)
+
+                if not tavily_started and (not done or "google" in errors):
+                    tasks[asyncio.create_task(self._atimed_call("tavily", category, place))] = "tavily"
+                    tavily_started = True
+        finally:
+            # Cancel whichever call lost (or everything, if we were cancelled)
+            for task in tasks:
+                task.cancel()
+
+        raise errors.get("tavily") or errors.get("google")
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "hedge_delay_seconds": self.hedge_delay(),
+            "hedges": self.hedges,
+            "google_cache_hits": self.google_cache_hits,
+            "wins": dict(self.wins),
+            "latency": {provider: histogram.stats() for provider, histogram in self.latency.items()},
+        }
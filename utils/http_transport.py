@@ -0,0 +1,403 @@
+import asyncio
+import random
+import threading
+import time
+import weakref
+from typing import Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from exception.exception_handling import CircuitOpenError
+from logger.logging import get_logger
+from utils.cassette import Cassette
+from utils.config_loader import load_config
+from utils.metrics import HTTP_REQUEST_SECONDS, timed
+
+logger = get_logger(__name__)
+
+# Responses worth retrying (rate limited or upstream trouble)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Policy applied to every provider unless overridden in config.yaml (http.providers)
+DEFAULT_POLICY = {
+    "connect_timeout": 3.05,          # seconds to establish a connection
+    "read_timeout": 15.0,             # seconds to wait for the response
+    "max_retries": 2,                 # extra attempts on 429/5xx/connection errors
+    "backoff_base_seconds": 0.25,     # full-jitter exponential backoff base...
+    "backoff_max_seconds": 4.0,       # ...and cap
+    "max_concurrency": 16,            # requests in flight per provider
+    "pool_maxsize": 16,               # keep-alive connections per host
+    "breaker_failure_threshold": 5,   # consecutive failed calls that open the breaker
+    "breaker_reset_seconds": 30.0,    # how long the breaker stays open before a trial call
+}
+
+
+# -------------------------
+# Circuit breaker
+# -------------------------
+class CircuitBreaker:
+    """
+    Classic three-state circuit breaker.
+
+    - closed:    calls flow; consecutive failures are counted.
+    - open:      calls fail fast with CircuitOpenError until `reset_seconds` pass.
+    - half_open: one trial call is let through; success closes, failure reopens.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self, provider: str) -> None:
+        """Raise CircuitOpenError if the call must not go upstream right now."""
+        with self._lock:
+            if self.state == "open":
+                remaining = self.reset_seconds - (time.monotonic() - self._opened_at)
+                if remaining > 0:
+                    raise CircuitOpenError(provider, remaining)
+                self.state = "half_open"
+                self._trial_in_flight = False
+
+            if self.state == "half_open":
+                if self._trial_in_flight:
+                    raise CircuitOpenError(provider, 0.0)
+                self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Free the half-open trial slot after a call ended without an outcome."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self, provider: str) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            self._trial_in_flight = False
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                if self.state != "open":
+                    logger.warning("Circuit opened for provider '%s'", provider)
+                    self.times_opened += 1
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+# -------------------------
+# Per-provider client
+# -------------------------
+class ProviderSession(requests.Session):
+    """
+    requests.Session whose every request goes through a provider's policy
+    (timeouts, retries, concurrency limit, circuit breaker). It can be handed
+    to third-party clients that accept a session (e.g. googlemaps.Client).
+    """
+
+    def __init__(self, provider: "ProviderClient"):
+        super().__init__()
+        self._provider = provider
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=int(provider.policy["pool_maxsize"]))
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+        self.adapter = adapter
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self._provider.timeout
+        provider = self._provider
+
+        # Cassette replay: serve the recorded response, nothing goes upstream
+        recorded = provider.cassette.lookup(provider.name, method, url, kwargs) if provider.cassette.replaying else None
+        if recorded is not None:
+            with timed(HTTP_REQUEST_SECONDS, "http", provider.name, provider=provider.name,
+                       status=str(recorded["status"])):
+                time.sleep(recorded["delay"])
+            return replayed_response(method, url, recorded)
+
+        started = time.perf_counter()
+        response = provider.send(lambda: super(ProviderSession, self).request(method, url, **kwargs))
+        if provider.cassette.recording:
+            provider.cassette.record(provider.name, method, url, kwargs, response.status_code,
+                                     response.headers.get("Content-Type"), response.content,
+                                     time.perf_counter() - started)
+        return response
+
+
+def replayed_response(method: str, url: str, recorded: dict) -> requests.Response:
+    """requests.Response built from a cassette entry."""
+    response = requests.Response()
+    response.status_code = recorded["status"]
+    response._content = recorded["body"]
+    if recorded["content_type"]:
+        response.headers["Content-Type"] = recorded["content_type"]
+    response.url = url
+    response.request = requests.Request(method, url).prepare()
+    return response
+
+
+def areplayed_response(method: str, url: str, recorded: dict, params=None) -> httpx.Response:
+    """httpx.Response built from a cassette entry."""
+    headers = {"Content-Type": recorded["content_type"]} if recorded["content_type"] else {}
+    return httpx.Response(recorded["status"], content=recorded["body"], headers=headers,
+                          request=httpx.Request(method, url, params=params))
+
+
+class ProviderClient:
+    """Connection pools, limits, breaker and counters for one upstream provider."""
+
+    def __init__(self, name: str, policy: dict, cassette: Optional[Cassette] = None):
+        self.name = name
+        self.policy = policy
+        self.cassette = cassette or Cassette()
+        self.timeout = (float(policy["connect_timeout"]), float(policy["read_timeout"]))
+        self.breaker = CircuitBreaker(int(policy["breaker_failure_threshold"]), float(policy["breaker_reset_seconds"]))
+        self.session = ProviderSession(self)
+        self._semaphore = threading.BoundedSemaphore(int(policy["max_concurrency"]))
+        self._async_state = weakref.WeakKeyDictionary()   # event loop -> (AsyncClient, Semaphore)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.rejected = 0
+
+    # --------------------------
+    # Shared helpers
+    # --------------------------
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        delay = random.uniform(0, min(float(self.policy["backoff_max_seconds"]),
+                                      float(self.policy["backoff_base_seconds"]) * 2 ** attempt))
+        try:
+            # Honour Retry-After (seconds) on 429/503, within the backoff cap
+            delay = max(delay, min(float(retry_after), float(self.policy["backoff_max_seconds"])))
+        except (TypeError, ValueError):
+            pass
+        return delay
+
+    def _count(self, field: str, delta: int = 1) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + delta)
+
+    def _check_breaker(self) -> None:
+        try:
+            self.breaker.before_call(self.name)
+        except CircuitOpenError:
+            self._count("rejected")
+            raise
+
+    def _finish(self, response, error):
+        """Record the outcome of the last attempt and return/raise it."""
+        if error is None and response.status_code not in RETRY_STATUSES:
+            self.breaker.record_success()
+            return response
+        self._count("failures")
+        self.breaker.record_failure(self.name)
+        if error is not None:
+            raise error
+        return response
+
+    # --------------------------
+    # Sync path
+    # --------------------------
+    def send(self, do_request):
+        """Run `do_request()` (returns a requests.Response) under the provider policy."""
+        self._check_breaker()
+        with self._semaphore:
+            self._count("in_flight")
+            try:
+                max_retries = int(self.policy["max_retries"])
+                for attempt in range(max_retries + 1):
+                    self._count("requests")
+                    response, error = None, None
+                    try:
+                        with timed(HTTP_REQUEST_SECONDS, "http", self.name, provider=self.name) as attempt_timing:
+                            response = do_request()
+                            attempt_timing["labels"]["status"] = str(response.status_code)
+                        if response.status_code not in RETRY_STATUSES:
+                            break
+                    except (requests.ConnectionError, requests.Timeout) as e:
+                        error = e
+                    if attempt < max_retries:
+                        self._count("retries")
+                        retry_after = response.headers.get("Retry-After") if response is not None else None
+                        time.sleep(self._backoff(attempt, retry_after))
+                return self._finish(response, error)
+            except BaseException:
+                # Unexpected error: never leave a half-open trial slot taken
+                self.breaker.release_trial()
+                raise
+            finally:
+                self._count("in_flight", -1)
+
+    # --------------------------
+    # Async path
+    # --------------------------
+    def _loop_state(self):
+        # httpx clients and asyncio semaphores belong to one event loop
+        loop = asyncio.get_running_loop()
+        state = self._async_state.get(loop)
+        if state is None:
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout[1], connect=self.timeout[0]),
+                limits=httpx.Limits(max_connections=int(self.policy["pool_maxsize"]),
+                                    max_keepalive_connections=int(self.policy["pool_maxsize"])),
+            )
+            state = (client, asyncio.Semaphore(int(self.policy["max_concurrency"])))
+            self._async_state[loop] = state
+        return state
+
+    async def asend(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Async request under the provider policy (httpx, pooled per event loop)."""
+        # Cassette replay: serve the recorded response, nothing goes upstream
+        recorded = self.cassette.lookup(self.name, method, url, kwargs) if self.cassette.replaying else None
+        if recorded is not None:
+            with timed(HTTP_REQUEST_SECONDS, "http", self.name, provider=self.name, status=str(recorded["status"])):
+                await asyncio.sleep(recorded["delay"])
+            return areplayed_response(method, url, recorded, kwargs.get("params"))
+
+        started = time.perf_counter()
+        response = await self._asend(method, url, **kwargs)
+        if self.cassette.recording:
+            self.cassette.record(self.name, method, url, kwargs, response.status_code,
+                                 response.headers.get("Content-Type"), response.content,
+                                 time.perf_counter() - started)
+        return response
+
+    async def _asend(self, method: str, url: str, **kwargs) -> httpx.Response:
+        self._check_breaker()
+        client, semaphore = self._loop_state()
+        async with semaphore:
+            self._count("in_flight")
+            try:
+                max_retries = int(self.policy["max_retries"])
+                for attempt in range(max_retries + 1):
+                    self._count("requests")
+                    response, error = None, None
+                    try:
+                        with timed(HTTP_REQUEST_SECONDS, "http", self.name, provider=self.name) as attempt_timing:
+                            response = await client.request(method, url, **kwargs)
+                            attempt_timing["labels"]["status"] = str(response.status_code)
+                        if response.status_code not in RETRY_STATUSES:
+                            break
+                    except httpx.TransportError as e:   # connect/read timeouts, connection errors
+                        error = e
+                    if attempt < max_retries:
+                        self._count("retries")
+                        retry_after = response.headers.get("Retry-After") if response is not None else None
+                        await asyncio.sleep(self._backoff(attempt, retry_after))
+                return self._finish(response, error)
+            except BaseException:
+                # Unexpected error or cancellation: never leave a half-open trial slot taken
+                self.breaker.release_trial()
+                raise
+            finally:
+                self._count("in_flight", -1)
+
+    def stats(self) -> dict:
+        pool_manager = self.session.adapter.poolmanager
+        with pool_manager.pools.lock:   # RecentlyUsedContainer refuses unlocked iteration
+            pools = [pool_manager.pools[key] for key in pool_manager.pools.keys()]
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrency": int(self.policy["max_concurrency"]),
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "rejected_by_breaker": self.rejected,
+            "breaker_state": self.breaker.state,
+            "breaker_times_opened": self.breaker.times_opened,
+            "pool": {
+                "hosts": len(pools),
+                "connections_opened": sum(getattr(pool, "num_connections", 0) for pool in pools),
+                # The pool queue is pre-filled with None placeholders; count real connections
+                "idle_connections": sum(1 for pool in pools if getattr(pool, "pool", None)
+                                        for conn in list(pool.pool.queue) if conn is not None),
+            },
+        }
+
+
+# -------------------------
+# Transport
+# -------------------------
+class HttpTransport:
+    """
+    Shared HTTP layer for every upstream provider (weather, currency, places).
+
+    Each provider gets its own keep-alive pool, connect/read timeouts, bounded
+    retries with jittered backoff on 429/5xx, concurrency limit and circuit
+    breaker. Non-retryable responses (2xx/4xx) are returned as-is; callers
+    keep their own status handling. Responses can also be recorded to and
+    replayed from a cassette (config.yaml `cassette`).
+    """
+
+    def __init__(self, settings: Optional[dict] = None, cassette: Optional[Cassette] = None):
+        settings = settings or {}
+        self.defaults = {**DEFAULT_POLICY, **(settings.get("defaults") or {})}
+        self.provider_settings = settings.get("providers") or {}
+        # Record/replay of upstream responses (mode "off" unless configured)
+        self.cassette = cassette or Cassette()
+        self._providers = {}
+        self._lock = threading.Lock()
+
+    def provider(self, name: str) -> ProviderClient:
+        with self._lock:
+            client = self._providers.get(name)
+            if client is None:
+                policy = {**self.defaults, **(self.provider_settings.get(name) or {})}
+                client = self._providers[name] = ProviderClient(name, policy, self.cassette)
+            return client
+
+    def base_url(self, provider: str, default: str) -> str:
+        """Provider API root: `http.providers.<name>.base_url` if set (e.g. a local stub), else `default`."""
+        return ((self.provider_settings.get(provider) or {}).get("base_url") or default).rstrip("/")
+
+    def session(self, provider: str) -> requests.Session:
+        """requests.Session bound to a provider's policy (for third-party clients)."""
+        return self.provider(provider).session
+
+    def request(self, provider: str, method: str, url: str, **kwargs) -> requests.Response:
+        return self.session(provider).request(method, url, **kwargs)
+
+    def get(self, provider: str, url: str, **kwargs) -> requests.Response:
+        return self.request(provider, "GET", url, **kwargs)
+
+    def post(self, provider: str, url: str, **kwargs) -> requests.Response:
+        return self.request(provider, "POST", url, **kwargs)
+
+    async def arequest(self, provider: str, method: str, url: str, **kwargs) -> httpx.Response:
+        return await self.provider(provider).asend(method, url, **kwargs)
+
+    async def aget(self, provider: str, url: str, **kwargs) -> httpx.Response:
+        return await self.arequest(provider, "GET", url, **kwargs)
+
+    async def apost(self, provider: str, url: str, **kwargs) -> httpx.Response:
+        return await self.arequest(provider, "POST", url, **kwargs)
+
+    def stats(self) -> dict:
+        """Pool use, request/retry/failure counters and breaker state per provider."""
+        return {name: client.stats() for name, client in list(self._providers.items())}
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> HttpTransport:
+    """Return the process-wide HttpTransport (configured from config.yaml `http`)."""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            config = load_config()
+            _transport = HttpTransport(config.get("http"), Cassette.from_config(config.get("cassette")))
+        return _transport
@@ -0,0 +1,236 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+# Latency buckets (seconds) shared by every timing histogram: tools and HTTP calls
+# take milliseconds to seconds, LLM calls and whole plans up to minutes
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+# -------------------------
+# Metric types (Prometheus text exposition format)
+# -------------------------
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}            # label values tuple -> float
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> list:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}            # label values tuple -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self) -> list:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        samples = []
+        for key, series in items:
+            labels = dict(zip(self.labelnames, key))
+            for bound, count in zip(self.buckets, series):
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, count))
+            samples.append((f"{self.name}_bucket", {**labels, "le": "+Inf"}, series[-1]))
+            samples.append((f"{self.name}_sum", labels, series[-2]))
+            samples.append((f"{self.name}_count", labels, series[-1]))
+        return samples
+
+
+class MetricsRegistry:
+    """Holds the process's metrics and renders them for the /metrics endpoint."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple = (),
+                  buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format (version 0.0.4)."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Shared registry for the whole process
+REGISTRY = MetricsRegistry()
+
+QUERY_SECONDS = REGISTRY.histogram(
+    "travel_query_seconds", "End-to-end time to answer a query", ("source",))
+AGENT_NODE_SECONDS = REGISTRY.histogram(
+    "travel_agent_node_seconds", "Time spent in each agent graph node per visit", ("node",))
+AGENT_ITERATIONS = REGISTRY.histogram(
+    "travel_agent_iterations", "LLM turns per agent run", (), buckets=(1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 30))
+LLM_CALL_SECONDS = REGISTRY.histogram(
+    "travel_llm_call_seconds", "Latency of each LLM call", ("provider", "status"))
+LLM_TOKENS = REGISTRY.counter(
+    "travel_llm_tokens_total", "LLM tokens by direction (input/output)", ("provider", "kind"))
+TOOL_CALL_SECONDS = REGISTRY.histogram(
+    "travel_tool_call_seconds", "Latency of each tool call", ("tool", "status"))
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "travel_http_request_seconds", "Latency of each upstream HTTP attempt", ("provider", "status"))
+
+
+# -------------------------
+# Per-request timing breakdown
+# -------------------------
+class RequestTimings:
+    """
+    Spans recorded while one API request is served (LLM calls, tools, HTTP
+    attempts, graph nodes). Work started from the request's context, including
+    asyncio tasks and tool threads, records into the same object.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []               # (kind, name, start offset, seconds, extra)
+        self._lock = threading.Lock()
+
+    def add(self, kind: str, name: str, started: float, seconds: float, **extra) -> None:
+        with self._lock:
+            self.spans.append((kind, name, started - self.started, seconds, extra))
+
+    def add_spans_from(self, other: "RequestTimings") -> None:
+        """Copy another request's spans (e.g. the run this request joined), keeping their real start times."""
+        with other._lock:
+            spans = list(other.spans)
+        for kind, name, offset, seconds, extra in spans:
+            self.add(kind, name, other.started + offset, seconds, **extra)
+
+    def summary(self, include_spans: bool = True) -> dict:
+        """Totals per kind and name (calls, seconds), plus the ordered span list."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span[2])
+        totals = {}
+        for kind, name, _, seconds, extra in spans:
+            entry = totals.setdefault(kind, {}).setdefault(name, {"calls": 0, "seconds": 0.0})
+            entry["calls"] += 1
+            entry["seconds"] = round(entry["seconds"] + seconds, 4)
+            for key, value in extra.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    entry[key] = entry.get(key, 0) + value
+        summary = {"total_seconds": round(time.perf_counter() - self.started, 4), **totals}
+        if include_spans:
+            summary["spans"] = [
+                {"kind": kind, "name": name, "start": round(offset, 4), "seconds": round(seconds, 4), **extra}
+                for kind, name, offset, seconds, extra in spans
+            ]
+        return summary
+
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def request_timings():
+    """Collect a timing breakdown of everything run inside the block (yields RequestTimings)."""
+    timings = RequestTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current_timings.get()
+
+
+@contextmanager
+def timed(histogram: Histogram, kind: str, name: str, **labels):
+    """
+    Time the block into `histogram` and the current request's breakdown.
+
+    Yields the label dict so the block can add outcome labels (e.g. status,
+    token counts via `extra`); "status" defaults to "ok", or "error" when the
+    block raises.
+    """
+    started = time.perf_counter()
+    outcome = {"labels": dict(labels), "extra": {}}
+    try:
+        yield outcome
+    except BaseException:
+        outcome["labels"].setdefault("status", "error")
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        if "status" in histogram.labelnames:
+            outcome["labels"].setdefault("status", "ok")
+        histogram.observe(seconds, **outcome["labels"])
+        timings = _current_timings.get()
+        if timings is not None:
+            status = outcome["labels"].get("status")
+            extra = {**({"status": status} if status not in (None, "ok") else {}), **outcome["extra"]}
+            timings.add(kind, name, started, seconds, **extra)
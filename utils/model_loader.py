@@ -1,41 +1,48 @@
-from dotenv import load_dotenv
 from typing import Literal, Optional, Any
 from pydantic import BaseModel, Field
-from utils.config_loader import load_config   # custom function to load YAML config
-from langchain_groq import ChatGroq           # LangChain wrapper for Groq LLMs
-from langchain_openai import ChatOpenAI       # LangChain wrapper for OpenAI LLMs
+from utils.settings import get_settings       # config.yaml + .env, loaded once per process
 import os
 
-load_dotenv()  # Load environment variables from .env file
+# Provider SDKs (langchain_groq, langchain_openai) are imported in load_llm(),
+# only for the provider actually used: each one costs ~0.5-1s of import time.
 
 # ------------------------------
 # Config Loader Class
 # ------------------------------
 class ConfigLoader:
     """
-    This class loads the project configuration from config.yaml
-    using the custom `load_config()` function.
+    This class gives access to the project configuration from config.yaml
+    (the shared, read-only settings parsed once per process).
     It also allows dictionary-style access (config["llm"]["groq"], etc.).
     """
     def __init__(self):
-        print("Loaded config.....")
-        self.config = load_config()   # Load the YAML configuration
+        self.config = get_settings().config   # Shared parsed YAML (no re-read)
     
     def __getitem__(self, key):
         # Enables config["llm"] style access
         return self.config[key]
 
+    def get(self, key, default=None):
+        # Enables config.get("tools", {}) for optional sections
+        return self.config.get(key, default)
+
 
 # ------------------------------
 # Model Loader Class
 # ------------------------------
 class ModelLoader(BaseModel):
     """
-    Loads an LLM (either Groq or OpenAI) based on the configuration.
+    Loads an LLM (Groq, OpenAI or the local fake model) based on the configuration.
     Uses Pydantic BaseModel for type safety and validation.
     """
-    # Which provider to use ("groq" or "openai")
-    model_provider: Literal["groq", "openai"] = "groq"
+    # Which provider to use ("groq", "openai" or "fake")
+    model_provider: Literal["groq", "openai", "fake"] = "groq"
+
+    # Optional model name overriding config.yaml (used by the model router)
+    model_name: Optional[str] = None
+
+    # Optional extra settings passed to the chat model (e.g. timeout, fake latency)
+    model_kwargs: dict = Field(default_factory=dict)
 
     # Config loader instance (not included in JSON serialization/export)
     config: Optional[ConfigLoader] = Field(default=None, exclude=True)
@@ -54,9 +61,9 @@ class ModelLoader(BaseModel):
     # --------------------------
     def load_llm(self):
         """
-        Load and return the LLM model (Groq or OpenAI).
+        Load and return the LLM model (Groq, OpenAI or fake).
         API keys are taken from environment variables.
-        Model names are read from config.yaml.
+        Model names are read from config.yaml unless `model_name` is set.
         """
         print("LLM loading...")
         print(f"Loading model from provider: {self.model_provider}")
@@ -66,18 +73,31 @@ class ModelLoader(BaseModel):
         # --------------------------
         if self.model_provider == "groq":
             print("Loading LLM from Groq..............")
+            from langchain_groq import ChatGroq       # LangChain wrapper for Groq LLMs
             groq_api_key = os.getenv("GROQ_API_KEY")   # load from .env
-            model_name = self.config["llm"]["groq"]["model"]  # from config.yaml
-            llm = ChatGroq(model=model_name, api_key=groq_api_key)
+            model_name = self.model_name or self.config["llm"]["groq"]["model"]  # from config.yaml
+            llm = ChatGroq(model=model_name, api_key=groq_api_key, **self.model_kwargs)
 
         # --------------------------
         # If OpenAI provider selected
         # --------------------------
         elif self.model_provider == "openai":
             print("Loading LLM from OpenAI..............")
+            from langchain_openai import ChatOpenAI   # LangChain wrapper for OpenAI LLMs
             openai_api_key = os.getenv("OPENAI_API_KEY")   # load from .env
-            model_name = self.config["llm"]["openai"]["model"]  # from config.yaml
-            llm = ChatOpenAI(model=model_name, api_key=openai_api_key)
+            model_name = self.model_name or self.config["llm"]["openai"]["model"]  # from config.yaml
+            llm = ChatOpenAI(model=model_name, api_key=openai_api_key, **self.model_kwargs)
+
+        # --------------------------
+        # Local fake model (benchmarks, offline runs)
+        # --------------------------
+        elif self.model_provider == "fake":
+            print("Loading fake LLM..............")
+            from utils.fake_chat_model import FakeTravelChatModel   # Local stand-in for benchmarks
+            fake_settings = {**(self.config.get("llm", {}).get("fake") or {}), **self.model_kwargs}
+            fake_settings.pop("provider", None)
+            fake_settings.pop("model", None)
+            llm = FakeTravelChatModel(model_name=self.model_name or "fake-travel", **fake_settings)
         
         # Return the loaded LLM object
         return llm
@@ -0,0 +1,197 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Mapping, Optional
+
+from logger.logging import get_logger
+from utils.cache import normalize_place
+
+logger = get_logger(__name__)
+
+# Providers in the order their cached results are preferred
+PROVIDERS = ("google", "tavily")
+
+
+class PlaceSearchCache:
+    """
+    Persistent cache for place search results, stored in a local SQLite file.
+
+    - Keyed by (provider, category, normalized place, output mode): results
+      stored as full provider text are never served as compact output, or
+      the other way round.
+    - Each category has its own TTL (place data changes on the scale of days).
+    - Bounded to `max_entries`; the least recently used rows are evicted first.
+    - The database runs in WAL mode, so several uvicorn workers on one host
+      can read and write the same file concurrently, and it survives restarts.
+    """
+
+    # One shared instance per database file in this process
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, db_path: str = "cache/place_search.sqlite3", default_ttl_seconds: float = 259200,
+                 category_ttl_seconds: Optional[dict] = None, max_entries: int = 5000):
+        self.db_path = db_path
+        self.default_ttl_seconds = default_ttl_seconds
+        self.category_ttl_seconds = dict(category_ttl_seconds or {})
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # sqlite3 connections are per thread
+        self._local = threading.local()
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._create_schema()
+
+    @classmethod
+    def shared(cls, db_path: str = "cache/place_search.sqlite3", **settings) -> "PlaceSearchCache":
+        """Return the process-wide cache for a database file (settings are refreshed)."""
+        with cls._instances_lock:
+            cache = cls._instances.get(db_path)
+            if cache is None:
+                cache = cls._instances[db_path] = cls(db_path, **settings)
+            else:
+                for name, value in settings.items():
+                    setattr(cache, name, dict(value) if isinstance(value, Mapping) else value)
+            return cache
+
+    @classmethod
+    def cache_stats(cls) -> dict:
+        """Stats of every shared place cache in the process, keyed by file."""
+        return {path: cache.stats() for path, cache in cls._instances.items()}
+
+    # --------------------------
+    # SQLite plumbing
+    # --------------------------
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)  # autocommit
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self) -> None:
+        conn = self._connection()
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(place_search)")]
+        if columns and "mode" not in columns:
+            # Rows from before the output mode was part of the key cannot be told apart
+            logger.info("Dropping place search cache without output modes: %s", self.db_path)
+            conn.execute("DROP TABLE place_search")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS place_search (
+                provider    TEXT NOT NULL,
+                category    TEXT NOT NULL,
+                place       TEXT NOT NULL,
+                mode        TEXT NOT NULL,
+                value       TEXT NOT NULL,
+                created_at  REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (provider, category, place, mode)
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_place_search_accessed ON place_search (accessed_at)")
+
+    def ttl_for(self, category: str) -> float:
+        return float(self.category_ttl_seconds.get(category, self.default_ttl_seconds))
+
+    # --------------------------
+    # Public API
+    # --------------------------
+    def _read(self, provider: str, category: str, place: str, mode: str):
+        now = time.time()
+        key = (provider, category, normalize_place(place), mode)
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT value, created_at FROM place_search WHERE provider = ? AND category = ? AND place = ? AND mode = ?",
+            key,
+        ).fetchone()
+
+        if row is None or now - row[1] > self.ttl_for(category):
+            return None
+
+        conn.execute(
+            "UPDATE place_search SET accessed_at = ? WHERE provider = ? AND category = ? AND place = ? AND mode = ?",
+            (now, *key),
+        )
+        return json.loads(row[0])
+
+    def _count(self, found: bool) -> None:
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def get(self, provider: str, category: str, place: str, mode: str = "full"):
+        """Return the cached result for one provider, or None if missing or expired."""
+        result = self._read(provider, category, place, mode)
+        self._count(result is not None)
+        return result
+
+    def lookup(self, category: str, place: str, mode: str = "full"):
+        """
+        Return (provider, result) for the first provider with a fresh entry
+        (see PROVIDERS for the order), or None.
+
+        Args:
+            mode (str): Output mode the result was stored for ("full" or "compact").
+        """
+        for provider in PROVIDERS:
+            result = self._read(provider, category, place, mode)
+            if result is not None:
+                self._count(True)
+                return provider, result
+        self._count(False)
+        return None
+
+    def set(self, provider: str, category: str, place: str, value, mode: str = "full") -> None:
+        """Store a result (JSON-serializable) and evict LRU rows beyond `max_entries`."""
+        now = time.time()
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO place_search (provider, category, place, mode, value, created_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (provider, category, normalize_place(place), mode, json.dumps(value, default=str), now, now),
+        )
+
+        overflow = conn.execute("SELECT COUNT(*) FROM place_search").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM place_search WHERE rowid IN "
+                "(SELECT rowid FROM place_search ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += overflow
+
+    def purge_expired(self) -> int:
+        """Delete expired rows for every category; returns the number removed."""
+        conn = self._connection()
+        now = time.time()
+        removed = 0
+        for category in [row[0] for row in conn.execute("SELECT DISTINCT category FROM place_search")]:
+            cursor = conn.execute(
+                "DELETE FROM place_search WHERE category = ? AND created_at < ?", (category, now - self.ttl_for(category))
+            )
+            removed += cursor.rowcount
+        return removed
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        entries = self._connection().execute("SELECT COUNT(*) FROM place_search").fetchone()[0]
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
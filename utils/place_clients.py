@@ -0,0 +1,96 @@
+import os
+import threading
+
+from utils.http_transport import get_transport
+
+TAVILY_API_URL = "https://api.tavily.com"
+
+
+# -------------------------
+# Tavily client
+# -------------------------
+class TavilyClient:
+    """
+    Minimal client for the Tavily search API over the shared HTTP transport
+    (keep-alive pool, timeouts, retries, circuit breaker).
+    Returns the same response dict as langchain_tavily's TavilySearch.
+    """
+
+    def __init__(self, api_key: str, base_url: str = None, **search_defaults):
+        self.api_key = api_key
+        self.search_defaults = search_defaults
+        self.http = get_transport()
+        self.base_url = (base_url or self.http.base_url("tavily", TAVILY_API_URL)).rstrip("/")
+
+    def _headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+
+    def _payload(self, query: str, options: dict) -> dict:
+        return {"query": query, **self.search_defaults, **options}
+
+    @staticmethod
+    def _parse(response) -> dict:
+        if response.status_code != 200:
+            try:
+                detail = response.json().get("detail", {})
+                error_message = detail.get("error") if isinstance(detail, dict) else detail
+            except Exception:
+                error_message = response.text
+            raise ValueError(f"Error {response.status_code}: {error_message}")
+        return response.json()
+
+    def search(self, query: str, **options) -> dict:
+        """Run a Tavily search (blocking)."""
+        response = self.http.post("tavily", f"{self.base_url}/search", json=self._payload(query, options),
+                                  headers=self._headers())
+        return self._parse(response)
+
+    async def asearch(self, query: str, **options) -> dict:
+        """Run a Tavily search without blocking the event loop."""
+        response = await self.http.apost("tavily", f"{self.base_url}/search", json=self._payload(query, options),
+                                         headers=self._headers())
+        return self._parse(response)
+
+
+# -------------------------
+# Client pool
+# -------------------------
+class PlaceClientPool:
+    """
+    Place provider clients built once per process (per API key) and shared by
+    every search, so connections are reused instead of rebuilt per call.
+    Both clients send their requests through the shared HTTP transport.
+    """
+
+    _lock = threading.Lock()
+    _google_clients = {}
+    _tavily_clients = {}
+
+    @classmethod
+    def google_maps_client(cls, api_key: str):
+        """Return the shared googlemaps.Client for an API key (transport session)."""
+        import googlemaps   # installed with langchain-google-community[places]
+
+        with cls._lock:
+            client = cls._google_clients.get(api_key)
+            if client is None:
+                # Retries and timeouts are owned by the transport session, so
+                # googlemaps' own retry loop is cut short
+                transport = get_transport()
+                client = googlemaps.Client(key=api_key, requests_session=transport.session("google_places"),
+                                           retry_timeout=1,
+                                           base_url=transport.base_url("google_places", "https://maps.googleapis.com"))
+                cls._google_clients[api_key] = client
+            return client
+
+    @classmethod
+    def tavily_client(cls, api_key: str = None, **search_defaults) -> TavilyClient:
+        """Return the shared TavilyClient for an API key (defaults to TAVILY_API_KEY)."""
+        api_key = api_key or os.environ.get("TAVILY_API_KEY")
+        key = (api_key, tuple(sorted(search_defaults.items())))
+        with cls._lock:
+            client = cls._tavily_clients.get(key)
+            if client is None:
+                client = TavilyClient(api_key, **search_defaults)
+                cls._tavily_clients[key] = client
+            return client
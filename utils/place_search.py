@@ -1,79 +1,201 @@
-import os
-import json
-from langchain_tavily import TavilySearch
-from langchain_google_community import GooglePlacesTool, GooglePlacesAPIWrapper 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from utils.cache import TTLCache, SingleFlight, normalize_place
+from utils.place_clients import PlaceClientPool
+from utils.compact_output import compact_places
+
+# -------------------------
+# Search queries per place category (shared by Google and Tavily)
+# -------------------------
+PLACE_QUERIES = {
+    "attractions": "top attractive places in and around {place}",
+    "restaurants": "what are the top 10 restaurants and eateries in and around {place}?",
+    "activities": "Activities in and around {place}",
+    "transportation": "What are the different modes of transportations available in {place}",
+}
+
+# Text GooglePlacesAPIWrapper returns when a query has no results
+GOOGLE_NO_RESULTS = "Google Places did not find any places that match the description"
+
+# Combined Google lookups (all categories of one place), shared by the four tools
+_GOOGLE_LOOKUPS = TTLCache(ttl_seconds=300, maxsize=256, namespace="google_lookups")
+_GOOGLE_FLIGHTS = SingleFlight()
+_LOOKUP_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="google-places")
 
 # -------------------------
 # Google Places Search Tool
 # -------------------------
 class GooglePlaceSearchTool:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, top_k_results: int = 10, lookup_ttl_seconds: float = 300,
+                 compact: bool = False, compact_top_k: int = 5):
+        """
+        Args:
+            api_key (str): Google Places API key.
+            top_k_results (int): Places (with details) returned per category.
+            lookup_ttl_seconds (float): How long a combined lookup is reused
+                                        by the other category tools.
+            compact (bool): Return structured places (name, rating, price,
+                            short address) from the text search alone instead
+                            of the full details text; skips the details calls.
+            compact_top_k (int): Places per category in compact mode.
+        """
         # Initialize Google Places API wrapper with the provided API key
-        self.places_wrapper = GooglePlacesAPIWrapper(gplaces_api_key=api_key)
-        
-        # Create Google Places tool using the wrapper
-        self.places_tool = GooglePlacesTool(api_wrapper=self.places_wrapper)
-    
+        # (imported here so the Google SDK only loads when Google search is used)
+        from langchain_google_community import GooglePlacesAPIWrapper
+        self.places_wrapper = GooglePlacesAPIWrapper(gplaces_api_key=api_key, top_k_results=top_k_results)
+
+        # Reuse one pooled googlemaps client per API key (keep-alive connections)
+        self.places_wrapper.google_map_client = PlaceClientPool.google_maps_client(api_key)
+        self.top_k_results = top_k_results
+        self.lookup_ttl_seconds = lookup_ttl_seconds
+        self.compact = compact
+        self.compact_top_k = compact_top_k
+
+    def search_all(self, place: str) -> dict:
+        """
+        Combined lookup of every category for a place.
+
+        The four text searches run concurrently and place details are fetched
+        once per unique place id, even when it appears in several categories.
+        Concurrent callers for the same place share one lookup, and the result
+        is reused for `lookup_ttl_seconds`.
+
+        Returns:
+            dict: category -> formatted result, or list of compact places in
+                  compact mode (or the exception raised for it).
+        """
+        key = ("compact" if self.compact else "full", normalize_place(place))
+        lookup = _GOOGLE_LOOKUPS.get(key, ttl=self.lookup_ttl_seconds)
+        if lookup is None:
+            lookup = _GOOGLE_FLIGHTS.do(key, lambda: self._lookup_all(place, key))
+        return lookup
+
+    def _lookup_all(self, place: str, key: tuple) -> dict:
+        client = self.places_wrapper.google_map_client
+        text_searches = {
+            category: _LOOKUP_EXECUTOR.submit(client.places, query.format(place=place))
+            for category, query in PLACE_QUERIES.items()
+        }
+
+        lookup, place_ids = {}, {}
+        for category, future in text_searches.items():
+            try:
+                results = future.result()["results"]
+                if self.compact:
+                    # Text search already carries name, rating, price level and address
+                    lookup[category] = compact_places(results, self.compact_top_k)
+                else:
+                    place_ids[category] = [result["place_id"] for result in results[: self.top_k_results]]
+            except Exception as e:
+                lookup[category] = e
+
+        # One details call per unique place across all categories
+        unique_ids = list(dict.fromkeys(pid for ids in place_ids.values() for pid in ids))
+        details = dict(zip(unique_ids, _LOOKUP_EXECUTOR.map(self.places_wrapper.fetch_place_details, unique_ids)))
+
+        for category, ids in place_ids.items():
+            places = [details[pid] for pid in ids if details[pid] is not None]
+            if not ids:
+                lookup[category] = GOOGLE_NO_RESULTS
+            else:
+                lookup[category] = "\n".join([f"{i + 1}. {item}" for i, item in enumerate(places)])
+
+        # Only complete lookups are reused
+        if not any(isinstance(value, Exception) for value in lookup.values()):
+            _GOOGLE_LOOKUPS.set(key, lookup)
+        return lookup
+
+    def cached(self, category: str, place: str):
+        """
+        The category result of a still-fresh combined lookup, or None when
+        answering would go upstream (lets callers tell cache hits from real
+        Google latency).
+        """
+        key = ("compact" if self.compact else "full", normalize_place(place))
+        lookup = _GOOGLE_LOOKUPS.get(key, ttl=self.lookup_ttl_seconds)
+        if lookup is None or isinstance(lookup.get(category), Exception):
+            return None
+        return lookup.get(category)
+
+    def search(self, category: str, place: str) -> dict:
+
+        """Searches a place category (see PLACE_QUERIES) using Google Places API."""
+        result = self.search_all(place)[category]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def asearch(self, category: str, place: str) -> dict:
+
+        """Async version of `search`; the Google client is blocking, so it runs in a worker thread."""
+        return await asyncio.to_thread(self.search, category, place)
+
+    @staticmethod
+    def cache_stats() -> dict:
+        """Reuse counters of the combined Google lookups."""
+        return {**_GOOGLE_LOOKUPS.stats(), **_GOOGLE_FLIGHTS.stats()}
+
     def google_search_attractions(self, place: str) -> dict:
-        
+
         """Searches for attractions in the specified place using Google Places API."""
-        return self.places_tool.run(f"top attractive places in and around {place}")
-    
+        return self.search("attractions", place)
+
     def google_search_restaurants(self, place: str) -> dict:
-        
+
         """Searches for available restaurants in the specified place using Google Places API."""
-        return self.places_tool.run(f"what are the top 10 restaurants and eateries in and around {place}?")
-    
+        return self.search("restaurants", place)
+
     def google_search_activity(self, place: str) -> dict:
-        
+
         """Searches for popular activities in the specified place using Google Places API."""
-        return self.places_tool.run(f"Activities in and around {place}")
+        return self.search("activities", place)
 
     def google_search_transportation(self, place: str) -> dict:
-        
+
         """Searches for available modes of transportation in the specified place using Google Places API."""
-        return self.places_tool.run(f"What are the different modes of transportations available in {place}")
+        return self.search("transportation", place)
 
 
 # -------------------------
 # Tavily Place Search Tool
 # -------------------------
 class TavilyPlaceSearchTool:
-    def __init__(self):
-        pass
+    def __init__(self, api_key: str = None):
+        # Shared Tavily client (built once per process, keep-alive session)
+        self.client = PlaceClientPool.tavily_client(api_key, topic="general", include_answer="advanced")
 
-    def tavily_search_attractions(self, place: str) -> dict:
-        
-        """Searches for attractions in the specified place using TavilySearch."""
-        
-        tavily_tool = TavilySearch(topic="general", include_answer="advanced")
-        result = tavily_tool.invoke({"query": f"top attractive places in and around {place}"})
-        
+    @staticmethod
+    def _extract_answer(result):
         return result.get("answer") if isinstance(result, dict) and result.get("answer") else result
-    
+
+    def search(self, category: str, place: str) -> dict:
+
+        """Searches a place category (see PLACE_QUERIES) using Tavily."""
+        result = self.client.search(PLACE_QUERIES[category].format(place=place))
+        return self._extract_answer(result)
+
+    async def asearch(self, category: str, place: str) -> dict:
+
+        """Async version of `search` using Tavily's async HTTP client."""
+        result = await self.client.asearch(PLACE_QUERIES[category].format(place=place))
+        return self._extract_answer(result)
+
+    def tavily_search_attractions(self, place: str) -> dict:
+
+        """Searches for attractions in the specified place using Tavily."""
+        return self.search("attractions", place)
+
     def tavily_search_restaurants(self, place: str) -> dict:
-        
-        """Searches for available restaurants in the specified place using TavilySearch."""
-        
-        tavily_tool = TavilySearch(topic="general", include_answer="advanced")
-        result = tavily_tool.invoke({"query": f"what are the top 10 restaurants and eateries in and around {place}."})
-        
-        return result.get("answer") if isinstance(result, dict) and result.get("answer") else result
-    
+
+        """Searches for available restaurants in the specified place using Tavily."""
+        return self.search("restaurants", place)
+
     def tavily_search_activity(self, place: str) -> dict:
-        
-        """Searches for popular activities in the specified place using TavilySearch."""
-        
-        tavily_tool = TavilySearch(topic="general", include_answer="advanced")
-        result = tavily_tool.invoke({"query": f"activities in and around {place}"})
-        
-        return result.get("answer") if isinstance(result, dict) and result.get("answer") else result
+
+        """Searches for popular activities in the specified place using Tavily."""
+        return self.search("activities", place)
 
     def tavily_search_transportation(self, place: str) -> dict:
-        
-        """Searches for available modes of transportation in the specified place using TavilySearch."""
-        
-        tavily_tool = TavilySearch(topic="general", include_answer="advanced")
-        result = tavily_tool.invoke({"query": f"What are the different modes of transportations available in {place}"})
-        
-        return result.get("answer") if isinstance(result, dict) and result.get("answer") else result
+
+        """Searches for available modes of transportation in the specified place using Tavily."""
+        return self.search("transportation", place)
@@ -0,0 +1,333 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from utils.cache_backend import CacheBackend
+
+# Words that do not change what plan is being asked for
+STOPWORDS = {
+    "a", "an", "the", "for", "of", "in", "on", "at", "with", "and", "or", "about", "by",
+    "i", "me", "my", "we", "us", "our", "you", "your", "it", "is", "are", "be", "this", "that",
+    "please", "can", "could", "would", "will", "want", "need", "like", "help", "give", "some",
+}
+
+# Spelled-out numbers, so "five days" and "5 days" normalize alike
+NUMBER_WORDS = {
+    "one": "1", "two": "2", "three": "3", "four": "4", "five": "5", "six": "6", "seven": "7",
+    "eight": "8", "nine": "9", "ten": "10", "eleven": "11", "twelve": "12", "fourteen": "14",
+}
+
+# When a query names both an origin and a destination, direction words stay
+# bound to their place ("from delhi", "to goa"), so "from Delhi to Goa" and
+# "from Goa to Delhi" never share a plan; otherwise they are dropped and the
+# bare place is compared ("trip to Goa" ~ "Goa trip")
+DIRECTION_WORDS = {"to", "from"}
+# "to" in front of these is the infinitive ("want to visit Goa"), not a direction
+INFINITIVE_VERBS = {"visit", "go", "travel", "explore", "see", "fly", "plan", "spend", "stay", "tour"}
+
+# Wording that may differ between two near-duplicate queries; any other extra
+# word (a second city, a currency, "luxury") must have a typo-level match
+FILLER_WORDS = {
+    "hi", "hello", "hey", "thank", "thanks", "kindly", "just", "so", "also", "then", "what", "how",
+    "plan", "trip", "itinerary", "travel", "visit", "tour", "guide", "vacation", "holiday",
+    "detailed", "complete", "full", "create", "make", "prepare", "suggest", "show", "tell", "get",
+}
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def _singularize(token: str) -> str:
+    """Very small English singularizer (days -> day, cities -> city)."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def query_tokens(query: str) -> list:
+    """
+    Normalize a query into content tokens, in query order: lowercase,
+    punctuation and hyphens removed, stopwords dropped, numbers spelled out as
+    digits, plural nouns singularized. A number stays bound to its unit, and
+    direction words to their places when the query has both an origin and a
+    destination, so "Plan a 5-day trip from Delhi to Goa for 2 people" becomes
+    ['plan', '5 day', 'trip', 'from delhi', 'to goa', '2 people'] while
+    "Plan a trip to Goa" becomes ['plan', 'trip', 'goa'].
+    """
+    words = [NUMBER_WORDS.get(word, word)
+             for word in re.findall(r"[a-z0-9]+(?:\.[0-9]+)?", query.lower().replace("-", " "))]
+
+    def bindable(index: int) -> bool:
+        following = words[index + 1] if index + 1 < len(words) else None
+        return (following is not None and following not in STOPWORDS
+                and following not in DIRECTION_WORDS and not following[0].isdigit())
+
+    directions = {word for index, word in enumerate(words)
+                  if word in DIRECTION_WORDS and bindable(index) and words[index + 1] not in INFINITIVE_VERBS}
+    bind_directions = directions == DIRECTION_WORDS
+
+    tokens, index = [], 0
+    while index < len(words):
+        word = words[index]
+        if bindable(index) and (word[0].isdigit() or (
+                bind_directions and word in DIRECTION_WORDS and words[index + 1] not in INFINITIVE_VERBS)):
+            token = f"{word} {_singularize(words[index + 1])}"
+            index += 2
+        elif word in STOPWORDS or word in DIRECTION_WORDS:
+            index += 1
+            continue
+        else:
+            token = _singularize(word)
+            index += 1
+        if token not in tokens:
+            tokens.append(token)
+    return tokens
+
+
+def _anchors(tokens: list) -> frozenset:
+    """Tokens two near-duplicate queries must share exactly: (number, unit) pairs, bare numbers, origin/destination."""
+    return frozenset(token for token in tokens if token[0].isdigit() or " " in token)
+
+
+def _content(tokens: list) -> list:
+    return [token for token in tokens if token not in FILLER_WORDS]
+
+
+def _char_grams(token: str) -> set:
+    padded = f"#{token}#"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _tokens_compatible(tokens_a: list, tokens_b: list) -> bool:
+    """
+    True when the bare content words both queries share come in the same order
+    ("Goa then Delhi" is not "Delhi then Goa") and every word in one query but
+    not the other is filler or a likely typo of a word in the other query
+    (character trigram overlap >= 0.4).
+    """
+    set_a, set_b = set(tokens_a), set(tokens_b)
+    # Anchors carry their own meaning wherever they appear, so only bare words are ordered
+    shared = (set_a & set_b) - FILLER_WORDS - _anchors(tokens_a)
+    if [t for t in tokens_a if t in shared] != [t for t in tokens_b if t in shared]:
+        return False
+    for extra, other in ((set_a - set_b, set_b - set_a), (set_b - set_a, set_a - set_b)):
+        for token in extra - FILLER_WORDS:
+            grams = _char_grams(token)
+            if not any(len(grams & _char_grams(o)) / len(grams | _char_grams(o)) >= 0.4 for o in other):
+                return False
+    return True
+
+
+class MinHasher:
+    """
+    MinHash signatures over a token set (words plus character 4-grams, so a
+    typo only changes a few features). Estimated Jaccard similarity of two
+    sets = fraction of equal signature slots.
+    """
+
+    def __init__(self, num_perm: int = 64, seed: int = 7):
+        self.num_perm = num_perm
+        # Deterministic (a, b) pairs for the universal hash family a*x + b mod p
+        self._params = []
+        for i in range(num_perm):
+            digest = hashlib.blake2b(f"{seed}:{i}".encode(), digest_size=16).digest()
+            a = int.from_bytes(digest[:8], "little") % _MERSENNE_PRIME or 1
+            b = int.from_bytes(digest[8:], "little") % _MERSENNE_PRIME
+            self._params.append((a, b))
+
+    @staticmethod
+    def features(tokens: list) -> set:
+        features = set(tokens)
+        for token in tokens:
+            padded = f"#{token}#"
+            features.update(padded[i:i + 4] for i in range(max(1, len(padded) - 3)))
+        return features
+
+    def signature(self, tokens: list) -> tuple:
+        hashed = [int.from_bytes(hashlib.blake2b(f.encode(), digest_size=8).digest(), "little")
+                  for f in self.features(tokens)] or [0]
+        return tuple(min((a * x + b) % _MERSENNE_PRIME for x in hashed) for a, b in self._params)
+
+    @staticmethod
+    def similarity(sig_a: tuple, sig_b: tuple) -> float:
+        return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+class PlanCache:
+    """
+    Whole-plan answer cache placed in front of the agent graph.
+
+    - Exact hits: queries with the same normalized tokens (punctuation,
+      stopwords and plurals ignored; order, numbers with their units and
+      trip direction kept).
+    - Near-duplicate hits: MinHash similarity of the content words (filler
+      such as "plan", "trip", "itinerary" ignored) >= `similarity_threshold`,
+      found through an LSH band index; candidates must mention exactly the
+      same (number, unit) pairs and origin/destination, so "5 days for 2 people"
+      never answers "2 days for 5 people", and may only differ
+      in filler words or typos, so "Goa" never answers "Goa and Mumbai".
+    - Entries expire after `ttl_seconds`; beyond `max_entries` the least
+      recently used plan is evicted.
+    - With a shared cache backend, plans are also stored there (namespace
+      "plans"): an exact miss here is looked up in the backend, so a plan
+      made by one worker is served by the others.
+    """
+
+    def __init__(self, ttl_seconds: float = 21600, max_entries: int = 512, similarity_threshold: float = 0.75,
+                 num_perm: int = 64, bands: int = 16, backend: Optional[CacheBackend] = None):
+        """
+        Args:
+            ttl_seconds (float): How long a cached plan may be served.
+            max_entries (int): LRU bound on stored plans.
+            similarity_threshold (float): Minimum estimated Jaccard similarity for a near-duplicate hit.
+            num_perm (int): MinHash signature length.
+            bands (int): LSH bands (num_perm must be divisible by bands).
+            backend (CacheBackend): Shared store for plans made by other workers (None: this process only).
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+        self.backend = backend
+        if backend is not None:
+            backend.configure("plans", ttl_seconds=ttl_seconds, max_entries=max_entries)
+
+        self._entries = OrderedDict()   # normalized key -> entry dict
+        self._buckets = {}              # (band, band hash) -> set of keys
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    # --------------------------
+    # Index helpers
+    # --------------------------
+    def _band_keys(self, signature: tuple) -> list:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for band_key in self._band_keys(entry["signature"]):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def _store(self, key: str, answer: str, tokens: list, signature: tuple, stored_at: float) -> None:
+        # Caller must hold self._lock
+        self._remove(key)
+        self._entries[key] = {
+            "answer": answer,
+            "signature": signature,
+            "tokens": tokens,
+            "anchors": _anchors(tokens),
+            "stored_at": stored_at,
+        }
+        for band_key in self._band_keys(signature):
+            self._buckets.setdefault(band_key, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _fresh(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry["stored_at"] > self.ttl_seconds:
+            self._remove(key)
+            return None
+        return entry
+
+    # --------------------------
+    # Public API
+    # --------------------------
+    def get(self, query: str) -> Optional[tuple]:
+        """
+        Return (answer, match) for a cached plan, where match is "exact" or
+        "near", or None on a miss.
+        """
+        tokens = query_tokens(query)
+        key = " ".join(tokens)
+        with self._lock:
+            entry = self._fresh(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return entry["answer"], "exact"
+
+        signature = self.hasher.signature(_content(tokens))
+        # Same query planned by another worker (kept here for later near-duplicate matches too)
+        shared = self.backend.get("plans", key, max_age=self.ttl_seconds) if self.backend is not None else None
+        with self._lock:
+            if shared is not None:
+                answer, age = shared[0]["answer"], shared[1]
+                self._store(key, answer, tokens, signature, time.monotonic() - age)
+                self.exact_hits += 1
+                return answer, "exact"
+
+            anchors = _anchors(tokens)
+            candidates = set()
+            for band_key in self._band_keys(signature):
+                candidates.update(self._buckets.get(band_key, ()))
+
+            best_key, best_score = None, self.similarity_threshold
+            for candidate in candidates:
+                entry = self._fresh(candidate)
+                if entry is None or entry["anchors"] != anchors or not _tokens_compatible(tokens, entry["tokens"]):
+                    continue
+                score = self.hasher.similarity(signature, entry["signature"])
+                if score >= best_score:
+                    best_key, best_score = candidate, score
+
+            if best_key is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(best_key)
+            self.near_hits += 1
+            return self._entries[best_key]["answer"], "near"
+
+    def set(self, query: str, answer: str) -> None:
+        """Store the final answer for a query."""
+        tokens = query_tokens(query)
+        key = " ".join(tokens)
+        signature = self.hasher.signature(_content(tokens))
+        with self._lock:
+            self._store(key, answer, tokens, signature, time.monotonic())
+        if self.backend is not None:
+            self.backend.set("plans", key, {"answer": answer})
+
+    def record_bypass(self) -> None:
+        with self._lock:
+            self.bypassed += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+        if self.backend is not None:
+            self.backend.clear("plans")
+
+    def stats(self) -> dict:
+        """Exact/near-duplicate hit counters, hit rate and size."""
+        with self._lock:
+            lookups = self.exact_hits + self.near_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "exact_hits": self.exact_hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "hit_rate": round((self.exact_hits + self.near_hits) / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,101 @@
+import os
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+
+import yaml
+from dotenv import load_dotenv
+
+# Default config path (relative to the project root, like the rest of the app);
+# TRAVEL_PLANNER_CONFIG points the whole process at another file (e.g. benchmarks)
+CONFIG_PATH = os.environ.get("TRAVEL_PLANNER_CONFIG", "config/config.yaml")
+
+_EMPTY = MappingProxyType({})
+_env_loaded = False
+_settings = {}                  # config path -> Settings
+_lock = threading.Lock()
+
+
+def freeze(value: Any) -> Any:
+    """Read-only copy of parsed YAML: dicts become mapping proxies, lists become tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def load_env() -> None:
+    """Load .env into os.environ once per process (later calls are no-ops)."""
+    global _env_loaded
+    if not _env_loaded:
+        with _lock:
+            if not _env_loaded:
+                load_dotenv()
+                _env_loaded = True
+
+
+def _config_mtime(config_path: str) -> Optional[float]:
+    try:
+        return os.path.getmtime(config_path)
+    except OSError:
+        return None
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Immutable snapshot of config.yaml (plus the .env-backed environment).
+
+    Sections are read-only mappings, so one parsed copy can be shared by every
+    module without anyone changing it under the others.
+    """
+
+    config: Mapping
+    config_path: str
+    config_mtime: Optional[float]
+
+    def __getitem__(self, key: str) -> Any:
+        return self.config[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.config.get(key, default)
+
+    def section(self, name: str) -> Mapping:
+        """A top-level section, or an empty mapping when it is missing/empty."""
+        return self.config.get(name) or _EMPTY
+
+    @staticmethod
+    def env(name: str, default: Optional[str] = None) -> Optional[str]:
+        """Environment variable (after .env was loaded)."""
+        return os.environ.get(name, default)
+
+
+def get_settings(config_path: str = CONFIG_PATH) -> Settings:
+    """
+    Return the process-wide settings for a config file.
+
+    .env is loaded and the YAML parsed on first use only; the file is parsed
+    again only after it changed on disk (the graph registry's hot reload relies
+    on that).
+
+    Args:
+        config_path (str): Path to the config.yaml file.
+
+    Returns:
+        Settings: The shared immutable settings.
+    """
+    load_env()
+    mtime = _config_mtime(config_path)
+    settings = _settings.get(config_path)
+    if settings is not None and settings.config_mtime == mtime:
+        return settings
+
+    with _lock:
+        settings = _settings.get(config_path)
+        if settings is None or settings.config_mtime != mtime:
+            with open(config_path, "r") as file:
+                config = yaml.safe_load(file) or {}
+            settings = _settings[config_path] = Settings(freeze(config), config_path, mtime)
+        return settings
@@ -1,15 +1,112 @@
-import requests
+import asyncio
+import threading
+from utils.cache import TTLCache, SingleFlight, normalize_place
+from utils.http_transport import get_transport
+from utils.forecast_aggregator import aggregate_daily
+
+# Weather responses shared by every WeatherForecastTool in the process (and by
+# the other workers with a shared cache backend), keyed by ("current" | "forecast", normalized place)
+WEATHER_CACHE = TTLCache(ttl_seconds=600, namespace="weather")
+_WEATHER_FLIGHTS = SingleFlight()
 
 class WeatherForecastTool:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, current_ttl_seconds: float = 600,
+                 forecast_ttl_seconds: float = 3600, stale_ttl_seconds: float = 1800):
         """
         Initialize the WeatherForecastTool.
         Args:
             api_key (str): Your OpenWeatherMap API key.
+            current_ttl_seconds (float): Freshness of cached current conditions.
+            forecast_ttl_seconds (float): Freshness of cached forecasts.
+            stale_ttl_seconds (float): How long past its TTL an entry may still be
+                                       served while a background refresh runs.
         """
         self.api_key = api_key
-        self.base_url = "https://api.openweathermap.org/data/2.5"
+        self.ttls = {"current": current_ttl_seconds, "forecast": forecast_ttl_seconds}
+        self.stale_ttl_seconds = stale_ttl_seconds
+        self.cache = WEATHER_CACHE
+
+        # Shared HTTP transport (pooling, timeouts, retries, circuit breaker)
+        self.http = get_transport()
+        self.base_url = self.http.base_url("openweathermap", "https://api.openweathermap.org") + "/data/2.5"
+
+        # Strong references to background refresh tasks (asyncio only keeps weak ones)
+        self._refresh_tasks = set()
+
+    def _current_weather_params(self, place: str) -> dict:
+        return {
+            "q": place,              # City name
+            "appid": self.api_key,   # API key
+            "units": "metric"        # without units temp comes in Kelvin
+        }
+
+    def _forecast_params(self, place: str) -> dict:
+        # No "cnt": the full 5-day series (40 3-hour steps) is fetched once and aggregated per day
+        return {
+            "q": place,
+            "appid": self.api_key,
+            "units": "metric"    # Temp in Celsius instead of Kelvin
+        }
+
+    # --------------------------
+    # Cache helpers (TTL + single-flight + stale-while-revalidate)
+    # --------------------------
+    @staticmethod
+    def _is_cacheable(data) -> bool:
+        # Only successful responses are cached ({} and {"error": ...} are not)
+        return bool(data) and "error" not in data
+
+    def _fetch_and_store(self, key: tuple, fetch):
+        data = fetch()
+        if self._is_cacheable(data):
+            self.cache.set(key, data)
+        return data
+
+    async def _afetch_and_store(self, key: tuple, afetch):
+        data = await afetch()
+        if self._is_cacheable(data):
+            self.cache.set(key, data)
+        return data
+
+    def _cached(self, kind: str, place: str, fetch):
+        key = (kind, normalize_place(place))
+        ttl = self.ttls[kind]
 
+        entry = self.cache.get_entry(key, ttl=ttl + self.stale_ttl_seconds)
+        if entry is not None:
+            data, age = entry
+            if age > ttl and not _WEATHER_FLIGHTS.in_flight(key):
+                # Stale: serve it now and refresh in the background
+                threading.Thread(
+                    target=_WEATHER_FLIGHTS.do, args=(key, lambda: self._fetch_and_store(key, fetch)), daemon=True
+                ).start()
+            return data
+
+        return _WEATHER_FLIGHTS.do(key, lambda: self._fetch_and_store(key, fetch))
+
+    async def _acached(self, kind: str, place: str, afetch):
+        key = (kind, normalize_place(place))
+        ttl = self.ttls[kind]
+
+        entry = self.cache.get_entry(key, ttl=ttl + self.stale_ttl_seconds)
+        if entry is not None:
+            data, age = entry
+            if age > ttl and not _WEATHER_FLIGHTS.in_flight(key):
+                task = asyncio.create_task(_WEATHER_FLIGHTS.ado(key, lambda: self._afetch_and_store(key, afetch)))
+                self._refresh_tasks.add(task)
+                task.add_done_callback(self._refresh_tasks.discard)
+            return data
+
+        return await _WEATHER_FLIGHTS.ado(key, lambda: self._afetch_and_store(key, afetch))
+
+    @staticmethod
+    def cache_stats() -> dict:
+        """Hit/miss counters and entry ages of the shared weather cache."""
+        return {**WEATHER_CACHE.stats(), **_WEATHER_FLIGHTS.stats()}
+
+    # --------------------------
+    # Public API
+    # --------------------------
     def get_current_weather(self, place: str):
         """
         Get current weather for a city/place.
@@ -18,20 +115,8 @@ class WeatherForecastTool:
         Returns:
             dict: JSON response containing current weather data, or empty dict if failed.
         """
-        try:
-            url = f"{self.base_url}/weather"
-            params = {
-                "q": place,              # City name
-                "appid": self.api_key,   # API key
-                "units": "metric"        # without units temp comes in Kelvin
-            }
-            
-            response = requests.get(url, params=params)
-            return response.json() if response.status_code == 200 else {}
-        
-        except Exception as e:
-            return {"error": str(e)}
-    
+        return self._cached("current", place, lambda: self._fetch_current_weather(place))
+
     def get_forecast_weather(self, place: str):
         """
         Get weather forecast for a city/place.
@@ -40,17 +125,94 @@ class WeatherForecastTool:
         Returns:
             dict: JSON response containing forecast data, or empty dict if failed.
         """
+        return self._cached("forecast", place, lambda: self._fetch_forecast_weather(place))
+
+    async def aget_current_weather(self, place: str):
+        """
+        Async version of `get_current_weather` (does not block the event loop).
+        Args:
+            place (str): City name.
+        Returns:
+            dict: JSON response containing current weather data, or empty dict if failed.
+        """
+        return await self._acached("current", place, lambda: self._afetch_current_weather(place))
+
+    async def aget_forecast_weather(self, place: str):
+        """
+        Async version of `get_forecast_weather` (does not block the event loop).
+        Args:
+            place (str): City name.
+        Returns:
+            dict: JSON response containing forecast data, or empty dict if failed.
+        """
+        return await self._acached("forecast", place, lambda: self._afetch_forecast_weather(place))
+
+    def get_daily_forecast(self, place: str) -> list:
+        """
+        Per-day forecast summary (min/max/mean temperature, precipitation
+        probability and amount, dominant condition) for the next 5 days.
+        Aggregated once per forecast download and cached alongside it.
+        Args:
+            place (str): City name.
+        Returns:
+            list: One dict per local day (see `aggregate_daily`), or [] if the forecast failed.
+        """
+        key = ("daily", normalize_place(place))
+        days = self.cache.get(key, ttl=self.ttls["forecast"])
+        if days is None:
+            days = self._aggregate(key, self.get_forecast_weather(place))
+        return days
+
+    async def aget_daily_forecast(self, place: str) -> list:
+        """Async version of `get_daily_forecast`."""
+        key = ("daily", normalize_place(place))
+        days = self.cache.get(key, ttl=self.ttls["forecast"])
+        if days is None:
+            days = self._aggregate(key, await self.aget_forecast_weather(place))
+        return days
+
+    def _aggregate(self, key: tuple, forecast_data: dict) -> list:
+        if not self._is_cacheable(forecast_data):
+            return []
+        days = aggregate_daily(forecast_data)
+        self.cache.set(key, days)
+        return days
+
+    # --------------------------
+    # Upstream calls (OpenWeatherMap)
+    # --------------------------
+    def _fetch_current_weather(self, place: str):
+        try:
+            url = f"{self.base_url}/weather"
+            response = self.http.get("openweathermap", url, params=self._current_weather_params(place))
+            return response.json() if response.status_code == 200 else {}
+
+        except Exception as e:
+            return {"error": str(e)}
+
+    def _fetch_forecast_weather(self, place: str):
+        try:
+            url = f"{self.base_url}/forecast"
+            response = self.http.get("openweathermap", url, params=self._forecast_params(place))
+            return response.json() if response.status_code == 200 else {}
+
+        except Exception as e:
+            return {"error": str(e)}
+
+    async def _afetch_current_weather(self, place: str):
+        try:
+            url = f"{self.base_url}/weather"
+            response = await self.http.aget("openweathermap", url, params=self._current_weather_params(place))
+            return response.json() if response.status_code == 200 else {}
+
+        except Exception as e:
+            return {"error": str(e)}
+
+    async def _afetch_forecast_weather(self, place: str):
         try:
             url = f"{self.base_url}/forecast"
-            params = {
-                "q": place,
-                "appid": self.api_key,
-                "cnt": 10,           # Number of forecast entries (each is 3-hour step)
-                "units": "metric"    # Temp in Celsius instead of Kelvin
-            }
-            
-            response = requests.get(url, params=params)
+            response = await self.http.aget("openweathermap", url, params=self._forecast_params(place))
             return response.json() if response.status_code == 200 else {}
-        
+
         except Exception as e:
             return {"error": str(e)}